@@ -9,11 +9,18 @@ Title: Evaluating Expressions
 """
 
 import os
-import random
+import re
 import sys
 from fractions import Fraction
+from functools import lru_cache
 
-from utils import pylatex_pdf as pdf
+from utils.rng import as_random
+
+
+@lru_cache(maxsize=None)
+def _compile_expression(expression: str):
+    """Compiles an expression template once, with the terms bound to the names _t0, _t1, ..."""
+    return compile(expression.format(*(f"_t{i}" for i in range(10))), '<expression>', 'eval')
 
 
 class EvaluatingExpressions:
@@ -42,9 +49,14 @@ class EvaluatingExpressions:
             {'problem': "$\\frac{{{0}}}{{m}} * {1} + {2}\\ for\\ m = {3}$", 'expression': '({0}/{3}) * {1} + {2}'}
             ],
     }
+    _TEMPLATE_KEYS = tuple(_TEMPLATE)
+    #_NON_ZERO_RANGE = tuple(range(-9, -1)) + tuple(range(2, 10))
+    _NON_ZERO_RANGE = tuple(range(2, 10))
+    _NUMBER_OF_TERMS = 10
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self._title = "Evaluating Expressions"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -58,6 +70,16 @@ class EvaluatingExpressions:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
@@ -66,48 +88,78 @@ class EvaluatingExpressions:
         problem_text, answer_text = None, None
 
         # Implement the problem generation logic here.
-        templete_key = random.choice(list(self._TEMPLATE.keys()))
-        #non_zero_range = list(range(-9, -1)) + list(range(2, 10))
-        non_zero_range = list(range(2, 10))
-        terms = [random.choice(non_zero_range) for _ in range(10)]
-        str_terms = [str(t) for t in terms]
-        fraction_terms = [f"Fraction({t})" for t in terms]
-
-        keyword_template = random.choice(self._TEMPLATE[templete_key])
+        templete_key = self._rng.choice(self._TEMPLATE_KEYS)
+        terms = [self._rng.choice(self._NON_ZERO_RANGE) for _ in range(self._NUMBER_OF_TERMS)]
+        keyword_template = self._rng.choice(self._TEMPLATE[templete_key])
 
         try:
-            problem_text = f"Evaluate following expression with given value(s). \\\\ \\par \\qquad {keyword_template['problem'].format(*str_terms)}"
+            problem_text, answer_text = self._build_problem(keyword_template, terms)
         except IndexError as e:
             print(f"Error formatting template : {e}")
             return None, None
-
-        try:
-            expression_to_evaluate = keyword_template['expression'].format(*fraction_terms)
-            #expression_to_evaluate = '(-5*8 - -2) / 3'
-            #expression_to_evaluate = 'Fraction(4)'
-            result_fraction = eval(expression_to_evaluate, {'Fraction': Fraction})
-
-            # 분모가 1이면 정수로 출력 (예: 5/1 -> 5)
-            if result_fraction.denominator == 1:
-                answer_text = str(result_fraction.numerator)
-            # 분모가 -1이면 부호를 분자로 올려서 정수로 출력 (예: -5/-1 -> 5)
-            elif result_fraction.denominator == -1:
-                answer_text = str(-result_fraction.numerator)
-            # 그 외는 기약분수 형태로 출력 (예: 5/3, -5/3)
-            else:
-                answer_text = f"$\\frac{{{result_fraction.numerator}}}{{{result_fraction.denominator}}}$"
-
         except ZeroDivisionError:
             # 0으로 나누기 오류가 발생하면 무효 처리
             return None, None
         except Exception as e:
             # 기타 계산 오류 발생 시
-            print(f"Calculation Error for expression '{expression_to_evaluate}': {e}")
+            print(f"Calculation Error for expression '{keyword_template['expression']}' with terms {terms}: {e}")
             return None, None
 
+        return problem_text, answer_text
+
+    @staticmethod
+    def _build_problem(keyword_template: dict, terms: list[int]) -> tuple[str, str]:
+        """
+        Formats the problem for the given terms and evaluates its answer exactly.
+        Raises IndexError, ZeroDivisionError or other calculation errors as they occur.
+        """
+        problem_text = f"Evaluate following expression with given value(s). \\\\ \\par \\qquad {keyword_template['problem'].format(*terms)}"
+        result_fraction = eval(_compile_expression(keyword_template['expression']),
+                               {f"_t{i}": Fraction(t) for i, t in enumerate(terms)})
+
+        # 분모가 1이면 정수로 출력 (예: 5/1 -> 5). Fraction은 분모를 항상 양수로 정규화합니다.
+        if result_fraction.denominator == 1:
+            answer_text = str(result_fraction.numerator)
+        # 그 외는 기약분수 형태로 출력 (예: 5/3, -5/3)
+        else:
+            answer_text = f"$\\frac{{{result_fraction.numerator}}}{{{result_fraction.denominator}}}$"
 
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Template keys and terms are drawn in bulk, and each expression template is compiled once.
+        Returns: (problem_list, answer_list)
+        """
+        problem_list = []
+        answer_list = []
+        while len(problem_list) < number_of_problems:
+            remaining = number_of_problems - len(problem_list)
+            template_keys = self._rng.choices(self._TEMPLATE_KEYS, k=remaining)
+            all_terms = self._rng.choices(self._NON_ZERO_RANGE, k=remaining * self._NUMBER_OF_TERMS)
+
+            for i, templete_key in enumerate(template_keys):
+                keyword_template = self._rng.choice(self._TEMPLATE[templete_key])
+                terms = all_terms[i * self._NUMBER_OF_TERMS:(i + 1) * self._NUMBER_OF_TERMS]
+                try:
+                    problem_text, answer_text = self._build_problem(keyword_template, terms)
+                except ZeroDivisionError:
+                    continue
+                problem_list.append(problem_text)
+                answer_list.append(answer_text)
+
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the expression with its numbers taken out,
+        and the numbers in order.
+        """
+        expression = problem_text.split("$")[1]
+        return re.sub(r"\d+", "#", expression), tuple(int(number) for number in re.findall(r"\d+", expression))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -116,24 +168,27 @@ class EvaluatingExpressions:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
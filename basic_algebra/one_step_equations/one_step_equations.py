@@ -1,8 +1,8 @@
 import os
-import random
+import re
 import sys
 
-from utils import pylatex_pdf as pdf
+from utils.rng import as_random
 
 
 class OneStepEquations:
@@ -22,9 +22,13 @@ class OneStepEquations:
             'answer': "{1} = {3}"  # {1}=V, {3}=X (Solution)
         }
     }
+    _OPERATION_TYPES = tuple(_PROBLEM_TEMPLATES)
+    # Coefficient/Divisor (A)와 Simple Factor (S_factor)의 범위 (양 끝 포함)
+    _FACTOR_RANGE = (2, 12)
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self._title = "One Step Equations"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -38,6 +42,16 @@ class OneStepEquations:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
@@ -46,15 +60,15 @@ class OneStepEquations:
         problem_text, answer_text = None, None
 
         # 1. Choose the operation type
-        op_type = random.choice(list(self._PROBLEM_TEMPLATES.keys()))
+        op_type = self._rng.choice(self._OPERATION_TYPES)
         template = self._PROBLEM_TEMPLATES[op_type]
 
         # 2. Choose random values
-        variable = random.choice(self._VARIABLES)
+        variable = self._rng.choice(self._VARIABLES)
         # Coefficient/Divisor (A): 2 to 12
-        A = random.randint(2, 12)
+        A = self._rng.randint(*self._FACTOR_RANGE)
         # Simple Factor (S_factor): The simple result before multiplying by A (2 to 12)
-        S_factor = random.randint(2, 12)
+        S_factor = self._rng.randint(*self._FACTOR_RANGE)
 
         # Calculate the constant (C) and the final solution (X)
         if op_type == 'multiplication':
@@ -79,6 +93,48 @@ class OneStepEquations:
 
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Operation types, variables and factors are drawn as NumPy arrays in one pass.
+        Returns: (problem_list, answer_list)
+        """
+        import numpy as np
+
+        from utils.fraction_array import numpy_generator
+
+        generator = numpy_generator(self._rng)
+        op_indexes = generator.integers(0, len(self._OPERATION_TYPES), size=number_of_problems)
+        variable_indexes = generator.integers(0, len(self._VARIABLES), size=number_of_problems)
+        A = generator.integers(*self._FACTOR_RANGE, size=number_of_problems, endpoint=True)
+        S_factor = generator.integers(*self._FACTOR_RANGE, size=number_of_problems, endpoint=True)
+
+        # generate_problem과 같은 규칙: 곱셈은 X = S_factor, C = A * S_factor / 나눗셈은 X = A * S_factor, C = S_factor
+        is_multiplication = np.array([op_type == 'multiplication' for op_type in self._OPERATION_TYPES])[op_indexes]
+        X = np.where(is_multiplication, S_factor, A * S_factor)
+        C = np.where(is_multiplication, A * S_factor, S_factor)
+
+        templates = [self._PROBLEM_TEMPLATES[op_type] for op_type in self._OPERATION_TYPES]
+        problem_list = []
+        answer_list = []
+        for op_index, variable_index, a, c, x in zip(op_indexes.tolist(), variable_indexes.tolist(),
+                                                     A.tolist(), C.tolist(), X.tolist()):
+            template = templates[op_index]
+            variable = self._VARIABLES[variable_index]
+            problem_list.append(f"Solve following expression. \\\\ \\par \\qquad {template['problem'].format(a, variable, c)}")
+            answer_list.append(template['answer'].format(a, variable, c, x))
+
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the operation and its numbers without the
+        variable, so 6x = 24 and 6y = 24 share a key.
+        """
+        equation = problem_text.split("$")[1]
+        return "\\frac" in equation, tuple(int(number) for number in re.findall(r"\d+", equation))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -87,24 +143,27 @@ class OneStepEquations:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
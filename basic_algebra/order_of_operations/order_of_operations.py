@@ -11,19 +11,37 @@ Title: Order Of Operations
 import os
 import random
 import sys
+from fractions import Fraction
 
-from utils import pylatex_pdf as pdf
 from utils.expression import Expression
+from utils.expression_shapes import ShapeIndex, ShapeValues
+from utils.expression_tree import BinaryOperation, Operand, canonical_form, to_infix, unicode_to_infix
+from utils.fractions import to_latex_friction
+from utils.rng import as_random
 
 
 class OrderOfOperations(Expression):
     """A class template for generating and handling math-related problems."""
     _OPERATORS = ['+', '-', '*', '/', '^']
-
-    def __init__(self):
+    _EXPONENTS = [2, 3]
+    _POWER_BASES = [2, 3, 4, 5]
+    _MAX_GENERATION_ATTEMPTS = 100
+    _MAX_SUBTREE_ATTEMPTS = 10
+    _NUMBER_OF_DIFFICULTY_BUCKETS = 5
+    _SHAPE_INDEX_SAMPLES = 500
+    _SHAPE_INDEX_SEED = 0
+
+    def __init__(self, rng=None):
         super().__init__()
         self._title = "Order Of Operations"
+        # 분수 답(rule_rational)을 쓰려면 정확한 int/Fraction 계산이 필요합니다.
+        self.evaluation_mode = "Exact"
+        self._rng = as_random(rng)
         self._allowed_operators = self._OPERATORS
+        # (number_of_nested, allowed_operators, frequency_exponential) -> ShapeIndex
+        self._shape_indexes = {}
+        # (rule_negation, lower limit, upper limit) -> ShapeValues
+        self._shape_values = {}
 
     @property
     def title(self):
@@ -37,6 +55,19 @@ class OrderOfOperations(Expression):
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """
+        Accepts None (random module), an int seed, a random.Random or a numpy Generator.
+        The shape indexes are kept: they are built from _SHAPE_INDEX_SEED, not from this generator.
+        """
+        self._rng = as_random(value)
+
     @property
     def allowed_operators(self):
         """수식 생성에 허용되는 연산자 리스트를 반환합니다. (+, -, *, /, ^)"""
@@ -81,81 +112,286 @@ class OrderOfOperations(Expression):
             invalid_ops = [op for op in op_list if op not in valid_ops]
             raise ValueError(f"Invalid operator(s) found: {', '.join(invalid_ops)}. Allowed operators are: {valid_ops}")
 
+        # '^'의 지수는 항상 숫자이므로 '^'만으로는 수식을 중첩할 수 없습니다.
+        if set(op_list) == {'^'}:
+            raise ValueError("'^' must be allowed together with at least one other operator.")
+
         self._allowed_operators = op_list
 
-    def generate_random_expression(self, depth=0):
+    def _leaf_values(self) -> list[int]:
+        """Operand values used at the leaves (1..10, negated when rule_negation is 'Yes')."""
+        if self._rule_negation == "Yes":
+            return list(range(-1, -11, -1))
+        return list(range(1, 11))
+
+    def _is_valid_value(self, value: int) -> bool:
+        """Checks a (sub)expression value against the negation and boundary rules."""
+        if self._rule_negation == "No" and value < 0:
+            return False
+        return self._rule_lower_limit <= value <= self._rule_upper_limit
+
+    @staticmethod
+    def _apply_operator(operator: str, left_value: int, right_value: int):
+        """Applies an operator to integer values. Returns None if the result is not an integer."""
+        if operator == '+':
+            return left_value + right_value
+        if operator == '-':
+            return left_value - right_value
+        if operator == '*':
+            return left_value * right_value
+        if operator == '/':
+            if right_value == 0 or left_value % right_value != 0:
+                return None
+            return left_value // right_value
+        return left_value ** right_value
+
+    def _random_shape(self, rng, depth=0):
+        """
+        Draws an expression skeleton of number_of_nested levels. Each level is either a single
+        operation or two operations grouped by precedence, a op1 (b op2 c) or (a op1 b) op2 c.
 
+        Skeletons are 'n' (number), 'p' (power), 'e' (exponent 2 or 3) or (operator, left, right).
+        """
         operators = self._allowed_operators
-
         if depth >= self.number_of_nested:
-            if '^' in self._allowed_operators and random.random() < self.frequency_exponential:  # 0.0에서 1.0 사이의 무작위 값
-                base = random.randint(2, 5)
-                power = random.randint(2, 3)
-                return f"{str(base)} ^ {str(power)}"
-            else:
-                number = random.randint(1, 10)
-                if self._rule_negation == "Yes":
-                    number = number * -1
-                    print(f"return negative number: {number}")
-                return str(number)
-
-        # if random.random() < self.difficulty_level:  # 0.0에서 1.0 사이의 무작위 값
-        # print("!!! difficulty level down !!!")
-        #    return str(random.randint(1, 10))
-
-        if random.randint(1, 1000) % 2 == 0:
-            left_part = self.generate_random_expression(depth + 1)
-            operator = random.choice(operators)
-
-            if operator == '^':
-                right_part = str(random.randint(2, 3))
-            else:
-                right_part = self.generate_random_expression(depth + 1)
+            if '^' in operators and rng.random() < self.frequency_exponential:
+                return 'p'
+            return 'n'
+
+        if rng.randint(1, 1000) % 2 == 0:
+            operator = rng.choice(operators)
+            right = 'e' if operator == '^' else self._random_shape(rng, depth + 1)
+            return operator, self._random_shape(rng, depth + 1), right
+
+        # '^'를 두 번 연속 쓰지 않도록 operator1이 '^'이면 operator2는 나머지 연산자에서 고릅니다.
+        operator1 = rng.choice(operators)
+        operator2 = rng.choice([op for op in operators if op != '^'] if operator1 == '^' else operators)
+
+        left = self._random_shape(rng, depth + 1)
+        middle = 'e' if operator1 == '^' else self._random_shape(rng, depth + 1)
+        right = 'e' if operator2 == '^' else self._random_shape(rng, depth + 1)
+
+        # 연산자 우선순위에 맞게 트리를 구성합니다: a op1 (b op2 c) 또는 (a op1 b) op2 c
+        if self._PRECEDENCE[operator2] > self._PRECEDENCE[operator1]:
+            return operator1, left, (operator2, middle, right)
+        return operator2, (operator1, left, middle), right
+
+    def _fill_leaf(self, shape, rng) -> tuple:
+        """Fills a 'p' (power) or 'n' (number) leaf. A power falls back to a number if none fits the limits."""
+        if shape == 'p':
+            powers = [(base, power) for base in self._POWER_BASES for power in self._EXPONENTS
+                      if self._is_valid_value(base ** power)]
+            if powers:
+                base, power = rng.choice(powers)
+                return BinaryOperation('^', Operand(str(base)), Operand(str(power))), base ** power
+
+        number = rng.choice(self._leaf_values())
+        return Operand(str(number)), number
+
+    def _fill_shape(self, shape, rng):
+        """
+        Fills an expression skeleton with numbers so that every intermediate result satisfies
+        the rules. Single operands on the right are picked from the values that keep the result
+        valid; compound right operands are refilled up to _MAX_SUBTREE_ATTEMPTS times. An operator
+        that cannot be applied is replaced by another allowed operator, tried in random order.
 
-            expression = f"{left_part} {operator} {right_part}"
-        else:
-            while True:
-                operator1 = random.choice(operators)
-                operator2 = random.choice(operators)
-                if operator1 == '^' and operator2 == '^':
+        Returns:
+            tuple: (node, value), or None if the skeleton could not be filled.
+        """
+        if shape in ('n', 'p'):
+            return self._fill_leaf(shape, rng)
+
+        operator, left_shape, right_shape = shape
+        left = self._fill_shape(left_shape, rng)
+        if left is None:
+            return None
+        left_node, left_value = left
+
+        other_operators = [op for op in self._allowed_operators if op != operator]
+        rng.shuffle(other_operators)
+        candidates = [operator] + other_operators
+
+        if right_shape in ('n', 'e'):
+            for op in candidates:
+                valid_operands = []
+                for operand_value in self._EXPONENTS if op == '^' else self._leaf_values():
+                    value = self._apply_operator(op, left_value, operand_value)
+                    if value is not None and self._is_valid_value(value):
+                        valid_operands.append((operand_value, value))
+                if valid_operands:
+                    operand_value, value = rng.choice(valid_operands)
+                    return BinaryOperation(op, left_node, Operand(str(operand_value))), value
+            return None
+
+        for _ in range(self._MAX_SUBTREE_ATTEMPTS):
+            right = self._fill_shape(right_shape, rng)
+            if right is None:
+                continue
+            right_node, right_value = right
+            for op in candidates:
+                if op == '^':
                     continue
-                else:
-                    break
-            left_part = self.generate_random_expression(depth + 1)
-            if operator1 == '^':
-                middle_part = str(random.randint(2, 3))
-            else:
-                middle_part = self.generate_random_expression(depth + 1)
-            if operator2 == '^':
-                right_part = str(random.randint(2, 3))
-            else:
-                right_part = self.generate_random_expression(depth + 1)
+                value = self._apply_operator(op, left_value, right_value)
+                if value is not None and self._is_valid_value(value):
+                    return BinaryOperation(op, left_node, right_node), value
+        return None
 
-            expression = f"{left_part} {operator1} {middle_part} {operator2} {right_part}"
+    def generate_random_expression(self, depth=0) -> tuple[str, int]:
+        """
+        Generates a random infix expression whose every intermediate result satisfies the
+        integer, negation and boundary rules (see generate_expression_tree).
 
-        # 괄호를 사용하여 중첩을 표현합니다.
+        Returns:
+            tuple: (infix expression string, integer value of the expression)
+        """
+        node, value = self.generate_expression_tree(depth)
+        expression = to_infix(node, self._PRECEDENCE)
         # 중첩 깊이가 0일 때는 가장 바깥쪽 괄호를 생략합니다.
-        if depth == 0:
-            return expression
+        if depth == 0 or isinstance(node, Operand):
+            return expression, value
+        return f"({expression})", value
+
+    def generate_expression_tree(self, depth=0) -> tuple:
+        """
+        Builds a random expression tree of number_of_nested levels whose every intermediate
+        result satisfies the integer, negation and boundary rules. An operator that does not
+        fit may be swapped for another allowed one; a skeleton that still cannot be filled is
+        redrawn, up to _MAX_GENERATION_ATTEMPTS times.
+
+        Returns:
+            tuple: (root node, integer value of the expression)
+        """
+        for _ in range(self._MAX_GENERATION_ATTEMPTS):
+            subtree = self._fill_shape(self._random_shape(self._rng, depth), self._rng)
+            if subtree is not None:
+                return subtree
+
+        raise ValueError(f"Could not generate an expression within the limits {self.rule_lower_upper_limit}.")
+
+    def _rule_key(self) -> tuple:
+        return self._rule_negation, self._rule_lower_limit, self._rule_upper_limit
+
+    def _values_for_rules(self) -> ShapeValues:
+        """Values of the skeletons under the current negation and boundary rules, computed once per rule set."""
+        rule_key = self._rule_key()
+        values = self._shape_values.get(rule_key)
+        if values is None:
+            powers = [base ** power for base in self._POWER_BASES for power in self._EXPONENTS
+                      if self._is_valid_value(base ** power)]
+            low = max(self._rule_lower_limit, 0) if self._rule_negation == "No" else self._rule_lower_limit
+            values = ShapeValues(low, self._rule_upper_limit,
+                                 {'n': self._leaf_values(), 'p': powers or self._leaf_values()}, self._EXPONENTS)
+            self._shape_values[rule_key] = values
+        return values
+
+    def build_shape_index(self) -> ShapeIndex:
+        """
+        Builds the difficulty-bucketed index of expression skeletons for the current nesting,
+        operators and exponent frequency, annotated with solvability under the current rules.
+
+        The skeletons are drawn with _random_shape from a generator seeded with _SHAPE_INDEX_SEED,
+        not from self.rng, so the index is the same for every seed and in every process. It is built
+        once per settings and kept on this instance; calling this ahead of time (e.g. when a worker
+        starts) keeps the cost out of problem generation.
+        """
+        key = (self.number_of_nested, tuple(self._allowed_operators), self.frequency_exponential)
+        index = self._shape_indexes.get(key)
+        if index is None:
+            index_rng = random.Random(self._SHAPE_INDEX_SEED)
+            index = ShapeIndex([self._random_shape(index_rng) for _ in range(self._SHAPE_INDEX_SAMPLES)],
+                               self._NUMBER_OF_DIFFICULTY_BUCKETS)
+            self._shape_indexes[key] = index
+
+        rule_key = self._rule_key()
+        if not index.is_annotated(rule_key):
+            index.annotate(rule_key, self._values_for_rules().is_solvable)
+        return index
+
+    def _filled_tree(self, filled) -> tuple:
+        """Turns a skeleton filled by ShapeValues.fill into (node, value)."""
+        if len(filled) == 2:
+            leaf, value = filled
+            if leaf == 'p':
+                for base in self._POWER_BASES:
+                    for power in self._EXPONENTS:
+                        if base ** power == value:
+                            return BinaryOperation('^', Operand(str(base)), Operand(str(power))), value
+            return Operand(str(value)), value
+
+        operator, left, right, value = filled
+        return BinaryOperation(operator, self._filled_tree(left)[0], self._filled_tree(right)[0]), value
+
+    def generate_expression_tree_for_difficulty(self) -> tuple:
+        """
+        Samples a skeleton from the shape index bucket matching difficulty_level and fills in
+        the numbers in one pass, keeping every operator of the skeleton. Falls back to
+        generate_expression_tree if no skeleton in the index can be filled under the rules.
+
+        Returns:
+            tuple: (root node, integer value of the expression)
+        """
+        shape = self.build_shape_index().sample(self.difficulty_level, self._rule_key(), self._rng)
+        if shape is None:
+            return self.generate_expression_tree()
+        return self._filled_tree(self._values_for_rules().fill(shape, self._rng))
+
+    def _build_problem(self):
+        """
+        Draws one expression and formats it.
+        Returns (problem_text, answer_text, expression_tree, evaluation_result), or None if the
+        drawn expression has to be discarded.
+        """
+        expression_tree, _ = self.generate_expression_tree_for_difficulty()
+        evaluation_result = self.evaluate_tree(expression_tree)
+        if isinstance(evaluation_result, int):
+            answer_text = str(evaluation_result)
+        elif isinstance(evaluation_result, Fraction):
+            answer_text = to_latex_friction(evaluation_result.numerator, evaluation_result.denominator)
         else:
-            return f"({expression})"
+            return None
+        unicode_expression, _ = self.render_expression(expression_tree)
+        return f"{unicode_expression} =", answer_text, expression_tree, evaluation_result
 
     def generate_problem(self) -> tuple[str, str]:
-        problem_text, answer_text = None, None
-        while True:
-            random_expression = self.generate_random_expression()
-            postfix = self.infix_to_postfix(random_expression)
-            if isinstance(postfix, str) and postfix.startswith("Error"):
+        for _ in range(self._MAX_GENERATION_ATTEMPTS):
+            built = self._build_problem()
+            if built is None:
                 continue
-            evaluation_result = self.evaluate_postfix(postfix)
-            if isinstance(evaluation_result, int):
-                problem_text = f"{self._infix_to_unicode_format(random_expression)} ="
-                answer_text = str(evaluation_result)
-                print(
-                    f"{random_expression} ==> {self._infix_to_unicode_format(random_expression)} = {evaluation_result}")
-                break
+            problem_text, answer_text, expression_tree, evaluation_result = built
+            print(f"{to_infix(expression_tree, self._PRECEDENCE)} ==> {problem_text} {evaluation_result}")
+            return problem_text, answer_text
 
-        return problem_text, answer_text
+        raise ValueError(f"Could not generate an expression within the limits {self.rule_lower_upper_limit}.")
+
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Returns: (problem_list, answer_list)
+        """
+        problem_list = []
+        answer_list = []
+        for _ in range(number_of_problems):
+            for _ in range(self._MAX_GENERATION_ATTEMPTS):
+                built = self._build_problem()
+                if built is not None:
+                    problem_list.append(built[0])
+                    answer_list.append(built[1])
+                    break
+            else:
+                raise ValueError(f"Could not generate an expression within the limits {self.rule_lower_upper_limit}.")
+
+        return problem_list, answer_list
+
+    def canonical_key(self, problem_text: str, answer_text: str) -> str:
+        """
+        Canonical key for deduplication (see utils.dedup): the expression with the operands of
+        + and × sorted, so 3 + 5 and 5 + 3 share a key. Unparsable text is its own key.
+        """
+        try:
+            expression_tree = self.parse_expression(unicode_to_infix(problem_text.removesuffix(" =")))
+        except ValueError:
+            return problem_text
+        return canonical_form(expression_tree)
 
     def get_problem_answer(self) -> tuple[str, str]:
         problem_text, answer_text = None, None
@@ -164,17 +400,12 @@ class OrderOfOperations(Expression):
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        num_of_problems = 0
-        problem_list = []
-        answer_list = []
-
-        while num_of_problems < number_of_problems:
-            problem, answer = self.get_problem_answer()
-            problem_list.append(problem)
-            answer_list.append(answer)
-            num_of_problems += 1
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated."""
+        for _ in range(number_of_problems):
+            yield self.get_problem_answer()
 
+    def generate_practice(self, number_of_problems: int = 10):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         parent_dir = os.path.dirname(current_dir)
         module_path = os.path.join(parent_dir, "pdf_handling")
@@ -183,8 +414,12 @@ class OrderOfOperations(Expression):
             sys.path.append(module_path)
 
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=2, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=2, answer_columns=4, row_spacing=400)
             print("PDF 파일이 성공적으로 생성되었습니다.")
         except ImportError:
             print("Error: 'pdf_handling' 모듈을 찾을 수 없습니다.")
@@ -9,18 +9,22 @@ Title: Properties Of Numbers
 """
 
 import os
-import random
+import re
 import sys
 
-from utils import pylatex_pdf as pdf
+from utils.rng import as_random
 
 
 class PropertiesOfNumbers:
     """A class template for generating and handling math-related problems."""
+    _LETTERS = ('a', 'b', 'c', 'x', 'y', 'z')
+    _NUMBERS = tuple(str(number) for number in range(1, 11))
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self._title = "Properties Of Numbers"
+        self._rng = as_random(rng)
         self._properties = self._load_properties()
+        self._property_names = tuple(self._properties)
 
     @property
     def title(self):
@@ -34,6 +38,16 @@ class PropertiesOfNumbers:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def _load_properties(self) -> dict:
         """수의 속성(Property) 목록과 그 정의를 로드합니다."""
         return {
@@ -53,10 +67,16 @@ class PropertiesOfNumbers:
         """문제에 사용할 무작위 숫자 또는 문자를 생성합니다."""
         if use_letters:
             # a, b, c 등의 문자 사용
-            return random.sample(['a', 'b', 'c', 'x', 'y', 'z'], count)
+            return self._rng.sample(self._LETTERS, count)
         else:
             # 1~10 사이의 숫자 사용
-            return [str(random.randint(1, 10)) for _ in range(count)]
+            return [str(self._rng.randint(1, 10)) for _ in range(count)]
+
+    @staticmethod
+    def _required_values(property_name: str) -> int:
+        """결합법칙과 분배법칙은 3개, 나머지는 2개의 값을 사용합니다."""
+        # 항등원은 1개 값만 필요하지만, 생성 코드를 간단히 하기 위해 2개로 통일
+        return 3 if any(p in property_name for p in ["Associative", "Distributive"]) else 2
 
     def _generate_expression(self, property_name: str, values: list[str]) -> str:
         """주어진 속성을 나타내는 수학적 표현식을 생성합니다."""
@@ -109,18 +129,18 @@ class PropertiesOfNumbers:
 
         # Implement the problem generation logic here.
         # 1. 무작위 속성 선택
-        property_name = random.choice(list(self._properties.keys()))
-        property_definition = self._properties[property_name]
+        property_name = self._rng.choice(self._property_names)
 
         # 2. 값 생성 (문자 또는 숫자 무작위 선택)
-        required_values = 3 if any(p in property_name for p in ["Associative", "Distributive"]) else 2
+        use_letters = self._rng.random() < 0.5
+        values = self._get_random_values(self._required_values(property_name), use_letters)
 
-        # 항등원은 1개 값만 필요하지만, 생성 코드를 간단히 하기 위해 2개로 통일
-        required_values = max(required_values, 2)
+        problem_text, answer_text = self._build_problem(property_name, values)
 
-        use_letters = random.random() < 0.5
-        values = self._get_random_values(required_values, use_letters)
+        return problem_text, answer_text
 
+    def _build_problem(self, property_name: str, values: list[str]) -> tuple[str, str]:
+        """Formats the problem and answer for the given property and values."""
         # 3. 표현식 생성
         expression_text = self._generate_expression(property_name, values)
 
@@ -132,7 +152,7 @@ class PropertiesOfNumbers:
 
         # 5. 답안 텍스트 생성
         answer_text = (
-            f"\\textbf{{Property:}} {property_name} \\\\ \\quad \\textbf{{Rule:}} {property_definition}"
+            f"\\textbf{{Property:}} {property_name} \\\\ \\quad \\textbf{{Rule:}} {self._properties[property_name]}"
         )
 
         # \\par\bigskip는 PyLaTeX에서 NoEscape로 처리되어야 합니다.
@@ -140,6 +160,45 @@ class PropertiesOfNumbers:
 
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Properties, letter/number choices and numbers are drawn in bulk.
+        Returns: (problem_list, answer_list)
+        """
+        property_names = self._rng.choices(self._property_names, k=number_of_problems)
+        letter_flags = [self._rng.random() < 0.5 for _ in range(number_of_problems)]
+        required_counts = [self._required_values(property_name) for property_name in property_names]
+        numbers = iter(self._rng.choices(self._NUMBERS, k=sum(
+            count for count, use_letters in zip(required_counts, letter_flags) if not use_letters)))
+
+        problem_list = []
+        answer_list = []
+        for property_name, use_letters, count in zip(property_names, letter_flags, required_counts):
+            if use_letters:
+                values = self._rng.sample(self._LETTERS, count)
+            else:
+                values = [next(numbers) for _ in range(count)]
+            problem_text, answer_text = self._build_problem(property_name, values)
+            problem_list.append(problem_text)
+            answer_list.append(answer_text)
+
+        return problem_list, answer_list
+
+    def canonical_key(self, problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the property and the values of its expression,
+        sorted for the commutative properties so a + b = b + a and b + a = a + b share a key.
+        """
+        property_name = next((name for name in self._property_names if f"{{Property:}} {name} " in answer_text),
+                             answer_text)
+        expression = problem_text.split("$")[1]
+        values = re.findall(r"\\[a-z]+|[a-z]|\d+", expression)
+        values = [value for value in values if not value.startswith("\\")]
+        if "Commutative" in property_name:
+            return property_name, tuple(sorted(values[:2]))
+        return property_name, tuple(values)
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -148,24 +207,27 @@ class PropertiesOfNumbers:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=1)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=1, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
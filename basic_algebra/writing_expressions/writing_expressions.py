@@ -9,10 +9,20 @@ Title: Writing Expressions
 """
 
 import os
-import random
+import re
 import sys
 
-from utils import pylatex_pdf as pdf
+from utils.rng import as_random
+
+
+def _template_patterns(keywords: dict) -> tuple:
+    """(operator key, template, compiled pattern) for every keyword template, in definition order."""
+    patterns = []
+    for operator_key, templates in keywords.items():
+        for template in templates:
+            pattern = re.escape(template).replace(r"\{0\}", r"(?P<t0>\w+)").replace(r"\{1\}", r"(?P<t1>\w+)")
+            patterns.append((operator_key, template, re.compile(pattern)))
+    return tuple(patterns)
 
 
 class WritingExpressions:
@@ -32,9 +42,13 @@ class WritingExpressions:
     # 문제에 사용할 변수와 숫자
     _VARIABLES = ['x', 'y', 'a', 'b', 'c', 'n', 'q', 'u', 'e', 'm']
     _NUMBERS = list(range(2, 11))  # 2부터 10까지의 숫자
+    _OPERATOR_KEYS = tuple(_KEYWORDS)
+    _TEMPLATE_PATTERNS = _template_patterns(_KEYWORDS)
+    _COMMUTATIVE_KEYS = ('+', '*')
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self._title = "Writing Expressions"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -48,18 +62,28 @@ class WritingExpressions:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def _get_random_terms(self, count: int, allow_variables: bool = True, allow_numbers: bool = True) -> list:
         """문제에 사용할 무작위 숫자 또는 변수를 생성합니다."""
         terms = []
         for _ in range(count):
-            choice = random.choice([0, 1])  # 0: 숫자, 1: 변수
+            choice = self._rng.choice([0, 1])  # 0: 숫자, 1: 변수
 
             if allow_variables and (choice == 1 or not allow_numbers):
                 # 변수 사용
-                terms.append(random.choice(self._VARIABLES))
+                terms.append(self._rng.choice(self._VARIABLES))
             elif allow_numbers:
                 # 숫자 사용
-                terms.append(random.choice(self._NUMBERS))
+                terms.append(self._rng.choice(self._NUMBERS))
             else:
                 # 폴백: 이 상황은 발생하지 않아야 함
                 terms.append('z')
@@ -71,22 +95,29 @@ class WritingExpressions:
                 Returns: (problem_text, answer_text)
                 """
         # 1. 무작위 연산 선택
-        operator_key = random.choice(list(self._KEYWORDS.keys()))
-
-        problem_text, answer_text = "", ""
+        operator_key = self._rng.choice(self._OPERATOR_KEYS)
 
         if operator_key == '*':
             # 50% 확률로 단항 곱셈 (twice, triple) 사용
-            if random.random() < 0.5:
+            if self._rng.random() < 0.5:
                 operator_key = '*_mult'
 
+        return self._generate_for_operator(operator_key)
+
+    def _generate_for_operator(self, operator_key: str) -> tuple[str, str]:
+        """
+        Generates the terms, problem and answer for an already chosen operator key.
+        Returns: (problem_text, answer_text), or (None, None) if the template could not be formatted.
+        """
+        problem_text, answer_text = "", ""
+
         # 2. 항(Term) 생성
         if operator_key in ['*_mult', '^']:
             # 단일 항 또는 두 항이 필요합니다.
             if operator_key == '^':
                 # 지수 문제: Base(변수/숫자)와 Exponent(숫자 2, 3, 4)가 필요합니다.
                 base = self._get_random_terms(1, allow_numbers=True)[0]
-                exponent = random.choice([2, 3, 4])
+                exponent = self._rng.choice([2, 3, 4])
                 terms = [base, exponent]
             else:  # *_mult (twice, triple)
                 terms = self._get_random_terms(1, allow_variables=True)
@@ -113,7 +144,7 @@ class WritingExpressions:
                 # 뺄셈, 나눗셈은 순서를 바꾸지 않아야 합니다.
 
         # 3. 문제 텍스트 생성
-        keyword_template = random.choice(self._KEYWORDS[operator_key])
+        keyword_template = self._rng.choice(self._KEYWORDS[operator_key])
 
         # 항을 문자열로 변환
         str_terms = [str(t) for t in terms]
@@ -206,6 +237,46 @@ class WritingExpressions:
 
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Operator keys and the unary multiplication choices are drawn in bulk.
+        Returns: (problem_list, answer_list)
+        """
+        problem_list = []
+        answer_list = []
+        while len(problem_list) < number_of_problems:
+            remaining = number_of_problems - len(problem_list)
+            operator_keys = self._rng.choices(self._OPERATOR_KEYS, k=remaining)
+            unary_flags = [self._rng.random() < 0.5 for _ in range(remaining)]
+
+            for operator_key, unary in zip(operator_keys, unary_flags):
+                if operator_key == '*' and unary:
+                    operator_key = '*_mult'
+                problem_text, answer_text = self._generate_for_operator(operator_key)
+                if problem_text is None:
+                    continue
+                problem_list.append(problem_text)
+                answer_list.append(answer_text)
+
+        return problem_list, answer_list
+
+    def canonical_key(self, problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the keyword template and its terms, with the
+        terms sorted for + and × so "sum of 5 and x" and "sum of x and 5" share a key.
+        Text that matches no template is its own key.
+        """
+        description = problem_text.split("\\qquad ", 1)[-1]
+        for operator_key, template, pattern in self._TEMPLATE_PATTERNS:
+            match = pattern.fullmatch(description)
+            if match:
+                terms = tuple(term for term in match.groupdict().values() if term is not None)
+                if operator_key in self._COMMUTATIVE_KEYS:
+                    terms = tuple(sorted(terms))
+                return template, terms
+        return (problem_text,)
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -214,24 +285,27 @@ class WritingExpressions:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
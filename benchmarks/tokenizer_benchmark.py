@@ -0,0 +1,119 @@
+"""
+tokenizer_benchmark.py
+--------------------
+Compares the per-character tokenizer that Expression.tokenize_expression used to run
+with the precompiled scanner (Expression.scan_tokens), in tokens per second.
+
+Run from the repository root:
+    python -m benchmarks.tokenizer_benchmark
+"""
+
+import random
+import re
+import time
+
+from utils.expression import Expression
+from utils.unicodes import UNICODE_MULTIPLIER, UNICODE_DIVISION
+
+
+def legacy_tokenize_expression(expression_string):
+    """Previous implementation: char-by-char loop with a re.fullmatch call per character."""
+    operators = ('+', '-', '*', '/', '^', UNICODE_MULTIPLIER, UNICODE_DIVISION)
+    delimiters = operators + ('(', ')')
+    tokens = []
+    i = 0
+
+    while i < len(expression_string):
+        char = expression_string[i]
+
+        if char.isspace():
+            i += 1
+            continue
+
+        is_unary_minus = False
+        if char == '-':
+            if i == 0:
+                is_unary_minus = True
+            elif tokens:
+                prev_token = tokens[-1]
+                if prev_token == '(' or prev_token in operators:
+                    is_unary_minus = True
+
+        if is_unary_minus:
+            j = i + 1
+            current_operand = '-'
+            while j < len(expression_string):
+                next_char = expression_string[j]
+                is_operand_char = next_char.isalnum() or \
+                                  re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', next_char)
+                if is_operand_char:
+                    current_operand += next_char
+                    j += 1
+                else:
+                    break
+            if current_operand == '-':
+                tokens.append('-')
+                i += 1
+            else:
+                tokens.append(current_operand)
+                i = j
+            continue
+
+        if char.isalnum() or re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char):
+            current_operand = char
+            j = i + 1
+            while j < len(expression_string):
+                next_char = expression_string[j]
+                if next_char.isalnum() or re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', next_char):
+                    current_operand += next_char
+                    j += 1
+                else:
+                    break
+            tokens.append(current_operand)
+            i = j
+            continue
+
+        if char in delimiters:
+            tokens.append(char)
+            i += 1
+            continue
+
+        tokens.append(char)
+        i += 1
+
+    return tokens
+
+
+def _random_expression(rng: random.Random, depth: int) -> str:
+    if depth == 0:
+        return str(rng.choice([rng.randint(1, 10), -rng.randint(1, 10), rng.randint(10, 999)]))
+    operator = rng.choice(['+', '-', '*', '/', '^'])
+    return f"({_random_expression(rng, depth - 1)} {operator} {_random_expression(rng, depth - 1)})"
+
+
+def _tokens_per_second(tokenize, expressions, repeat: int) -> float:
+    token_count = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for expression in expressions:
+            token_count += len(tokenize(expression))
+    return token_count / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(2024)
+    expression = Expression()
+
+    for depth in (2, 4, 6):
+        expressions = [_random_expression(rng, depth) for _ in range(200)]
+        for text in expressions:
+            assert legacy_tokenize_expression(text) == expression.tokenize_expression(text)
+
+        before = _tokens_per_second(legacy_tokenize_expression, expressions, repeat=5)
+        after = _tokens_per_second(expression.scan_tokens, expressions, repeat=5)
+        print(f"depth {depth}: legacy {before:,.0f} tokens/s | scanner {after:,.0f} tokens/s "
+              f"| x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,105 +9,71 @@ Title: Painless Pre-Algebra
 """
 
 import os
-import random
 import sys
 
-
-from utils import pylatex_pdf as pdf
-
-
-
-
-
-class PainlessPreAlgebra():
+from utils.unit import Unit
+
+# 챕터 이름 -> 'module:Class'. 단원 순서대로 나열하며, start_chapter/end_chapter는 단원 경계를 넘어 자를 수 있습니다.
+_CHAPTER_IMPORT_PATHS = {
+    # Basic Algebra
+    "PropertiesOfNumbers": "basic_algebra.properties_of_numbers.properties_of_numbers:PropertiesOfNumbers",
+    "OrderOfOperations": "basic_algebra.order_of_operations.order_of_operations:OrderOfOperations",
+    "WritingExpressions": "basic_algebra.writing_expressions.writing_expressions:WritingExpressions",
+    "EvaluatingExpressions": "basic_algebra.evaluating_expressions.evaluating_expressions:EvaluatingExpressions",
+    "OneStepEquations": "basic_algebra.one_step_equations.one_step_equations:OneStepEquations",
+    # Rational Numbers
+    "Simplify": "rational_numbers.simplify.simplify:Simplify",
+    "WritingFractionsAsDecimals":
+        "rational_numbers.writing_fractions_as_decimals.writing_fractions_as_decimals:WritingFractionsAsDecimals",
+    "WritingDecimalAsFractions":
+        "rational_numbers.writing_decimal_as_fractions.writing_decimal_as_fractions:WritingDecimalAsFractions",
+    "ComparingFractionsAndDecimals":
+        "rational_numbers.comparing_fractions_and_decimals.comparing_fractions_and_decimals:"
+        "ComparingFractionsAndDecimals",
+    "OrderingFractionsAndDecimals":
+        "rational_numbers.ordering_fractions_and_decimals.ordering_fractions_and_decimals:"
+        "OrderingFractionsAndDecimals",
+    "AddingAndSubtractingFractions":
+        "rational_numbers.adding_and_subtracting_fractions.adding_and_subtracting_fractions:"
+        "AddingAndSubtractingFractions",
+    "MultiplyingFractions": "rational_numbers.multiplying_fractions.multiplying_fractions:MultiplyingFractions",
+    "DividingFractions": "rational_numbers.dividing_fractions.dividing_fractions:DividingFractions",
+    # Ratios And Proportions
+    "RatioRateUnitRate": "ratios_and_proportions.ratio_rate_unit_rate.ratio_rate_unit_rate:RatioRateUnitRate",
+}
+
+
+class PainlessPreAlgebra(Unit):
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self):
+    def __init__(self, rng=None):
+        super().__init__(_CHAPTER_IMPORT_PATHS, rng)
         self._title = "Painless Pre-Algebra"
-        self.chapter_classes = {"MultiflyingFractions": "test"}
-        self.chapter = list(self.chapter_classes.keys())
 
     @property
-    def title(self):
-        """Returns the title of the problem type."""
-        return self._title
-
-    @title.setter
-    def title(self, value):
-        """Sets the title of the problem type."""
-        if not isinstance(value, str) or not value.strip():
-            raise ValueError("Title must be a non-empty string.")
-        self._title = value
-
-    def get_problem_answer(self, start_chapter: str = None, end_chapter: str = None) -> tuple[list[str], list[str]]:
-
-        if start_chapter and end_chapter:
-            try:
-                start_index = self.chapter.index(start_chapter)
-                end_index = self.chapter.index(end_chapter)
-                selected_chapters = self.chapter[start_index:end_index+1]
-            except ValueError:
-                print(f"Error: Invalid chapter name provided. '{start_chapter}', '{end_chapter}'")
-                return [], []
-        else:
-            selected_chapters = self.chapter
-
-        if not selected_chapters:
-            print("Error: The specific chapter range is empty.")
-            return [], []
-
-        random.shuffle(selected_chapters)
-        problem_set = []
-        answer_set = []
-
-        for chapter_name in selected_chapters:
-            chapter_instance = self.chapter_classes.get(chapter_name)
-
-            if chapter_instance:
-                try:
-                    problem, answers = chapter_instance.get_problem_answer()
-                    problem_set.append(problem)
-                    answer_set.append(answers)
-                except Exception as e:
-                    print(f"Error generating problem for chapter '{chapter_name}': {e}")
-            else:
-                print(f"Error: Chapter '{chapter_name}' not found in registry.")
-
-        print(f"Problem set: {len(problem_set)}")
-        print(f"Answers set: {len(answer_set)}")
-        return problem_set, answer_set
-
-    def generate_practice(self, start_chapter: str = None, end_chapter: str = None, problem_set: int = 1):
-        num_of_problems = 0
-        problem_list = []
-        answer_list = []
-
-        while num_of_problems < problem_set:
-            problem, answer = self.get_problem_answer(start_chapter, end_chapter)
-
-            # Check if the returned lists are not empty
-            if not problem:
-                print("No problems were generated in the current set. Stopping.")
-                break
+    def units(self) -> list[str]:
+        """Unit package names ('basic_algebra', ...) in chapter order."""
+        return list(dict.fromkeys(import_path.partition('.')[0] for import_path in _CHAPTER_IMPORT_PATHS.values()))
 
-            problem_list.extend(problem)
-            answer_list.extend(answer)
-            num_of_problems += 1
+    def chapters_of_units(self, units) -> list[str]:
+        """
+        Chapter names of the given units (package names such as 'rational_numbers'), in chapter order.
 
-        try:
-            pdf.generate_pdf_files(f"{self.title} Problems", problem_list, num_column=2, row_spacing=400)
-            pdf.generate_pdf_files(f"{self.title} Answers", answer_list, num_column=2)
-            print("PDF 파일이 성공적으로 생성되었습니다.")
-        except ImportError:
-            print("Error: 'pdf_handling' 모듈을 찾을 수 없습니다.")
-        except AttributeError:
-            print("Error: 'pdf_handling' 모듈에 'generate_pdf_files' 함수가 없습니다.")
+        Raises:
+            ValueError: If a unit is unknown.
+        """
+        chapter_units = {chapter_name: import_path.partition('.')[0]
+                         for chapter_name, import_path in _CHAPTER_IMPORT_PATHS.items()}
+        unknown_units = set(units) - set(chapter_units.values())
+        if unknown_units:
+            raise ValueError(f"Unknown unit(s): {', '.join(sorted(unknown_units))}")
+        return [chapter_name for chapter_name in self.chapter if chapter_units[chapter_name] in units]
 
 
 def main():
     topic_instance = PainlessPreAlgebra()
     # self.chapter = ['ExpandedForm', 'TransformNumberBases', 'DecimalToBinary', 'BinaryAndHexadecimal', 'FindNumber', 'AdditionAndSubtraction', 'RGBCoding']
-    topic_instance.title = "Rational Numbers"
+    topic_instance.title = "Painless Pre-Algebra"
     topic_instance.generate_practice(None, None, 2)
 
 if __name__ == "__main__":
@@ -9,19 +9,20 @@ Title: Adding And Subtracting Fractions
 """
 
 import os
-import random
 import sys
 from fractions import Fraction
 
-from utils import pylatex_pdf as pdf
-from utils.fractions import to_latex_friction, simplify_fraction
+from utils.fraction_array import FractionArray, numpy_generator
+from utils.fractions import parse_latex_fractions, to_latex_friction, simplify_fraction
+from utils.rng import as_random
 
 
 class AddingAndSubtractingFractions:
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self._title = "Adding And Subtracting Fractions"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -35,6 +36,16 @@ class AddingAndSubtractingFractions:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
@@ -43,29 +54,62 @@ class AddingAndSubtractingFractions:
         problem_text, answer_text = None, None
 
         # Implement the problem generation logic here.
-        numerator1 = random.randint(2, 20)
-        denominator1 = random.randint(2, 20)
+        numerator1 = self._rng.randint(2, 20)
+        denominator1 = self._rng.randint(2, 20)
 
-        numerator2 = random.randint(2, 20)
-        denominator2 = random.randint(2, 20)
+        numerator2 = self._rng.randint(2, 20)
+        denominator2 = self._rng.randint(2, 20)
 
         fraction1 = Fraction(numerator1, denominator1)
         fraction2 = Fraction(numerator2, denominator2)
 
-        random_operator = random.choice(["+", "-"])
+        random_operator = self._rng.choice(["+", "-"])
 
         if random_operator == "+":
             answer = fraction1 + fraction2
-            simplified_answer_numerator, simplied_answer_denominator = simplify_fraction(answer.numerator, answer.denominator)
-            problem_text = f"Add fractions and simplify if possible. \\\\ \\par \\qquad \\qquad {to_latex_friction(numerator1, denominator1)} + {to_latex_friction(numerator2, denominator2)} ="
         else:
             answer = fraction1 - fraction2
-            simplified_answer_numerator, simplied_answer_denominator = simplify_fraction(answer.numerator,
-                                                                                                    answer.denominator)
-            problem_text = f"Subtract fractions and simplify if possible. \\\\ \\par \\qquad \\qquad {to_latex_friction(numerator1, denominator1)} - {to_latex_friction(numerator2, denominator2)} ="
+        simplified_answer_numerator, simplied_answer_denominator = simplify_fraction(answer.numerator, answer.denominator)
+
+        problem_text = self._problem_text(numerator1, denominator1, numerator2, denominator2, random_operator)
         answer_text = f"{to_latex_friction(simplified_answer_numerator, simplied_answer_denominator)}"
         return problem_text, answer_text
 
+    @staticmethod
+    def _problem_text(numerator1: int, denominator1: int, numerator2: int, denominator2: int, operator: str) -> str:
+        instruction = "Add" if operator == "+" else "Subtract"
+        return (f"{instruction} fractions and simplify if possible. \\\\ \\par \\qquad \\qquad "
+                f"{to_latex_friction(numerator1, denominator1)} {operator} {to_latex_friction(numerator2, denominator2)} =")
+
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once with FractionArray arithmetic.
+        Returns: (problem_list, answer_list)
+        """
+        generator = numpy_generator(self._rng)
+        fractions1 = FractionArray.random(number_of_problems, (2, 20), (2, 20), generator)
+        fractions2 = FractionArray.random(number_of_problems, (2, 20), (2, 20), generator)
+        is_addition = generator.integers(0, 1, size=number_of_problems, endpoint=True) == 1
+
+        answers = (fractions1 + fractions2).where(is_addition, fractions1 - fractions2)
+
+        problem_list = [self._problem_text(n1, d1, n2, d2, "+" if addition else "-")
+                        for (n1, d1), (n2, d2), addition
+                        in zip(fractions1.tolist(), fractions2.tolist(), is_addition.tolist())]
+        answer_list = [to_latex_friction(n, d) for n, d in answers.tolist()]
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the operator and the two fractions as shown,
+        with the fractions sorted for addition so a + b and b + a share a key.
+        """
+        fractions = parse_latex_fractions(problem_text)
+        if problem_text.startswith("Add"):
+            return "+", tuple(sorted(fractions))
+        return "-", tuple(fractions)
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -74,24 +118,27 @@ class AddingAndSubtractingFractions:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
@@ -9,18 +9,30 @@ Title: Comparing And Ordering Fractions And Decimals
 """
 
 import os
-import random
 import sys
+from fractions import Fraction
 
-from utils import pylatex_pdf as pdf
+import numpy as np
+
+from utils.fraction_array import FractionArray, numpy_generator
 from utils.fractions import to_latex_friction
+from utils.ordering import (OrderedItems, RationalItem, compare_items, decimal_item, format_chain,
+                            fraction_item)
+from utils.rng import as_random
 
 
 class ComparingFractionsAndDecimals:
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self):
+    _MAX_ITEM_ATTEMPTS = 100
+    _ORDERING_DENOMINATORS = (2, 3, 4, 5, 8, 10)
+    _RELATIONS = np.array(['<', '=', '>'])
+
+    def __init__(self, rng=None):
         self._title = "Comparing Fractions And Decimals"
+        self._rng = as_random(rng)
+        self._number_of_items = 4
+        self._near_tie_gap = Fraction(0)
 
     @property
     def title(self):
@@ -34,92 +46,108 @@ class ComparingFractionsAndDecimals:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
+    @property
+    def number_of_items(self) -> int:
+        """Number of rational numbers in an ordering problem."""
+        return self._number_of_items
+
+    @number_of_items.setter
+    def number_of_items(self, value: int):
+        if not isinstance(value, int) or value < 2:
+            raise ValueError("Number of items must be an integer greater than 1.")
+        self._number_of_items = value
+
+    @property
+    def near_tie_gap(self) -> Fraction:
+        """Unequal numbers closer than this are not placed in the same ordering problem (0: no limit)."""
+        return self._near_tie_gap
+
+    @near_tie_gap.setter
+    def near_tie_gap(self, value):
+        value = Fraction(value)
+        if value < 0:
+            raise ValueError("Near-tie gap must not be negative.")
+        self._near_tie_gap = value
+
     def make_comparison_problem(self) -> tuple[str, str]:
         problem_text, answer_text = None, None
 
-        numerator1 = random.randint(1, 20)
-        denominator1 = random.randint(2, 20)
-        decimal1 = numerator1 / denominator1
-        formatted_decimal1 = f"{decimal1:.2f}"
+        numerator1 = self._rng.randint(1, 20)
+        denominator1 = self._rng.randint(2, 20)
 
-        numerator2 = random.randint(1, 20)
-        denominator2 = random.randint(2, 20)
-        decimal2 = numerator2 / denominator2
-        formatted_decimal2 = f"{decimal2:.2f}"
+        numerator2 = self._rng.randint(1, 20)
+        denominator2 = self._rng.randint(2, 20)
 
+        item1 = fraction_item(numerator1, denominator1)
         term1 = to_latex_friction(numerator1, denominator1)
-        term2 = random.choice([formatted_decimal2, to_latex_friction(numerator2, denominator2)])
 
-        problem_text = f"Compare. User >, < or =. \\\\ \\par \\qquad \\qquad {term1} ___ {term2}"
-        if decimal1 > decimal2:
-            answer_text = f"{term1}  > {term2}"
-        elif decimal1 < decimal2:
-            answer_text = f"{term1}  < {term2}"
+        if self._rng.random() < 0.5:
+            # 소수는 화면에 표시된 자리수 그대로의 값으로 비교합니다. (예: 1/3 > 0.33)
+            item2 = decimal_item(f"{numerator2 / denominator2:.2f}")
+            term2 = item2.text
         else:
-            answer_text = f"{term1}  = {term2}"
+            item2 = fraction_item(numerator2, denominator2)
+            term2 = to_latex_friction(numerator2, denominator2)
 
-        # Implement the problem generation logic here.
+        return self._comparison_text(term1, term2, compare_items(item1, item2))
 
+    @staticmethod
+    def _comparison_text(term1: str, term2: str, relation: str) -> tuple[str, str]:
+        problem_text = f"Compare. User >, < or =. \\\\ \\par \\qquad \\qquad {term1} ___ {term2}"
+        answer_text = f"{term1}  {relation} {term2}"
         return problem_text, answer_text
 
-    def make_ordering_problem(self) -> tuple[str, str]:
-        # 사용할 상수 정의
-        number_of_generation = 4  # 생성할 숫자의 개수
+    def _random_ordering_item(self) -> RationalItem:
+        # 분수 또는 소수 중 무작위 선택
+        if self._rng.random() < 0.5:
+            # 간단한 분수 생성 (예: 1/4, 2/5)
+            return fraction_item(self._rng.randint(1, 9), self._rng.choice(self._ORDERING_DENOMINATORS))
+
+        # 간단한 소수 생성 (예: 0.25, 1.5)
+        integer_part = self._rng.randint(0, 2)
+        decimal_part = self._rng.randint(10, 99)
+        return decimal_item(f"{integer_part}.{decimal_part}")
 
+    def make_ordering_problem(self) -> tuple[str, str]:
         # 0.5 미만이면 오름차순(ascending), 0.5 이상이면 내림차순(descending)
-        is_ascending = random.random() < 0.5
+        is_ascending = self._rng.random() < 0.5
         order_type = "ascending" if is_ascending else "descending"
 
-        # 문제에 사용될 숫자 데이터를 저장할 목록
-        # data_objects: 원본 문자열, float 값, 타입(fraction/decimal)을 저장
-        data_objects = []
-
-        # 1. 데이터 생성
-        for _ in range(number_of_generation):
-            # 분수 또는 소수 중 무작위 선택
-            is_fraction = random.random() < 0.5
-
-            if is_fraction:
-                # 간단한 분수 생성 (예: 1/4, 2/5)
-                n = random.randint(1, 9)
-                d = random.choice([2, 3, 4, 5, 8, 10])
-                # 분수 문자열과 십진수 값
-                original_str = f"\\frac{{{n}}}{{{d}}}"  # LaTeX 분수 형식
-                float_value = n / d
+        # 1. 데이터 생성: 항목을 정렬된 상태로 추가하면서 근접한 값(near-tie)을 걸러냅니다.
+        ordered_items = OrderedItems(self._near_tie_gap)
+        problem_items = []
+        for _ in range(self._number_of_items):
+            for _ in range(self._MAX_ITEM_ATTEMPTS):
+                item = self._random_ordering_item()
+                if ordered_items.add(item):
+                    problem_items.append(item)
+                    break
             else:
-                # 간단한 소수 생성 (예: 0.25, 1.5)
-                integer_part = random.randint(0, 2)
-                decimal_part = random.randint(10, 99) / 100
-                float_value = integer_part + decimal_part
-                # 소수 문자열
-                original_str = f"{float_value:.2f}"
-
-            data_objects.append({
-                "original_str": original_str,
-                "float_value": float_value
-            })
+                raise ValueError(f"Could not draw {self._number_of_items} items at least "
+                                 f"{self._near_tie_gap} apart.")
 
         # 2. 문제 문자열 생성
-        # LaTeX 환경에서는 모든 숫자를 수학 모드로 감싸야 합니다.
         # 문제에 제시될 숫자들을 랜덤하게 섞어줍니다.
-        random.shuffle(data_objects)
+        self._rng.shuffle(problem_items)
 
-        problem_numbers = [f"${d['original_str']}$" for d in data_objects]
+        problem_numbers = [f"${item.text}$" for item in problem_items]
         problem_text = (f"list following rational numbers to {order_type} orders: \\\\ \\par \\qquad \\qquad"
                         f"[{', '.join(problem_numbers)}]"
                         )
 
-        # 3. 정렬 및 답안 문자열 생성
-        # float_value를 기준으로 정렬합니다. (is_ascending이 True면 오름차순)
-        sorted_objects = sorted(
-            data_objects,
-            key=lambda x: x['float_value'],
-            reverse=not is_ascending  # 오름차순(is_ascending=True)이면 reverse=False
-        )
-
-        # 정렬된 순서대로 답안 문자열을 생성합니다.
-        answer_numbers = [f"${d['original_str']}$" for d in sorted_objects]
-        answer_text = " < ".join(answer_numbers) if is_ascending else " > ".join(answer_numbers)
+        # 3. 답안 문자열 생성: 같은 값은 '='로 연결합니다.
+        sorted_items = ordered_items.ascending() if is_ascending else ordered_items.descending()
+        answer_text = format_chain(sorted_items, is_ascending)
 
         return problem_text, answer_text
 
@@ -143,12 +171,53 @@ class ComparingFractionsAndDecimals:
         #problem_pool.append(problem)
         #answer_pool.append(answer)
 
-        problem_text = random.choice(problem_pool)
+        problem_text = self._rng.choice(problem_pool)
         index = problem_text.index(problem_text)
         answer_text = answer_pool[index]
 
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems comparison problems at once without logging them.
+        The numbers are drawn as NumPy arrays and all comparisons are made with one
+        FractionArray operation.
+        Returns: (problem_list, answer_list)
+        """
+        generator = numpy_generator(self._rng)
+        firsts = FractionArray.random(number_of_problems, (1, 20), (2, 20), generator)
+        seconds = FractionArray.random(number_of_problems, (1, 20), (2, 20), generator)
+        is_decimal = generator.random(number_of_problems) < 0.5
+
+        # 소수는 화면에 표시된 자리수 그대로의 값(백분의 몇)으로 비교합니다.
+        decimal_texts = [f"{numerator / denominator:.2f}" for numerator, denominator in seconds.tolist()]
+        hundredths = np.array([int(text.replace('.', '')) for text in decimal_texts], dtype=np.int64)
+        shown = FractionArray(hundredths, 100, reduce=False).where(is_decimal, seconds)
+
+        differences = firsts - shown
+        relations = self._RELATIONS[differences.sign() + 1].tolist()
+
+        problem_list = []
+        answer_list = []
+        for (numerator1, denominator1), (numerator2, denominator2), decimal, decimal_text, relation in zip(
+                firsts.tolist(), seconds.tolist(), is_decimal.tolist(), decimal_texts, relations):
+            term1 = to_latex_friction(numerator1, denominator1)
+            term2 = decimal_text if decimal else to_latex_friction(numerator2, denominator2)
+            problem_text, answer_text = self._comparison_text(term1, term2, relation)
+            problem_list.append(problem_text)
+            answer_list.append(answer_text)
+
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the two terms as shown, sorted, so comparing
+        a with b and b with a share a key.
+        """
+        terms = problem_text.rsplit("\\qquad ", 1)[-1].split(" ___ ")
+        return tuple(sorted(terms))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -157,24 +226,27 @@ class ComparingFractionsAndDecimals:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
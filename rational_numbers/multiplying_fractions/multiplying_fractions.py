@@ -12,16 +12,18 @@ import os
 import sys
 from fractions import Fraction
 
-from utils import pylatex_pdf as pdf
-from utils.fractions import generate_random_fraction, to_latex_friction
+from utils.fraction_array import FractionArray, numpy_generator
+from utils.fractions import generate_random_fraction, parse_latex_fractions, to_latex_friction
 from utils.unicodes import UNICODE_PRODUCT
+from utils.rng import as_random
 
 
 class MultiplyingFractions:
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self):
+    def __init__(self, rng=None):
         self._title = "Multiplying Fractions"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -35,6 +37,16 @@ class MultiplyingFractions:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
@@ -44,10 +56,10 @@ class MultiplyingFractions:
         geometry_options = {"type": "all",
                             "decimal_limit": 3,
                             "fraction_limit": 10}
-        numerator1, denominator1 = generate_random_fraction(geometry_options)
-        numerator2, denominator2 = generate_random_fraction(geometry_options)
+        numerator1, denominator1 = generate_random_fraction(geometry_options, self._rng)
+        numerator2, denominator2 = generate_random_fraction(geometry_options, self._rng)
 
-        problem_text = f"Multiply fractions and express in simplest form. \\\\ \\par \\qquad \\qquad {to_latex_friction(numerator1, denominator1)} $\cdot$ {to_latex_friction(numerator2, denominator2)} ="
+        problem_text = self._problem_text(numerator1, denominator1, numerator2, denominator2)
         answer = Fraction(numerator1, denominator1) * Fraction(numerator2, denominator2)
         answer_text = f"{to_latex_friction(answer.numerator, answer.denominator)}"
 
@@ -55,6 +67,31 @@ class MultiplyingFractions:
 
         return problem_text, answer_text
 
+    @staticmethod
+    def _problem_text(numerator1: int, denominator1: int, numerator2: int, denominator2: int) -> str:
+        return (f"Multiply fractions and express in simplest form. \\\\ \\par \\qquad \\qquad "
+                f"{to_latex_friction(numerator1, denominator1)} $\\cdot$ {to_latex_friction(numerator2, denominator2)} =")
+
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once with FractionArray arithmetic.
+        Returns: (problem_list, answer_list)
+        """
+        generator = numpy_generator(self._rng)
+        fractions1 = FractionArray.random(number_of_problems, (1, 10), (2, 10), generator)
+        fractions2 = FractionArray.random(number_of_problems, (1, 10), (2, 10), generator)
+        answers = fractions1 * fractions2
+
+        problem_list = [self._problem_text(n1, d1, n2, d2)
+                        for (n1, d1), (n2, d2) in zip(fractions1.tolist(), fractions2.tolist())]
+        answer_list = [to_latex_friction(n, d) for n, d in answers.tolist()]
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """Canonical key for deduplication (see utils.dedup): the two fractions as shown, sorted."""
+        return tuple(sorted(parse_latex_fractions(problem_text)))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -63,24 +100,27 @@ class MultiplyingFractions:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=2, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=2, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
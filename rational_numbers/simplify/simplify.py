@@ -9,20 +9,27 @@ Title: Simplify
 """
 
 import os
-import random
 import sys
+from bisect import bisect_right
+from itertools import accumulate
 
-from utils import pylatex_pdf as pdf
-from math import gcd
+import numpy as np
 
-from utils.fractions import simplify_fraction
+from utils.fraction_array import FractionArray, numpy_generator
+from utils.fractions import coprime_pair_table, parse_latex_fractions, simplify_fraction
+from utils.rng import as_random
 
 
 class Simplify:
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self) -> None:
+    def __init__(self, rng=None) -> None:
         self._title = "Simplify"
+        self._rng = as_random(rng)
+        self._number_limit = 300
+        self._min_common_factor = 2
+        self._max_common_factor = None  # None이면 number_limit // 2
+        self._sampling_table = None
 
     @property
     def title(self):
@@ -36,27 +43,138 @@ class Simplify:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
+    @property
+    def number_limit(self) -> int:
+        """Largest numerator or denominator shown in a problem."""
+        return self._number_limit
+
+    @number_limit.setter
+    def number_limit(self, value: int):
+        if not isinstance(value, int) or value < 4:
+            raise ValueError("Number limit must be an integer of at least 4.")
+        self._number_limit = value
+        self._sampling_table = None
+
+    @property
+    def min_common_factor(self) -> int:
+        """Smallest common factor that has to be divided out."""
+        return self._min_common_factor
+
+    @min_common_factor.setter
+    def min_common_factor(self, value: int):
+        if not isinstance(value, int) or value < 2:
+            raise ValueError("Minimum common factor must be an integer greater than 1.")
+        self._min_common_factor = value
+        self._sampling_table = None
+
+    @property
+    def max_common_factor(self):
+        """Largest common factor that has to be divided out (None: no limit)."""
+        return self._max_common_factor
+
+    @max_common_factor.setter
+    def max_common_factor(self, value):
+        if value is not None and (not isinstance(value, int) or value < 2):
+            raise ValueError("Maximum common factor must be None or an integer greater than 1.")
+        self._max_common_factor = value
+        self._sampling_table = None
+
+    def _get_sampling_table(self):
+        """
+        Builds (pairs, factors, cumulative_counts) for the current limits.
+
+        A problem numerator/denominator is factor * (p, q) with (p, q) in lowest terms, so
+        every valid problem appears exactly once as (factor, index into the coprime table).
+        cumulative_counts[i] is the number of problems whose factor is factors[0..i], so one
+        uniform integer below cumulative_counts[-1] picks a problem uniformly at random.
+        """
+        if self._sampling_table is None:
+            max_factor = self._number_limit // 2
+            if self._max_common_factor is not None:
+                max_factor = min(max_factor, self._max_common_factor)
+
+            pairs, prefix_counts = coprime_pair_table(self._number_limit // self._min_common_factor)
+            factors = [factor for factor in range(self._min_common_factor, max_factor + 1)
+                       if prefix_counts[self._number_limit // factor] > 0]
+            if not factors:
+                raise ValueError(f"No reducible fraction up to {self._number_limit} has a common factor "
+                                 f"between {self._min_common_factor} and {max_factor}.")
+
+            cumulative_counts = list(accumulate(prefix_counts[self._number_limit // factor] for factor in factors))
+            self._sampling_table = (pairs, factors, cumulative_counts)
+        return self._sampling_table
+
+    def _sample_fraction(self) -> tuple[int, int]:
+        """Draws a reducible (numerator, denominator) uniformly without retries."""
+        pairs, factors, cumulative_counts = self._get_sampling_table()
+        draw = self._rng.randrange(cumulative_counts[-1])
+        position = bisect_right(cumulative_counts, draw)
+        offset = draw - (cumulative_counts[position - 1] if position else 0)
+
+        factor = factors[position]
+        numerator, denominator = pairs[offset]
+        return numerator * factor, denominator * factor
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
         Returns: (problem_text, answer_text)
         """
         problem_text, answer_text = None, None
-        gcd_value = 1
-        while gcd_value == 1:
-            numerator = random.randint(1, 300)
-            denominator = random.randint(1, 300)
-            gcd_value = gcd(numerator, denominator)
+        numerator, denominator = self._sample_fraction()
 
         answer_numerator, answer_denomirator = simplify_fraction(numerator, denominator)
-        problem_text = (f"Simplify fractions: \\\\ \\par \\qquad \\qquad"
-                        f"$\\frac{{{numerator}}}{{{denominator}}}$")
+        problem_text = self._problem_text(numerator, denominator)
         answer_text = f"$\\frac{{{answer_numerator}}}{{{answer_denomirator}}}$"
         #answer_text = f"{answer_numerator}/{answer_denomirator}"
         # Implement the problem generation logic here.
 
         return problem_text, answer_text
 
+    @staticmethod
+    def _problem_text(numerator: int, denominator: int) -> str:
+        return (f"Simplify fractions: \\\\ \\par \\qquad \\qquad"
+                f"$\\frac{{{numerator}}}{{{denominator}}}$")
+
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once with FractionArray reduction.
+        Returns: (problem_list, answer_list)
+        """
+        generator = numpy_generator(self._rng)
+        pairs, factors, cumulative_counts = self._get_sampling_table()
+        pairs = np.array(pairs, dtype=np.int64)
+        factors = np.array(factors, dtype=np.int64)
+        cumulative_counts = np.array(cumulative_counts, dtype=np.int64)
+
+        # _sample_fraction과 같은 방법: 정수 하나로 공약수와 기약분수를 함께 고릅니다.
+        draws = generator.integers(0, cumulative_counts[-1], size=number_of_problems)
+        positions = np.searchsorted(cumulative_counts, draws, side='right')
+        offsets = draws - np.where(positions > 0, cumulative_counts[positions - 1], 0)
+
+        problems = FractionArray(pairs[offsets, 0] * factors[positions], pairs[offsets, 1] * factors[positions],
+                                 reduce=False)
+        answers = problems.reduced()
+
+        problem_list = [self._problem_text(n, d) for n, d in problems.tolist()]
+        answer_list = [f"$\\frac{{{n}}}{{{d}}}$" for n, d in answers.tolist()]
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """Canonical key for deduplication (see utils.dedup): the (numerator, denominator) shown."""
+        return tuple(parse_latex_fractions(problem_text))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -65,24 +183,27 @@ class Simplify:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=2, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=5)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=2, answer_columns=5, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'utils.pylatex_pdf' module.")
@@ -9,20 +9,26 @@ Title: Writing Decimal As Fractions
 """
 
 import os
-import random
 import sys
 from math import gcd
 
-from utils import pylatex_pdf as pdf
-from utils.fractions import is_terminating_decimal, simplify_fraction, to_latex_decimal
+import numpy as np
+
+from utils.fraction_array import FractionArray, numpy_generator
+from utils.fractions import is_terminating_decimal, parse_latex_fractions, simplify_fraction, to_latex_decimal
+from utils.rng import as_random
 
 
 class WritingDecimalAsFractions:
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self):
+    # generate_batch가 남은 문제 수의 몇 배만큼 후보를 한 번에 뽑는지 (대부분의 후보는 순환소수라 버려집니다.)
+    _BATCH_OVERSAMPLING = 8
+
+    def __init__(self, rng=None):
         super().__init__()
         self._title = "Writing Decimal As Fractions"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -36,6 +42,16 @@ class WritingDecimalAsFractions:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
@@ -45,13 +61,13 @@ class WritingDecimalAsFractions:
 
         # Implement the problem generation logic here.
         while True:
-            numerator = random.randint(1, 100)
-            bool_negation = random.choice([True, False])
+            numerator = self._rng.randint(1, 100)
+            bool_negation = self._rng.choice([True, False])
 
             if bool_negation:
                 numerator *= -1
 
-            denominator = random.randint(2, 100)
+            denominator = self._rng.randint(2, 100)
 
             gcd_value = gcd(numerator, denominator)
 
@@ -72,11 +88,49 @@ class WritingDecimalAsFractions:
             else:
                 break
 
+        return self._problem_text(simplified_numerator, simplified_denominator)
+
+    @staticmethod
+    def _problem_text(simplified_numerator: int, simplified_denominator: int) -> tuple[str, str]:
         problem_text = f"Convert the decimal to the fraction. \\\\ \\par \\qquad \\qquad {simplified_numerator/simplified_denominator}"
         answer_text = f"$\\frac{{{simplified_numerator}}}{{{simplified_denominator}}}$"
 
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Candidates are drawn, reduced and checked for terminating decimals as NumPy arrays;
+        only the survivors are checked for the 3-digit limit one by one.
+        Returns: (problem_list, answer_list)
+        """
+        generator = numpy_generator(self._rng)
+        problem_list = []
+        answer_list = []
+        while len(problem_list) < number_of_problems:
+            size = (number_of_problems - len(problem_list)) * self._BATCH_OVERSAMPLING
+            candidates = FractionArray.random(size, (1, 100), (2, 100), generator)
+            negative = generator.random(size) < 0.5
+            candidates = FractionArray(np.where(negative, -candidates.numerators, candidates.numerators),
+                                       candidates.denominators)
+
+            keep = candidates.is_terminating() & (candidates.numerators != candidates.denominators)
+            for numerator, denominator in candidates[keep].tolist():
+                if to_latex_decimal(numerator, denominator, 3).startswith("Error"):
+                    continue
+                problem_text, answer_text = self._problem_text(numerator, denominator)
+                problem_list.append(problem_text)
+                answer_list.append(answer_text)
+                if len(problem_list) == number_of_problems:
+                    break
+
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """Canonical key for deduplication (see utils.dedup): the reduced fraction of the answer."""
+        return tuple(parse_latex_fractions(answer_text))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -85,21 +139,20 @@ class WritingDecimalAsFractions:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         # PDF file path setup
         current_dir = os.path.dirname(os.path.abspath(__file__))
         parent_dir = os.path.dirname(current_dir)
@@ -109,8 +162,12 @@ class WritingDecimalAsFractions:
             sys.path.append(module_path)
 
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=3)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=3, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
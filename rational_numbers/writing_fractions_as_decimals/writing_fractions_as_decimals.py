@@ -9,19 +9,25 @@ Title: Writing Fractions As Decimals
 """
 
 import os
-import random
 import sys
 from math import gcd
 
-from utils import pylatex_pdf as pdf
-from utils.fractions import is_terminating_decimal, simplify_fraction
+import numpy as np
+
+from utils.fraction_array import FractionArray, numpy_generator
+from utils.fractions import is_terminating_decimal, parse_latex_fractions, simplify_fraction, to_latex_decimal
+from utils.rng import as_random
 
 
 class WritingFractionsAsDecimals:
     """A class template for generating and handling math-related problems."""
 
-    def __init__(self):
+    # generate_batch가 남은 문제 수의 몇 배만큼 후보를 한 번에 뽑는지 (자리수가 긴 후보는 버려집니다.)
+    _BATCH_OVERSAMPLING = 2
+
+    def __init__(self, rng=None):
         self._title = "Writing Fractions As Decimals"
+        self._rng = as_random(rng)
         self._max_number_repeating = 4
 
     @property
@@ -36,60 +42,24 @@ class WritingFractionsAsDecimals:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def to_decimal_string(self, num: int, den: int) -> str:
         """
         분수를 소수 문자열로 변환합니다. 순환 소수의 경우 LaTeX \overline{}로 표기합니다.
 
         분자(num)와 분모(den)는 기약분수 상태여야 합니다.
+        소수 전개는 utils.fractions의 캐시를 사용하며, 음수 분수는 절댓값의 전개 앞에 '-'를 붙입니다.
         """
-
-        # 정수 부분
-        integer_part = num // den
-        remainder = num % den
-
-        if remainder == 0:
-            return str(integer_part)
-
-        # 소수 부분 계산
-        visited_remainders = {}  # (나머지: 자리수)
-        decimal_digits = []
-        position = 0
-
-        while remainder != 0 and remainder not in visited_remainders:
-            visited_remainders[remainder] = position
-
-            # 다음 자리수 계산
-            remainder *= 10
-            digit = remainder // den
-            remainder %= den
-
-            decimal_digits.append(str(digit))
-            position += 1
-
-        decimal_str = "".join(decimal_digits)
-
-        if remainder == 0:
-            # 유한 소수
-            if len(decimal_str) > self._max_number_repeating:
-                return f"Error: decimal points is too large. {decimal_str}"
-            else:
-                return f"{integer_part}.{decimal_str}"
-        else:
-            # 순환 소수
-            start_pos = visited_remainders[remainder]
-
-            non_repeating_part = decimal_str[:start_pos]
-            repeating_part = decimal_str[start_pos:]
-
-            if  len(repeating_part)+len(non_repeating_part) > self._max_number_repeating:
-                return f"Error: repeating part is too large. {repeating_part}"
-
-            # LaTeX 순환 마디 표기: \overline{...} 사용
-            if non_repeating_part:
-                return f"{integer_part}.{non_repeating_part}$\\overline{{{repeating_part}}}$"
-            else:
-                return f"{integer_part}.$\\overline{{{repeating_part}}}$"
-
+        return to_latex_decimal(num, den, self._max_number_repeating)
 
     def generate_problem(self) -> tuple[str, str]:
         """
@@ -99,13 +69,13 @@ class WritingFractionsAsDecimals:
         problem_text, answer_text = None, None
 
         while True:
-            numerator = random.randint(1, 100)
-            bool_negation = random.choice([True, False])
+            numerator = self._rng.randint(1, 100)
+            bool_negation = self._rng.choice([True, False])
 
             if bool_negation:
                 numerator *= -1
 
-            denominator = random.randint(2, 100)
+            denominator = self._rng.randint(2, 100)
 
             gcd_value = gcd(numerator, denominator)
 
@@ -124,13 +94,61 @@ class WritingFractionsAsDecimals:
             else:
                 break
 
+        # Implement the problem generation logic here.
+
+        return self._problem_text(numerator, denominator, decimal_value, decimal_type)
+
+    @staticmethod
+    def _problem_text(numerator: int, denominator: int, decimal_value: str, decimal_type: str) -> tuple[str, str]:
         problem_text = f"Convert the fraction to a decimal, and determine the type of decimal: \\\\ \\par \\qquad \\qquad $\\frac{{{numerator}}}{{{denominator}}}$"
         answer_text = f"{decimal_value}, {decimal_type}"
 
-        # Implement the problem generation logic here.
-
         return problem_text, answer_text
 
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Candidates are drawn, reduced and classified as NumPy arrays; only the decimal strings
+        are built one by one.
+        Returns: (problem_list, answer_list)
+        """
+        generator = numpy_generator(self._rng)
+        problem_list = []
+        answer_list = []
+        while len(problem_list) < number_of_problems:
+            size = (number_of_problems - len(problem_list)) * self._BATCH_OVERSAMPLING
+            drawn = FractionArray.random(size, (1, 100), (2, 100), generator)
+            negative = generator.random(size) < 0.5
+            drawn = FractionArray(np.where(negative, -drawn.numerators, drawn.numerators), drawn.denominators,
+                                  reduce=False)
+            simplified = drawn.reduced()
+            terminating = simplified.is_terminating()
+
+            for (numerator, denominator), (simplified_numerator, simplified_denominator), is_terminating in zip(
+                    drawn.tolist(), simplified.tolist(), terminating.tolist()):
+                if numerator == denominator:
+                    continue
+                decimal_value = self.to_decimal_string(simplified_numerator, simplified_denominator)
+                if decimal_value.startswith("Error"):
+                    continue
+                decimal_type = "terminating decimal" if is_terminating else "repeating decimal"
+                problem_text, answer_text = self._problem_text(numerator, denominator, decimal_value, decimal_type)
+                problem_list.append(problem_text)
+                answer_list.append(answer_text)
+                if len(problem_list) == number_of_problems:
+                    break
+
+        return problem_list, answer_list
+
+    @staticmethod
+    def canonical_key(problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the fraction in lowest terms, so 2/4 and 1/2,
+        which have the same decimal, share a key.
+        """
+        return tuple(simplify_fraction(numerator, denominator)
+                     for numerator, denominator in parse_latex_fractions(problem_text))
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -139,21 +157,20 @@ class WritingFractionsAsDecimals:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         # PDF file path setup
         current_dir = os.path.dirname(os.path.abspath(__file__))
         parent_dir = os.path.dirname(current_dir)
@@ -163,8 +180,12 @@ class WritingFractionsAsDecimals:
             sys.path.append(module_path)
 
         try:
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=600)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=2)
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=2, row_spacing=600)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
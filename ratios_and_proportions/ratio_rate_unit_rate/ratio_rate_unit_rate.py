@@ -1,9 +1,28 @@
 import os
-import random
+import re
 import sys
 
-# Assuming 'utils' and 'pylatex_pdf' are correctly configured in the user's environment
-from utils import pylatex_pdf as pdf
+# Assuming 'utils' is correctly configured in the user's environment
+from utils.rng import as_random
+
+
+def _others_by_item(items: list[str]) -> dict[str, tuple[str, ...]]:
+    """Maps every item to the tuple of the other items."""
+    return {item: tuple(other for other in items if other != item) for item in items}
+
+
+def _template_patterns(templates, words: dict) -> tuple:
+    """
+    (template, compiled pattern) for every template: the numbers are captured and every word field
+    matches only its own words, so templates that differ in their words are told apart.
+    """
+    patterns = []
+    for template in templates:
+        pattern = re.escape(template).replace(r"\{0\}", r"(\d+)").replace(r"\{1\}", r"(\d+)")
+        for field, choices in words.items():
+            pattern = pattern.replace(re.escape(f"{{{field}}}"), f"(?:{'|'.join(map(re.escape, choices))})")
+        patterns.append((template, re.compile(pattern)))
+    return tuple(patterns)
 
 
 class RatioRateUnitRate:
@@ -39,8 +58,19 @@ class RatioRateUnitRate:
         ]
     }
 
-    def __init__(self):
+    # 매 문제마다 반복하던 준비 작업을 클래스 정의 시점에 한 번만 수행합니다.
+    _TYPE_CHOICES = tuple(_TEMPLATES)
+    _OTHER_NOUNS_A = _others_by_item(_NOUNS_A)
+    _NOUNS_B_SINGULAR = tuple(noun[:-1] for noun in _NOUNS_B)  # 복수형에서 단수형으로 변환 (예: 'teachers' -> 'teacher')
+    _NUMBER_RANGE = range(3, 31)
+    _TEMPLATE_PATTERNS = _template_patterns(
+        [template for templates in _TEMPLATES.values() for _, template in templates],
+        {'noun_a': _NOUNS_A, 'noun_b': _NOUNS_A + _NOUNS_B, 'noun_b_singular': _NOUNS_B_SINGULAR,
+         'verb': _VERBS, 'unit_a': _UNITS_A, 'unit_b': _UNITS_B})
+
+    def __init__(self, rng=None):
         self._title = "Ratio Rate Unit Rate"
+        self._rng = as_random(rng)
 
     @property
     def title(self):
@@ -54,6 +84,16 @@ class RatioRateUnitRate:
             raise ValueError("Title must be a non-empty string.")
         self._title = value
 
+    @property
+    def rng(self):
+        """Random number generator used for this chapter (random.Random or the random module)."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """Accepts None (random module), an int seed, a random.Random or a numpy Generator."""
+        self._rng = as_random(value)
+
     def generate_problem(self) -> tuple[str, str]:
         """
         Generates a single problem and its corresponding answer.
@@ -62,38 +102,21 @@ class RatioRateUnitRate:
         problem_text, answer_text = None, None
 
         # 1. 유형 선택 (Ratio, Rate, Unit Rate)
-        type_choice = random.choice(list(self._TEMPLATES.keys()))
+        type_choice = self._rng.choice(self._TYPE_CHOICES)
 
         # 2. 템플릿 및 정답 선택
-        answer, template = random.choice(self._TEMPLATES[type_choice])
+        answer, template = self._rng.choice(self._TEMPLATES[type_choice])
 
         # 3. 무작위 숫자 생성
-        num1 = random.randint(3, 30)
-        num2 = random.randint(3, 30)
+        num1 = self._rng.randint(3, 30)
+        num2 = self._rng.randint(3, 30)
 
         # 4. 문맥에 맞는 단어 선택 및 포맷팅 준비
-        context = {}
-        if type_choice == 'Ratio':
-            context['noun_a'] = random.choice(self._NOUNS_A)
-            # noun_a와 다른 noun_b를 선택
-            context['noun_b'] = random.choice([n for n in self._NOUNS_A if n != context['noun_a']])
-        elif type_choice == 'Rate':
-            context['noun_b'] = random.choice(self._NOUNS_B)
-            context['verb'] = random.choice(self._VERBS)
-            context['unit_a'] = random.choice(self._UNITS_A)
-            context['unit_b'] = random.choice(self._UNITS_B)
-        elif type_choice == 'Unit Rate':
-            context['noun_b_singular'] = random.choice(self._NOUNS_B)[
-                :-1]  # 복수형에서 단수형으로 변환 (예: 'teachers' -> 'teacher')
-            context['unit_a'] = random.choice(self._UNITS_A)
-            context['unit_b'] = random.choice(self._UNITS_B)
+        context = self._random_context(type_choice)
 
         # 5. 문제 문자열 포맷팅 및 정답 설정
         try:
-            problem_description = template.format(num1, num2, **context)
-
-            # 최종 문제 형식: "이것이 Ratio, Rate, Unit Rate 중 무엇인지 결정하십시오: [문제 내용]"
-            problem_text = f"Decide whether this is a ratio, rate, or unit rate: \\\\ \\par \\qquad {problem_description}"
+            problem_text = self._problem_text(template, num1, num2, context)
             answer_text = answer
 
         except Exception as e:
@@ -102,6 +125,63 @@ class RatioRateUnitRate:
 
         return problem_text, answer_text
 
+    def _random_context(self, type_choice: str) -> dict:
+        """Picks the nouns, verb and units used by the templates of the given type."""
+        context = {}
+        if type_choice == 'Ratio':
+            context['noun_a'] = self._rng.choice(self._NOUNS_A)
+            # noun_a와 다른 noun_b를 선택
+            context['noun_b'] = self._rng.choice(self._OTHER_NOUNS_A[context['noun_a']])
+        elif type_choice == 'Rate':
+            context['noun_b'] = self._rng.choice(self._NOUNS_B)
+            context['verb'] = self._rng.choice(self._VERBS)
+            context['unit_a'] = self._rng.choice(self._UNITS_A)
+            context['unit_b'] = self._rng.choice(self._UNITS_B)
+        elif type_choice == 'Unit Rate':
+            context['noun_b_singular'] = self._rng.choice(self._NOUNS_B_SINGULAR)
+            context['unit_a'] = self._rng.choice(self._UNITS_A)
+            context['unit_b'] = self._rng.choice(self._UNITS_B)
+        return context
+
+    @staticmethod
+    def _problem_text(template: str, num1: int, num2: int, context: dict) -> str:
+        problem_description = template.format(num1, num2, **context)
+
+        # 최종 문제 형식: "이것이 Ratio, Rate, Unit Rate 중 무엇인지 결정하십시오: [문제 내용]"
+        return f"Decide whether this is a ratio, rate, or unit rate: \\\\ \\par \\qquad {problem_description}"
+
+    def generate_batch(self, number_of_problems: int) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems problems at once without logging them.
+        Problem types and numbers are drawn in bulk.
+        Returns: (problem_list, answer_list)
+        """
+        type_choices = self._rng.choices(self._TYPE_CHOICES, k=number_of_problems)
+        numbers = self._rng.choices(self._NUMBER_RANGE, k=2 * number_of_problems)
+
+        problem_list = []
+        answer_list = []
+        for i, type_choice in enumerate(type_choices):
+            answer, template = self._rng.choice(self._TEMPLATES[type_choice])
+            context = self._random_context(type_choice)
+            problem_list.append(self._problem_text(template, numbers[2 * i], numbers[2 * i + 1], context))
+            answer_list.append(answer)
+
+        return problem_list, answer_list
+
+    def canonical_key(self, problem_text: str, answer_text: str) -> tuple:
+        """
+        Canonical key for deduplication (see utils.dedup): the template and its numbers without the
+        nouns, verbs and units, so "12 boys to 15 girls" and "12 cats to 15 dogs" share a key.
+        Text that matches no template is its own key.
+        """
+        description = problem_text.split("\\qquad ", 1)[-1]
+        for template, pattern in self._TEMPLATE_PATTERNS:
+            match = pattern.fullmatch(description)
+            if match:
+                return template, tuple(int(number) for number in match.groups())
+        return (problem_text,)
+
     def get_problem_answer(self) -> tuple[str, str]:
         """Fetches a newly generated problem and logs it."""
         problem_text, answer_text = None, None
@@ -110,25 +190,27 @@ class RatioRateUnitRate:
 
         return problem_text, answer_text
 
-    def generate_practice(self, number_of_problems: int = 10):
-        """Generates a specified number of problems and saves them as PDF files."""
+    def iter_problems(self, number_of_problems: int = 10):
+        """Lazily yields (problem, answer) pairs as they are generated, retrying invalid pairs."""
         num_of_problems = 0
-        problem_list = []
-        answer_list = []
 
         while num_of_problems < number_of_problems:
             problem, answer = self.get_problem_answer()
-            if problem and answer:  # Only append valid problem/answer pairs
-                problem_list.append(problem)
-                answer_list.append(answer)
+            if problem and answer:  # Only yield valid problem/answer pairs
+                yield problem, answer
                 num_of_problems += 1
             else:
                 print("Warning: Failed to generate a valid problem/answer. Retrying.")
 
+    def generate_practice(self, number_of_problems: int = 10):
+        """Generates a specified number of problems and saves them as PDF files."""
         try:
-            # 문제를 1열, 정답을 4열로 PDF 생성
-            pdf.generate_pdf_files(f"{self._title} Problems", problem_list, num_column=1, row_spacing=400)
-            pdf.generate_pdf_files(f"{self._title} Answers", answer_list, num_column=4)
+            from utils import pylatex_pdf as pdf
+
+            # 문제를 1열, 정답을 4열로 PDF 생성 (생성되는 즉시 .tex 파일에 기록)
+            pdf.generate_pdf_files_streaming(f"{self._title} Problems", f"{self._title} Answers",
+                                             self.iter_problems(number_of_problems),
+                                             problem_columns=1, answer_columns=4, row_spacing=400)
             print("PDF files successfully generated.")
         except ImportError:
             print("Error: Could not find the 'pdf_handling' module. (Check utils/pdf.py module path)")
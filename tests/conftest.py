@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 테스트는 저장소 루트 기준의 import 경로(utils.*, basic_algebra.*)를 사용합니다.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
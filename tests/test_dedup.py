@@ -0,0 +1,111 @@
+import pytest
+
+from basic_algebra.evaluating_expressions.evaluating_expressions import EvaluatingExpressions
+from ratios_and_proportions.ratio_rate_unit_rate.ratio_rate_unit_rate import RatioRateUnitRate
+from rational_numbers.dividing_fractions.dividing_fractions import DividingFractions
+from rational_numbers.writing_fractions_as_decimals.writing_fractions_as_decimals import WritingFractionsAsDecimals
+from utils.dedup import BloomFilter, DedupIndex, problem_key, unique_pairs
+
+
+class _SumChapter:
+    """Chapter whose canonical key ignores the order of the two addends."""
+
+    def canonical_key(self, problem_text, answer_text):
+        return tuple(sorted(problem_text.removesuffix(" =").split(" + ")))
+
+
+def test_bloom_filter_never_misses_an_added_key():
+    bloom = BloomFilter(1000, error_rate=0.01)
+
+    added = sum(bloom.add(('key', i)) for i in range(1000))
+
+    assert all(('key', i) in bloom for i in range(1000))
+    assert not bloom.add(('key', 0))
+    # 새 키도 드물게 이미 있는 것으로 보고될 수 있습니다 (거짓 양성).
+    assert len(bloom) == added >= 980
+
+
+def test_bloom_filter_false_positive_rate_is_near_the_error_rate():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(('key', i))
+
+    false_positives = sum(('other', i) in bloom for i in range(10000))
+
+    assert false_positives / 10000 < 0.03
+
+
+@pytest.mark.parametrize("capacity, error_rate", [(0, 0.01), (10, 0), (10, 1)])
+def test_bloom_filter_rejects_invalid_settings(capacity, error_rate):
+    with pytest.raises(ValueError):
+        BloomFilter(capacity, error_rate)
+
+
+@pytest.mark.parametrize("bloom_capacity", [None, 100])
+def test_dedup_index_counts_rejections(bloom_capacity):
+    index = DedupIndex(bloom_capacity)
+
+    assert index.add('a') and index.add('b')
+    assert not index.add('a')
+    assert 'b' in index and 'c' not in index
+    assert len(index) == 2
+    assert index.rejected == 1
+
+
+def test_problem_keys_use_the_chapter_canonical_key_and_namespace():
+    chapter = _SumChapter()
+    index = DedupIndex()
+
+    assert problem_key(chapter, "2 + 3 =", "5") == problem_key(chapter, "3 + 2 =", "5")
+    assert problem_key(object(), "2 + 3 =", "5") == "2 + 3 ="
+    assert index.add_problem(chapter, "2 + 3 =", "5", "Sums")
+    assert not index.add_problem(chapter, "3 + 2 =", "5", "Sums")
+    assert index.add_problem(chapter, "3 + 2 =", "5", "OtherChapter")
+
+
+def test_unique_pairs_keeps_the_first_of_each_key():
+    pairs = [("2 + 3 =", "5"), ("3 + 2 =", "5"), ("1 + 4 =", "5"), ("4 + 1 =", "5")]
+
+    assert list(unique_pairs(_SumChapter(), pairs)) == [("2 + 3 =", "5"), ("1 + 4 =", "5")]
+
+
+def test_dividing_fractions_keys_reduce_the_operands_in_order():
+    chapter = DividingFractions()
+    text = chapter._problem_text
+
+    assert chapter.canonical_key(text(2, 4, 1, 3), "") == chapter.canonical_key(text(1, 2, 1, 3), "")
+    assert chapter.canonical_key(text(1, 2, 1, 3), "") != chapter.canonical_key(text(1, 3, 1, 2), "")
+
+
+def test_writing_fractions_as_decimals_keys_reduce_the_fraction():
+    chapter = WritingFractionsAsDecimals()
+    text = chapter._problem_text
+
+    assert chapter.canonical_key(text(2, 4, "0.5", "")[0], "") == chapter.canonical_key(text(1, 2, "0.5", "")[0], "")
+    assert chapter.canonical_key(text(-1, 2, "-0.5", "")[0], "") != chapter.canonical_key(text(1, 2, "0.5", "")[0], "")
+
+
+def test_ratio_rate_unit_rate_keys_ignore_the_words():
+    chapter = RatioRateUnitRate()
+    template = "{0} {noun_a} to {1} {noun_b}"
+    text = chapter._problem_text
+
+    boys = text(template, 12, 15, {'noun_a': 'boys', 'noun_b': 'girls'})
+    cats = text(template, 12, 15, {'noun_a': 'cats', 'noun_b': 'red cars'})
+    assert chapter.canonical_key(boys, "Ratio") == chapter.canonical_key(cats, "Ratio") == (template, (12, 15))
+    # "3 miles in 4 hours"는 "{0} {noun_b} {verb} {1} {unit_a}" 템플릿과 구별됩니다.
+    miles = text("{0} {unit_a} in {1} {unit_b}", 3, 4, {'unit_a': 'miles', 'unit_b': 'hours'})
+    assert chapter.canonical_key(miles, "Rate") == ("{0} {unit_a} in {1} {unit_b}", (3, 4))
+
+
+@pytest.mark.parametrize("chapter_class", [EvaluatingExpressions, DividingFractions, WritingFractionsAsDecimals,
+                                           RatioRateUnitRate])
+def test_problems_with_the_same_key_have_the_same_answer(chapter_class):
+    chapter = chapter_class(rng=1)
+    problem_list, answer_list = chapter.generate_batch(200)
+    keys = {}
+    for problem, answer in zip(problem_list, answer_list):
+        keys.setdefault(chapter.canonical_key(problem, answer), set()).add(answer)
+
+    # 같은 키의 문제는 같은 정답을 갖습니다.
+    assert all(len(answers) == 1 for answers in keys.values())
@@ -0,0 +1,20 @@
+from fractions import Fraction
+
+from utils.expression import Expression
+
+
+def test_float_evaluation_is_the_default():
+    expression = Expression()
+
+    assert expression.evaluation_mode == "Float"
+    assert expression.evaluate_infix("7 / 2") == "Error: The result '3.5' is a float."
+    assert expression.evaluate_infix("(2 + 4) / 3") == 2
+
+
+def test_exact_evaluation_is_opt_in():
+    expression = Expression()
+    expression.evaluation_mode = "Exact"
+    expression.rule_rational = "Yes"
+
+    assert expression.evaluate_infix("7 / 2") == Fraction(7, 2)
+    assert expression.evaluate_infix("(2 + 4) / 3") == 2
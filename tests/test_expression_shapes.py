@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from utils.expression_shapes import ShapeIndex, ShapeValues, shape_difficulty
+
+_SHAPES = ['n', ('+', 'n', 'n'), ('*', ('+', 'n', 'n'), 'n'), ('/', ('^', 'p', 'e'), ('-', 'n', 'n')),
+           ('-', ('*', 'p', 'n'), ('/', 'n', 'n'))]
+
+
+def _apply(operator, left, right):
+    if operator == '/':
+        return left // right if right != 0 and left % right == 0 else None
+    return {'+': left + right, '-': left - right, '*': left * right, '^': left ** right}[operator]
+
+
+def _brute_force_values(shape, leaf_values, low, high):
+    if shape == 'e':
+        return {2, 3}
+    if not isinstance(shape, tuple):
+        return {value for value in leaf_values[shape] if low <= value <= high}
+    operator, left, right = shape
+    values = {_apply(operator, a, b) for a in _brute_force_values(left, leaf_values, low, high)
+              for b in _brute_force_values(right, leaf_values, low, high)}
+    return {value for value in values if value is not None and low <= value <= high}
+
+
+def _evaluate(filled):
+    if len(filled) == 2:
+        return filled[1]
+    operator, left, right, value = filled
+    assert _apply(operator, _evaluate(left), _evaluate(right)) == value
+    return value
+
+
+def test_shape_difficulty_weights_operators_powers_and_mixed_nesting():
+    assert shape_difficulty('n') == 0.0
+    assert shape_difficulty(('+', 'n', 'n')) == 1.0
+    # (n + n) × n: 곱셈 2.0 + 덧셈 1.0 + 다른 종류의 자식 연산 0.5
+    assert shape_difficulty(('*', ('+', 'n', 'n'), 'n')) == 3.5
+    assert shape_difficulty(('+', 'p', 'n')) == 3.0
+
+
+@pytest.mark.parametrize("low, high, numbers", [(0, 1000, range(1, 11)), (-1000, 1000, range(-10, 0)),
+                                                (-40, 30, range(-10, 0)), (3, 60, range(1, 11))])
+def test_shape_values_match_brute_force_and_fill_in_one_pass(low, high, numbers):
+    leaf_values = {'n': list(numbers), 'p': [4, 8, 9, 27]}
+    values = ShapeValues(low, high, leaf_values, [2, 3])
+    rng = random.Random(0)
+
+    for shape in _SHAPES[1:]:
+        expected = _brute_force_values(shape, leaf_values, low, high)
+        assert values.is_solvable(shape) == bool(expected)
+        filled = values.fill(shape, rng)
+        if expected:
+            assert _evaluate(filled) in expected
+        else:
+            assert filled is None
+
+
+def test_index_buckets_shapes_by_difficulty():
+    index = ShapeIndex(_SHAPES + ['n'], number_of_buckets=5)
+
+    assert len(index) == len(_SHAPES)
+    index.annotate("all", lambda shape: True)
+    easiest = index.sample(0.0, "all", random.Random(0))
+    hardest = index.sample(1.0, "all", random.Random(0))
+    assert shape_difficulty(easiest) < shape_difficulty(hardest)
+
+
+def test_sample_falls_back_to_the_nearest_solvable_bucket():
+    index = ShapeIndex(_SHAPES, number_of_buckets=5)
+    index.annotate("easy only", lambda shape: shape == 'n')
+    index.annotate("none", lambda shape: False)
+
+    assert index.sample(1.0, "easy only", random.Random(0)) == 'n'
+    assert index.sample(0.5, "none", random.Random(0)) is None
+
+
+@pytest.mark.parametrize("arguments", [([],), (['n'], 0)])
+def test_invalid_settings_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        ShapeIndex(*arguments)
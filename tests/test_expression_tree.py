@@ -0,0 +1,87 @@
+import pytest
+
+from utils.expression_tree import BinaryOperation, Operand, canonical_form, from_infix_tokens, from_postfix_tokens, \
+    from_prefix_tokens, render_unicode_and_latex, to_infix, to_postfix_tokens, to_prefix_tokens, unicode_to_infix
+
+
+def test_render_parenthesizes_negative_right_operand():
+    tree = BinaryOperation('-', Operand('3'), Operand('-2'))
+
+    unicode_expression, latex_expression = render_unicode_and_latex(tree)
+
+    assert unicode_expression == "3 - (-2)"
+    assert latex_expression == "3 - (-2)"
+    assert unicode_to_infix(unicode_expression) == "3 - (-2)"
+
+
+def test_render_keeps_negative_left_operand():
+    tree = BinaryOperation('*', Operand('-3'), Operand('2'))
+
+    assert render_unicode_and_latex(tree) == ("-3 × 2", r"-3 \times 2")
+
+
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3}
+
+
+def _is_operand(token):
+    return token.lstrip('-').isalnum()
+
+
+def _tree(infix):
+    return from_infix_tokens(infix.split(), _PRECEDENCE, _is_operand)
+
+
+@pytest.mark.parametrize("infix", [
+    "1 + 2 * 3",
+    "( 1 + 2 ) * 3",
+    "8 - ( 3 - 2 )",
+    "8 - 3 - 2",
+    "2 ^ 3 ^ 2",
+    "( 2 ^ 3 ) ^ 2",
+    "-4 * ( x + 5 ) / 2",
+    "12 / ( 6 / 2 ) + 7 ^ 2",
+])
+def test_infix_postfix_prefix_round_trips(infix):
+    tree = _tree(infix)
+    canonical = canonical_form(tree)
+
+    postfix_tree = from_postfix_tokens(to_postfix_tokens(tree), _PRECEDENCE, _is_operand)
+    prefix_tree = from_prefix_tokens(to_prefix_tokens(tree), _PRECEDENCE, _is_operand)
+    infix_tree = _tree(" ".join(to_infix(tree, _PRECEDENCE).replace('(', '( ').replace(')', ' )').split()))
+
+    assert canonical_form(postfix_tree) == canonical_form(prefix_tree) == canonical_form(infix_tree) == canonical
+
+
+def test_to_infix_keeps_only_needed_parentheses():
+    assert to_infix(_tree("( 1 * 2 ) + ( 3 * 4 )"), _PRECEDENCE) == "1 * 2 + 3 * 4"
+    assert to_infix(_tree("( 1 + 2 ) * ( 3 * 4 )"), _PRECEDENCE) == "(1 + 2) * (3 * 4)"
+    assert to_infix(_tree("8 - ( 3 - 2 )"), _PRECEDENCE) == "8 - (3 - 2)"
+    assert to_infix(_tree("( 2 ^ 3 ) ^ 2"), _PRECEDENCE) == "(2 ^ 3) ^ 2"
+    assert to_infix(_tree("1 + 2"), _PRECEDENCE, full_parentheses=True) == "(1 + 2)"
+
+
+def test_unicode_rendering_round_trips():
+    tree = _tree("( 3 + 4 ) ^ 2 * 5 / ( 2 ^ 3 )")
+
+    unicode_expression, _ = render_unicode_and_latex(tree)
+
+    assert unicode_expression == "((3 + 4)² × 5) ÷ 2³"
+    assert canonical_form(_tree(" ".join(
+        unicode_to_infix(unicode_expression).replace('(', '( ').replace(')', ' )').split()))) == canonical_form(tree)
+
+
+@pytest.mark.parametrize("tokens, parse", [
+    (["1", "+"], from_postfix_tokens),
+    (["1", "2", "3", "+"], from_postfix_tokens),
+    (["+", "1"], from_prefix_tokens),
+    (["(", "1", "+", "2"], from_infix_tokens),
+    (["1", "+", "2", ")"], from_infix_tokens),
+])
+def test_malformed_tokens_are_rejected(tokens, parse):
+    with pytest.raises(ValueError):
+        parse(tokens, _PRECEDENCE, _is_operand)
+
+
+def test_canonical_form_ignores_commutative_order():
+    assert canonical_form(_tree("( 2 * 3 ) * 4 + 1")) == canonical_form(_tree("1 + 4 * ( 3 * 2 )"))
+    assert canonical_form(_tree("5 - 2")) != canonical_form(_tree("2 - 5"))
@@ -0,0 +1,93 @@
+from fractions import Fraction
+from math import gcd
+
+import pytest
+
+from utils import fractions
+from utils.fractions import decimal_digit_lengths, decimal_expansion, multiplicative_order
+
+
+def _expansion_value(expansion) -> Fraction:
+    """Value of a DecimalExpansion: integer part, non-repeating digits and the repeating block."""
+    pre_period, period = len(expansion.non_repeating), len(expansion.repeating)
+    value = Fraction(expansion.integer_part)
+    if pre_period:
+        value += Fraction(int(expansion.non_repeating), 10 ** pre_period)
+    if period:
+        value += Fraction(int(expansion.repeating), 10 ** pre_period * (10 ** period - 1))
+    return -value if expansion.negative else value
+
+
+@pytest.mark.parametrize("numerator, denominator, expected", [
+    (1, 4, (False, 0, '25', '')),
+    (-7, 6, (True, 1, '1', '6')),
+    (1, 7, (False, 0, '', '142857')),
+    (22, 7, (False, 3, '', '142857')),
+    (7, 12, (False, 0, '58', '3')),
+    (3, 1, (False, 3, '', '')),
+])
+def test_decimal_expansion_examples(numerator, denominator, expected):
+    expansion = decimal_expansion(numerator, denominator)
+
+    assert (expansion.negative, expansion.integer_part, expansion.non_repeating, expansion.repeating) == expected
+
+
+def test_decimal_expansion_round_trips():
+    for denominator in range(1, 120):
+        for numerator in range(-2 * denominator, 2 * denominator + 1, 7):
+            expansion = decimal_expansion(numerator, denominator)
+            assert _expansion_value(expansion) == Fraction(numerator, denominator), (numerator, denominator)
+
+
+def test_decimal_expansion_is_shortest():
+    # 기약분수의 순환하지 않는 자리와 순환 마디는 더 줄일 수 없어야 합니다.
+    for denominator in range(2, 120):
+        for numerator in range(1, denominator):
+            if gcd(numerator, denominator) != 1:
+                continue
+            expansion = decimal_expansion(numerator, denominator)
+            if expansion.non_repeating and expansion.repeating:
+                assert expansion.non_repeating[-1] != expansion.repeating[-1], (numerator, denominator)
+            if expansion.is_terminating and expansion.non_repeating:
+                assert expansion.non_repeating[-1] != '0', (numerator, denominator)
+
+
+def test_equal_fractions_share_one_cache_entry():
+    fractions._expansion_cache.clear()
+
+    assert decimal_expansion(-2, 4) is decimal_expansion(-1, 2) is decimal_expansion(-50, 100)
+    assert decimal_expansion(0, 5) is decimal_expansion(0, 1)
+    assert list(fractions._expansion_cache) == [(-1, 2), (0, 1)]
+
+
+def test_to_latex_marks_the_repeating_block():
+    assert decimal_expansion(1, 3).to_latex() == r"0.$\overline{3}$"
+    assert decimal_expansion(-5, 4).to_latex() == "-1.25"
+
+
+def _brute_force_order(base: int, modulus: int) -> int:
+    order, power = 1, base % modulus
+    while power != 1 % modulus:
+        power = power * base % modulus
+        order += 1
+    return order
+
+
+def test_multiplicative_order_matches_brute_force():
+    for modulus in range(1, 400):
+        for base in (2, 3, 7, 10):
+            if gcd(base, modulus) == 1:
+                assert multiplicative_order(base, modulus) == _brute_force_order(base, modulus), (base, modulus)
+
+
+@pytest.mark.parametrize("denominator, expected", [(8, (3, 0)), (7, (0, 6)), (12, (2, 1)), (97, (0, 96)), (1, (0, 0))])
+def test_decimal_digit_lengths(denominator, expected):
+    assert decimal_digit_lengths(denominator) == expected
+
+
+def test_repeating_block_is_the_shortest_period():
+    for denominator in range(2, 200):
+        repeating = decimal_expansion(1, denominator).repeating
+        for length in range(1, len(repeating)):
+            if len(repeating) % length == 0:
+                assert repeating != repeating[:length] * (len(repeating) // length), denominator
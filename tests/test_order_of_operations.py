@@ -0,0 +1,102 @@
+import contextlib
+import io
+
+import pytest
+
+from basic_algebra.order_of_operations.order_of_operations import OrderOfOperations
+from painless_pre_algebra import PainlessPreAlgebra
+from utils.expression_tree import BinaryOperation, iter_preorder, unicode_to_infix
+
+
+def _chapter(seed, difficulty_level=0.5):
+    chapter = OrderOfOperations(seed)
+    chapter.number_of_nested = 2
+    chapter.difficulty_level = difficulty_level
+    return chapter
+
+
+def _operator_count(node):
+    return sum(isinstance(current, BinaryOperation) for current in iter_preorder(node))
+
+
+def test_batches_are_reproducible_and_valid():
+    with contextlib.redirect_stdout(io.StringIO()):
+        problems, answers = _chapter(4).generate_batch(20)
+        assert (problems, answers) == _chapter(4).generate_batch(20)
+
+    checker = OrderOfOperations()
+    for problem, answer in zip(problems, answers):
+        assert problem.endswith(" =")
+        assert str(checker.evaluate_infix(unicode_to_infix(problem.removesuffix(" =")))) == answer
+
+def test_same_seed_gives_the_same_problems():
+    first = _chapter(3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        first.generate_batch(5)
+        first.rng = 9
+        reseeded = first.generate_batch(5)
+        first.rng = 9
+        assert first.generate_batch(5) == reseeded
+
+        second = _chapter(3)
+        second.rng = 9
+        assert second.generate_batch(5) == reseeded
+
+
+def test_weighted_batches_with_the_same_seed_are_equal():
+    unit = PainlessPreAlgebra()
+    with contextlib.redirect_stdout(io.StringIO()):
+        first = unit.get_weighted_batch(5, chapter_weights={"OrderOfOperations": 1.0}, rng=7)
+        second = unit.get_weighted_batch(5, chapter_weights={"OrderOfOperations": 1.0}, rng=7)
+
+    assert first == second
+
+
+def test_shape_index_does_not_depend_on_the_seed():
+    first, second = _chapter(1), _chapter(2)
+
+    assert first.build_shape_index()._shapes == second.build_shape_index()._shapes
+
+
+def test_harder_levels_give_harder_trees():
+    def mean_difficulty(level):
+        chapter = _chapter(7, level)
+        scores = [_operator_count(chapter.generate_expression_tree_for_difficulty()[0]) for _ in range(40)]
+        return sum(scores) / len(scores)
+
+    assert mean_difficulty(0.0) < mean_difficulty(1.0)
+
+
+def _depth(node):
+    if not isinstance(node, BinaryOperation):
+        return 0
+    return 1 + max(_depth(node.left), _depth(node.right))
+
+
+@pytest.mark.parametrize("operators", ["+-*/^", "/", "-", "+^"])
+def test_trees_keep_the_requested_nesting(operators):
+    chapter = _chapter(3)
+    chapter.allowed_operators = operators
+    checker = OrderOfOperations()
+    checker.evaluation_mode = "Exact"
+
+    for _ in range(50):
+        node, value = chapter.generate_expression_tree()
+        assert _depth(node) >= chapter.number_of_nested
+        assert checker.evaluate_tree(node) == value
+
+
+def test_power_only_operators_are_rejected():
+    with pytest.raises(ValueError):
+        OrderOfOperations().allowed_operators = "^"
+
+
+def test_random_expressions_evaluate_to_their_value():
+    chapter = _chapter(6)
+    checker = OrderOfOperations()
+    checker.evaluation_mode = "Exact"
+
+    for _ in range(20):
+        expression, value = chapter.generate_random_expression()
+        assert checker.evaluate_infix(expression) == value
+    assert chapter.generate_random_expression(depth=1)[0].startswith("(")
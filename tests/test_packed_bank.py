@@ -0,0 +1,76 @@
+import pickle
+import random
+
+import pytest
+
+from utils.packed_bank import PackedBank, is_packed_bank, write_packed_bank
+
+_CHAPTERS = [
+    ("Simplify", [(f"Simplify {i}/{i + 1}", f"{i}/{i + 1}") for i in range(5)]),
+    ("Empty", []),
+    ("Unicode", [("(3 + 4)² × 5 =", "245"), ("√9 ÷ 3 =", "1")]),
+    ("Ratios", [(f"{i}:{2 * i}", "1:2") for i in range(1, 4)]),
+]
+
+
+@pytest.fixture
+def bank_path(tmp_path):
+    path = str(tmp_path / "bank.packed")
+    assert write_packed_bank(path, _CHAPTERS) == 10
+    return path
+
+
+def test_write_and_read_back(bank_path):
+    expected = [pair for _, pairs in _CHAPTERS for pair in pairs]
+    with PackedBank(bank_path) as bank:
+        assert len(bank) == 10
+        assert bank.chapters() == ["Simplify", "Unicode", "Ratios"]
+        assert [bank.count(name) for name in ("Simplify", "Empty", "Unicode", "Ratios")] == [5, 0, 2, 3]
+        assert [bank[i] for i in range(len(bank))] == expected
+        assert bank[-1] == expected[-1]
+        assert bank[3:7] == expected[3:7]
+        assert [bank.chapter_of(record) for record in (0, 4, 5, 6, 7, 9)] == \
+               ["Simplify", "Simplify", "Unicode", "Unicode", "Ratios", "Ratios"]
+        with pytest.raises(IndexError):
+            bank[10]
+
+
+def test_is_packed_bank(bank_path, tmp_path):
+    other = tmp_path / "bank.sqlite"
+    other.write_bytes(b"SQLite format 3\0")
+
+    assert is_packed_bank(bank_path)
+    assert not is_packed_bank(str(other))
+    assert not is_packed_bank(str(tmp_path / "missing"))
+    with pytest.raises(ValueError):
+        PackedBank(str(other))
+
+
+def test_sample_is_reproducible_and_stays_in_the_chapters(bank_path):
+    with PackedBank(bank_path) as bank:
+        first = bank.sample(4, ["Simplify", "Ratios"], rng=random.Random(2))
+
+        assert first == bank.sample(4, ["Simplify", "Ratios"], rng=random.Random(2))
+        assert len({record for record, _, _ in first}) == 4
+        for record, problem, answer in first:
+            assert bank.chapter_of(record) in ("Simplify", "Ratios")
+            assert bank[record] == (problem, answer)
+
+
+def test_sample_never_returns_excluded_records(bank_path):
+    with PackedBank(bank_path) as bank:
+        excluded = {0, 2, 7, 9}
+        for seed in range(20):
+            rows = bank.sample(10, ["Simplify", "Ratios"], exclude_records=excluded, rng=random.Random(seed))
+            records = {record for record, _, _ in rows}
+            assert records == {1, 3, 4, 8}
+
+        assert bank.sample(3, ["Unicode"], exclude_records={5, 6}, rng=random.Random(0)) == []
+        assert bank.sample(3, ["Unknown"], rng=random.Random(0)) == []
+
+
+def test_pickle_reopens_the_file(bank_path):
+    with PackedBank(bank_path) as bank:
+        copy = pickle.loads(pickle.dumps(bank))
+    with copy:
+        assert copy[5] == ("(3 + 4)² × 5 =", "245")
@@ -0,0 +1,69 @@
+import random
+
+from utils.parallel import derive_seeds, generate_problems_in_parallel
+
+
+class _DiceChapter:
+    """Minimal picklable chapter: one problem is one draw from its rng."""
+
+    def __init__(self):
+        self.rng = random
+
+    def generate_problem(self):
+        value = self.rng.randint(1, 1_000_000)
+        if value % 97 == 0:
+            raise ValueError("unlucky draw")
+        return f"{value} =", str(value)
+
+
+class _CountingChapter:
+    """Chapter whose problems count how many problems its instance has generated so far."""
+
+    def __init__(self):
+        self.rng = random.Random(0)
+        self.generated = 0
+
+    def generate_problem(self):
+        self.generated += 1
+        return f"{self.generated} =", str(self.generated)
+
+
+def _tasks(number_of_tasks):
+    chapters = [_DiceChapter() for _ in range(3)]
+    return [(f"Dice{i % 3}", chapters[i % 3]) for i in range(number_of_tasks)]
+
+
+def test_derive_seeds_is_reproducible():
+    assert derive_seeds(5, seed=42) == derive_seeds(5, seed=42)
+    assert derive_seeds(5, seed=42) != derive_seeds(5, seed=43)
+    assert len(set(derive_seeds(100, seed=1))) == 100
+
+
+def test_same_seed_gives_same_problems_with_any_number_of_workers():
+    one_worker = generate_problems_in_parallel(_tasks(20), workers=1, seed=7, chunksize=4)
+    three_workers = generate_problems_in_parallel(_tasks(20), workers=3, seed=7, chunksize=4)
+
+    assert one_worker == three_workers
+    assert len(one_worker[0]) == len(one_worker[1]) > 0
+
+
+def test_different_seeds_give_different_problems():
+    assert generate_problems_in_parallel(_tasks(10), 2, seed=1) != generate_problems_in_parallel(_tasks(10), 2, seed=2)
+
+
+def test_shared_random_module_chapter_is_not_changed():
+    chapter = _DiceChapter()
+
+    generate_problems_in_parallel([("Dice", chapter)], workers=1, seed=3)
+
+    assert chapter.rng is random
+
+
+def test_each_worker_keeps_one_chapter_instance():
+    chapter = _CountingChapter()
+
+    problems, _ = generate_problems_in_parallel([("Counting", chapter)] * 12, workers=1, seed=3, chunksize=4)
+
+    # 한 작업 프로세스가 같은 인스턴스로 세 묶음을 모두 만듭니다.
+    assert problems[-1] == "12 ="
+    assert chapter.generated == 0
@@ -0,0 +1,91 @@
+import json
+import random
+from fractions import Fraction
+
+import pytest
+
+from utils.problem_bank import ProblemBank, chapter_parameters
+
+
+class _AdditionChapter:
+    """Toy chapter with a finite set of problems: a + b for 1 <= a <= b <= max_value."""
+
+    def __init__(self, max_value=10, difficulty_level=0.5, seed=0):
+        self._max_value = max_value
+        self._difficulty_level = difficulty_level
+        self._rng = random.Random(seed)
+
+    @property
+    def title(self):
+        return "Addition"
+
+    @property
+    def rng(self):
+        return self._rng
+
+    @property
+    def max_value(self):
+        return self._max_value
+
+    @property
+    def difficulty_level(self):
+        return self._difficulty_level
+
+    @property
+    def ratio(self):
+        return Fraction(1, 3)
+
+    def canonical_key(self, problem_text, answer_text):
+        return tuple(sorted(problem_text.removesuffix(" =").split(" + ")))
+
+    def generate_batch(self, number_of_problems):
+        pairs = [(self._rng.randint(1, self._max_value), self._rng.randint(1, self._max_value))
+                 for _ in range(number_of_problems)]
+        return [f"{a} + {b} =" for a, b in pairs], [str(a + b) for a, b in pairs]
+
+
+@pytest.fixture
+def bank(tmp_path):
+    with ProblemBank(str(tmp_path / "bank.sqlite")) as bank:
+        bank.build("Addition", _AdditionChapter(1000, difficulty_level=0.2), 30, batch_size=16)
+        bank.build("Addition", _AdditionChapter(1000, difficulty_level=0.8, seed=1), 30, batch_size=16)
+        bank.build("Small", _AdditionChapter(max_value=3), 100, batch_size=8)
+        yield bank
+
+
+def test_chapter_parameters_skip_title_and_rng():
+    assert chapter_parameters(_AdditionChapter()) == {'difficulty_level': 0.5, 'max_value': 10, 'ratio': '1/3'}
+
+
+def test_build_stores_distinct_problems_per_difficulty(bank):
+    assert bank.chapters() == ["Addition", "Small"]
+    assert bank.count("Addition") == 60
+    # 1..3의 덧셈은 교환 법칙을 무시하면 6개뿐이므로, 새 문제가 나오지 않으면 멈춥니다.
+    assert bank.count("Small") == 6
+    assert bank.count() == 66
+
+    rows = bank._connection.execute("SELECT parameters FROM problems WHERE chapter = 'Small'").fetchall()
+    assert {json.loads(parameters)['max_value'] for parameters, in rows} == {3}
+
+
+def test_build_tops_up_to_the_requested_count(bank):
+    assert bank.build("Addition", _AdditionChapter(1000, difficulty_level=0.2, seed=5), 40) == 10
+    assert bank.build("Addition", _AdditionChapter(1000, difficulty_level=0.2, seed=6), 40) == 0
+
+
+def test_query_is_reproducible_and_respects_filters(bank):
+    first = bank.query(["Addition", "Small"], 20, rng=random.Random(3))
+    assert first == bank.query(["Addition", "Small"], 20, rng=random.Random(3))
+    assert len({problem_id for problem_id, _, _ in first}) == 20
+
+    hard = bank.query(["Addition"], 100, min_difficulty=0.5, rng=random.Random(3))
+    assert len(hard) == 30
+
+    excluded = {problem_id for problem_id, _, _ in hard}
+    rest = bank.query(["Addition"], 100, exclude_ids=excluded, rng=random.Random(3))
+    assert len(rest) == 30
+    assert excluded.isdisjoint(problem_id for problem_id, _, _ in rest)
+
+
+def test_query_without_matches_returns_nothing(bank):
+    assert bank.query(["Unknown"], 5, rng=random.Random(0)) == []
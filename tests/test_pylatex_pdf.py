@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+from utils.pylatex_pdf import VariantTexWriter, _variant_file_names, _variant_page_ranges
+
+
+def _write_pages(tmp_path, lines):
+    pages_path = tmp_path / "Sheet.pages"
+    pages_path.write_text("".join(f"{line}\n" for line in lines), encoding='utf-8')
+    return str(pages_path)
+
+
+def test_variant_page_ranges_from_page_map(tmp_path):
+    pages_path = _write_pages(tmp_path, [1, 3, 4])
+
+    assert _variant_page_ranges(pages_path, 3, 6) == [(0, 2), (2, 3), (3, 6)]
+
+
+@pytest.mark.parametrize("lines, number_of_variants, number_of_pages", [
+    ([1, 3], 3, 6),     # 변형 수가 다름
+    ([1, 3, 3], 3, 6),  # 빈 변형
+    ([1, 3, 7], 3, 6),  # PDF보다 긴 페이지 맵
+])
+def test_variant_page_ranges_rejects_mismatched_page_map(tmp_path, lines, number_of_variants, number_of_pages):
+    pages_path = _write_pages(tmp_path, lines)
+
+    with pytest.raises(ValueError):
+        _variant_page_ranges(pages_path, number_of_variants, number_of_pages)
+
+
+def test_variant_file_names_keep_unicode_and_never_collide():
+    names = ["김민준", "이서연", "김민준", "Ann Lee", "Ann/Lee", "!!!"]
+
+    assert _variant_file_names(names) == ["김민준", "이서연", "김민준_2", "Ann_Lee", "Ann_Lee_2", "variant"]
+
+
+def test_variant_tex_records_first_page_of_every_variant(tmp_path):
+    with VariantTexWriter("Sheet Problems", num_column=2, directory=str(tmp_path)) as writer:
+        for heading in ("Ann", "Bo"):
+            writer.start_variant(heading)
+            writer.write("1 + 1 =")
+
+    tex = (tmp_path / "Sheet_Problems.tex").read_text(encoding='utf-8')
+    assert r"\usepackage{atbegshi}" in tex
+    assert "ReadonlyShipoutCounter" not in tex
+    assert tex.count(r"\write\variantpages{\the\variantshipouts}") == 2
+    assert tex.count(r"\begin{multicols}") == tex.count(r"\end{multicols}") == 2
+
+
+def test_split_pdf_without_pypdf_explains_the_missing_package(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pypdf', None)
+    writer = VariantTexWriter("Sheet Problems", directory=str(tmp_path))
+
+    with pytest.raises(ImportError, match="pypdf"):
+        writer.split_pdf([])
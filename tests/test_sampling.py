@@ -0,0 +1,50 @@
+import random
+
+import pytest
+
+from utils.sampling import AliasTable
+
+
+def _implied_probabilities(table: AliasTable) -> list[float]:
+    """Exact probability of every index: kept with _probabilities[i], or reached as an alias."""
+    count = len(table)
+    implied = [probability / count for probability in table._probabilities]
+    for index, alias in enumerate(table._aliases):
+        implied[alias] += (1.0 - table._probabilities[index]) / count
+    return implied
+
+
+@pytest.mark.parametrize("weights", [
+    [1],
+    [1, 1, 1, 1],
+    [1, 2, 3, 4],
+    [0.1, 0, 5, 0, 2.5],
+    [1000, 1, 1],
+    [3, 0, 0, 0, 0, 0, 0, 0],
+])
+def test_alias_table_reproduces_the_weights(weights):
+    implied = _implied_probabilities(AliasTable(weights))
+
+    total = sum(weights)
+    assert implied == pytest.approx([weight / total for weight in weights])
+
+
+def test_zero_weights_are_never_drawn():
+    table = AliasTable([0, 2, 0, 1])
+
+    assert set(table.sample_many(2000, random.Random(1))) == {1, 3}
+
+
+def test_draws_are_reproducible_and_follow_the_weights():
+    table = AliasTable([1, 3])
+
+    draws = table.sample_many(20000, random.Random(5))
+
+    assert draws == table.sample_many(20000, random.Random(5))
+    assert draws.count(1) / len(draws) == pytest.approx(0.75, abs=0.02)
+
+
+@pytest.mark.parametrize("weights", [[], [1, -1], [0, 0]])
+def test_invalid_weights_are_rejected(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
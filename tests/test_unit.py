@@ -0,0 +1,54 @@
+import contextlib
+import io
+
+from painless_pre_algebra import PainlessPreAlgebra
+
+_CHAPTERS = {'start_chapter': "Simplify", 'end_chapter': "WritingFractionsAsDecimals"}
+
+
+def _problems(unit, number_of_problems):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return list(unit.iter_problems(number_of_problems, **_CHAPTERS))
+
+
+def _variants(unit, seed):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [(heading, list(pairs)) for heading, pairs in unit.iter_variants(2, seed=seed, **_CHAPTERS)]
+
+
+def test_variants_are_reproducible():
+    assert _variants(PainlessPreAlgebra(1), seed=5) == _variants(PainlessPreAlgebra(2), seed=5)
+
+
+def test_variants_do_not_reseed_the_unit():
+    untouched = PainlessPreAlgebra(1)
+    _problems(untouched, 2)
+    expected = _problems(untouched, 6)
+
+    unit = PainlessPreAlgebra(1)
+    _problems(unit, 2)
+    _variants(unit, seed=5)
+
+    assert _problems(unit, 6) == expected
+
+
+def test_weighted_batch_with_local_weights_and_rng_leaves_the_unit_unchanged():
+    chapter_weights = {"Simplify": 1.0, "ComparingFractionsAndDecimals": 2.0, "OrderOfOperations": 3.0}
+    reference = PainlessPreAlgebra()
+    reference.chapter_weights = {chapter_name: chapter_weights.get(chapter_name, 0.0)
+                                 for chapter_name in reference.chapter}
+    reference.rng = 11
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = reference.get_weighted_batch(12)
+
+    unit = PainlessPreAlgebra(1)
+    weights_before = unit.chapter_weights
+    with contextlib.redirect_stdout(io.StringIO()):
+        # 다른 시드로 먼저 생성해 두어도 같은 시드의 결과는 같아야 합니다.
+        unit.get_weighted_batch(12, chapter_weights=chapter_weights, rng=3)
+        first = unit.get_weighted_batch(12, chapter_weights=chapter_weights, rng=11)
+        second = unit.get_weighted_batch(12, chapter_weights=chapter_weights, rng=11)
+
+    assert first == second == expected
+    assert unit.chapter_weights == weights_before
+    assert _problems(unit, 4) == _problems(PainlessPreAlgebra(1), 4)
@@ -0,0 +1,68 @@
+import contextlib
+import io
+
+import pytest
+
+import worksheet_server
+from painless_pre_algebra import PainlessPreAlgebra
+from worksheet_server import parse_worksheet_spec
+
+
+@pytest.fixture(scope='module')
+def unit():
+    return PainlessPreAlgebra()
+
+
+def test_defaults(unit):
+    spec = parse_worksheet_spec({'seed': 7}, unit)
+
+    assert spec == {'chapters': unit.chapter, 'count': 20, 'seed': 7, 'columns': [2, 2], 'format': 'json'}
+
+
+def test_units_and_chapter_range_are_intersected(unit):
+    spec = parse_worksheet_spec({'units': ['rational_numbers'], 'start_chapter': 'OneStepEquations',
+                                 'end_chapter': 'WritingFractionsAsDecimals', 'columns': 3}, unit)
+
+    assert spec['chapters'] == ['Simplify', 'WritingFractionsAsDecimals']
+    assert spec['columns'] == [3, 3]
+    assert isinstance(spec['seed'], int)
+
+
+@pytest.mark.parametrize("spec", [
+    [],
+    {'pages': 2},
+    {'units': ['geometry']},
+    {'start_chapter': 'Trigonometry'},
+    {'units': ['rational_numbers'], 'end_chapter': 'OneStepEquations'},
+    {'count': 0},
+    {'count': 501},
+    {'count': '5'},
+    {'count': True},
+    {'seed': 1.5},
+    {'seed': False},
+    {'columns': True},
+    {'columns': [2, True]},
+    {'columns': [2, 5]},
+    {'columns': [2]},
+    {'format': 'docx'},
+])
+def test_invalid_specs_are_rejected(unit, spec):
+    with pytest.raises(ValueError):
+        parse_worksheet_spec(spec, unit)
+
+
+def test_the_seed_reproduces_the_worksheet_on_a_warm_worker(unit):
+    spec = parse_worksheet_spec({'start_chapter': 'OrderOfOperations', 'end_chapter': 'OrderOfOperations',
+                                 'count': 6, 'seed': 7}, unit)
+    other_spec = dict(spec, seed=8)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        worksheet_server._init_generation_worker()
+        first = worksheet_server._generate_worksheet(spec)
+        worksheet_server._generate_worksheet(other_spec)
+        second = worksheet_server._generate_worksheet(spec)
+        worksheet_server._init_generation_worker()
+        fresh = worksheet_server._generate_worksheet(spec)
+
+    assert first == second == fresh
+    assert len(first[0]) == 6
@@ -0,0 +1,114 @@
+import hashlib
+import math
+
+
+def problem_key(chapter_instance, problem_text: str, answer_text: str):
+    """
+    Canonical key of a generated problem: the chapter's canonical_key() when it has one,
+    otherwise the problem text itself (only exact repeats are then detected).
+    """
+    if hasattr(chapter_instance, 'canonical_key'):
+        return chapter_instance.canonical_key(problem_text, answer_text)
+    return problem_text
+
+
+def _key_digest(key) -> bytes:
+    """16-byte digest of repr(key). Canonical keys are built from str, int and tuple only, so repr is stable."""
+    return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over canonical keys.
+
+    Membership tests may report a key that was never added (with probability about error_rate once
+    capacity keys are stored) but never miss one that was. Memory is about
+    -capacity * ln(error_rate) / ln(2)^2 bits, independent of the key sizes.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if not isinstance(capacity, int) or capacity < 1:
+            raise ValueError("Capacity must be a positive integer.")
+        if not 0 < error_rate < 1:
+            raise ValueError("Error rate must be between 0 and 1.")
+
+        self._number_of_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._number_of_hashes = max(1, round(self._number_of_bits / capacity * math.log(2)))
+        self._bits = bytearray((self._number_of_bits + 7) // 8)
+        self._count = 0
+
+    def __len__(self):
+        """Number of keys added (keys reported as already present are not counted)."""
+        return self._count
+
+    def _positions(self, key):
+        # 128비트 다이제스트를 두 개의 64비트 해시로 나누어 k개의 위치를 만듭니다 (double hashing).
+        digest = _key_digest(key)
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self._number_of_bits for i in range(self._number_of_hashes)]
+
+    def __contains__(self, key) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def add(self, key) -> bool:
+        """Adds key and returns True, or returns False if key (probably) was already added."""
+        is_new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                is_new = True
+        if is_new:
+            self._count += 1
+        return is_new
+
+
+class DedupIndex:
+    """
+    Remembers the canonical keys of problems that have been accepted and rejects repeats in O(1).
+
+    By default the keys are kept exactly in a hash set. With bloom_capacity the index uses a
+    BloomFilter instead: memory stays fixed for multi-million-item runs, at the cost of rejecting
+    about error_rate of the new problems as false repeats.
+    """
+
+    def __init__(self, bloom_capacity: int = None, error_rate: float = 0.001):
+        self._bloom = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else None
+        self._keys = set()
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._bloom) if self._bloom is not None else len(self._keys)
+
+    def __contains__(self, key) -> bool:
+        if self._bloom is not None:
+            return key in self._bloom
+        return key in self._keys
+
+    def add(self, key) -> bool:
+        """Records key and returns True if it is new, otherwise counts a rejection and returns False."""
+        if self._bloom is not None:
+            is_new = self._bloom.add(key)
+        else:
+            is_new = key not in self._keys
+            if is_new:
+                self._keys.add(key)
+        if not is_new:
+            self.rejected += 1
+        return is_new
+
+    def add_problem(self, chapter_instance, problem_text: str, answer_text: str, namespace=None) -> bool:
+        """
+        add() for the canonical key of a generated problem. Keys are prefixed with namespace (e.g. the
+        chapter name) so equal keys from different chapters do not collide.
+        """
+        return self.add((namespace, problem_key(chapter_instance, problem_text, answer_text)))
+
+
+def unique_pairs(chapter_instance, pairs, dedup_index: DedupIndex = None, namespace=None):
+    """Filters an iterable of (problem, answer) pairs down to the ones with a new canonical key."""
+    dedup_index = dedup_index if dedup_index is not None else DedupIndex()
+    for problem_text, answer_text in pairs:
+        if dedup_index.add_problem(chapter_instance, problem_text, answer_text, namespace):
+            yield problem_text, answer_text
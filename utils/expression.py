@@ -1,7 +1,151 @@
+import operator
 import re
+from collections import OrderedDict
+from fractions import Fraction
 
-from utils.unicodes import UNICODE_MULTIPLIER, SUPERSCRIPT_NUMBERS, UNICODE_DIVISION, UNICODE_PRODUCT, \
-    identify_token_type
+from utils.expression_tree import Operand, iter_postorder, to_postfix_tokens, to_prefix_tokens, to_infix, \
+    from_infix_tokens, from_postfix_tokens, from_prefix_tokens, render_unicode_and_latex
+from utils.unicodes import UNICODE_MULTIPLIER, UNICODE_DIVISION
+
+
+def _divide_exact(dividend, divisor):
+    # 정수끼리 나누어떨어지면 정수 나눗셈으로 처리합니다. (Fraction 생성 비용 회피)
+    if type(dividend) is int and type(divisor) is int and dividend % divisor == 0:
+        return dividend // divisor
+    return Fraction(dividend, divisor)
+
+
+def _power_exact(base, exponent):
+    if exponent < 0:
+        return Fraction(base) ** exponent
+    return base ** exponent
+
+
+def _parse_exact_operand(token: str):
+    """Parses an operand token as int (fast path) or Fraction. Raises ValueError for non-numeric tokens."""
+    try:
+        return int(token)
+    except ValueError:
+        return Fraction(token)
+
+
+class Token:
+    """A scanned token. Operator/parenthesis tokens and frequent operands are shared instances."""
+    __slots__ = ('kind', 'text')
+
+    def __init__(self, kind: str, text: str):
+        self.kind = kind
+        self.text = text
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.text!r})"
+
+
+# 부호가 붙은 피연산자, 피연산자(숫자, 알파벳, 유니코드 윗첨자), 그 외 공백이 아닌 한 글자.
+# [^\W_]는 str.isalnum()과 같은 문자 집합입니다.
+_SCAN_PATTERN = re.compile(r'-[^\W_]+|[^\W_]+|\S')
+_OPERATOR_CHARACTERS = frozenset(('+', '-', '*', '/', '^', UNICODE_MULTIPLIER, UNICODE_DIVISION))
+_OPERAND_KINDS = frozenset(('operand', 'signed_operand'))
+# 단항 마이너스는 수식의 시작, '(' 또는 이항 연산자 뒤에서만 허용됩니다.
+_UNARY_CONTEXT = frozenset((None, 'operator', 'left_parenthesis'))
+
+_MAX_CACHED_TOKENS = 4096
+_TOKEN_CACHE = {}
+
+
+def _make_token(text: str) -> Token:
+    """Classifies the scanned text and returns a (cached) Token."""
+    if text[0] == '-' and len(text) > 1:
+        kind = 'signed_operand'
+    elif text.isalnum():
+        kind = 'operand'
+    elif text in _OPERATOR_CHARACTERS:
+        kind = 'operator'
+    elif text == '(':
+        kind = 'left_parenthesis'
+    elif text == ')':
+        kind = 'right_parenthesis'
+    else:
+        kind = 'unknown'
+
+    token = Token(kind, text)
+    if len(_TOKEN_CACHE) < _MAX_CACHED_TOKENS:
+        _TOKEN_CACHE[text] = token
+    return token
+
+
+_MINUS_TOKEN = _make_token('-')
+
+
+class ConversionEntry:
+    """Conversions of one normalized infix expression. Forms other than tokens/tree are filled on first use."""
+    __slots__ = ('tokens', 'tree', 'error', 'postfix', 'prefix', 'unicode', 'latex')
+
+    def __init__(self, tokens: list[str], tree=None, error: str = None):
+        self.tokens = tokens
+        self.tree = tree
+        self.error = error
+        self.postfix = None
+        self.prefix = None
+        self.unicode = None
+        self.latex = None
+
+
+class ConversionCache:
+    """Bounded LRU cache of ConversionEntry objects with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError("Cache size must be an integer greater than 0.")
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: ConversionEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "maxsize": self._maxsize, "currsize": len(self._entries)}
+
+
+# 연산자별 계산 함수 테이블 (if/elif 분기 대신 사용)
+_EXACT_OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    UNICODE_MULTIPLIER: operator.mul,
+    '/': _divide_exact,
+    UNICODE_DIVISION: _divide_exact,
+    '^': _power_exact,
+}
+
+_FLOAT_OPERATIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    UNICODE_MULTIPLIER: operator.mul,
+    '/': operator.truediv,
+    UNICODE_DIVISION: operator.truediv,
+    '^': operator.pow,
+}
 
 
 class Expression:
@@ -14,6 +158,7 @@ class Expression:
         '/': 2,
         '^': 3,
     }
+    _CONVERSION_CACHE_SIZE = 1024
 
     def __init__(self):
         #self._title = "Expression"
@@ -23,6 +168,9 @@ class Expression:
         self._rule_negation = "No"
         self._rule_lower_limit = -1000
         self._rule_upper_limit = 1000
+        self._rule_rational = "No"
+        self._evaluation_mode = "Float"
+        self._conversion_cache = ConversionCache(self._CONVERSION_CACHE_SIZE)
 
     @property
     def number_of_nested(self):
@@ -64,6 +212,31 @@ class Expression:
             raise ValueError("Rule negation must be 'Yes' or 'No'.")
         self._rule_negation = value
 
+    @property
+    def rule_rational(self):
+        return self._rule_rational
+
+    @rule_rational.setter
+    def rule_rational(self, value):
+        """Allows ('Yes') or rejects ('No') non-integral results. Only applies to the 'Exact' evaluation mode."""
+        if value not in ["Yes", "No"]:
+            raise ValueError("Rule rational must be 'Yes' or 'No'.")
+        self._rule_rational = value
+
+    @property
+    def evaluation_mode(self):
+        return self._evaluation_mode
+
+    @evaluation_mode.setter
+    def evaluation_mode(self, value):
+        """
+        'Float' (default): operands are floats and any non-integral result is rejected.
+        'Exact': operands and results are int/Fraction values.
+        """
+        if value not in ["Exact", "Float"]:
+            raise ValueError("Evaluation mode must be 'Exact' or 'Float'.")
+        self._evaluation_mode = value
+
     @property
     def rule_lower_upper_limit(self):
         return self._rule_lower_limit, self._rule_upper_limit
@@ -93,239 +266,105 @@ class Expression:
         self._rule_lower_limit = value_low
         self._rule_upper_limit = value_high
 
-    def tokenize_expression(self, expression_string):
+    def scan_tokens(self, expression_string) -> list:
+        """
+        Splits the infix expression string into Token objects in a single regex-driven pass,
+        correctly handling unary minus signs as part of the operand.
         """
-             Splits the infix expression string into a list of individual tokens,
-             correctly handling unary minus signs as part of the operand.
-             """
-        # 연산자 및 괄호를 정의합니다.
-        operators = ('+', '-', '*', '/', '^', UNICODE_MULTIPLIER, UNICODE_DIVISION)
-        delimiters = operators + ('(', ')')
         tokens = []
-        i = 0
-
-        while i < len(expression_string):
-            char = expression_string[i]
-
-            if char.isspace():
-                i += 1
-                continue
-
-            # --- 1. 단항 마이너스 처리 ---
-            is_unary_minus = False
-            if char == '-':
-                # 1. 수식의 시작일 때
-                if i == 0:
-                    is_unary_minus = True
-                # 2. 직전 토큰이 왼쪽 괄호 '('이거나 이항 연산자였을 때
-                elif tokens:
-                    prev_token = tokens[-1]
-                    if prev_token == '(' or prev_token in operators:
-                        is_unary_minus = True
-
-            if is_unary_minus:
-                # 마이너스 부호 다음 문자가 숫자나 변수인지 확인
-                j = i + 1
-
-                # 단항 마이너스는 피연산자의 일부로 간주됩니다.
-                current_operand = '-'
-
-                # 마이너스 다음의 피연산자를 모두 읽어들입니다.
-                while j < len(expression_string):
-                    next_char = expression_string[j]
-
-                    # 피연산자의 조건: 숫자, 알파벳, 유니코드 윗첨자
-                    is_operand_char = next_char.isalnum() or \
-                                      re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', next_char)
-
-                    if is_operand_char:
-                        current_operand += next_char
-                        j += 1
-                    else:
-                        break
-
-                # 피연산자가 - 뒤에 없다면, 일반 이항 연산자 '-'로 처리합니다. (매우 드문 경우)
-                if current_operand == '-':
-                    tokens.append('-')
-                    i += 1
-                else:
-                    tokens.append(current_operand)
-                    i = j
-                continue
-
-            # --- 2. 피연산자 처리 (숫자, 변수, 윗첨자) ---
-            if char.isalnum() or re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char):
-                current_operand = char
-                j = i + 1
-                while j < len(expression_string):
-                    next_char = expression_string[j]
-                    if next_char.isalnum() or re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', next_char):
-                        current_operand += next_char
-                        j += 1
-                    else:
-                        break
-                tokens.append(current_operand)
-                i = j
-                continue
-
-            # --- 3. 괄호 및 이항 연산자 처리 ---
-            if char in delimiters:
-                tokens.append(char)
-                i += 1
-                continue
+        previous_kind = None
 
-            # --- 4. 알 수 없는 문자 처리 ---
-            tokens.append(char)
-            i += 1
+        for text in _SCAN_PATTERN.findall(expression_string):
+            token = _TOKEN_CACHE.get(text) or _make_token(text)
+            # '-'가 피연산자에 붙어 있어도 단항 마이너스 위치가 아니면 이항 연산자 '-'로 분리합니다.
+            if token.kind == 'signed_operand' and previous_kind not in _UNARY_CONTEXT:
+                tokens.append(_MINUS_TOKEN)
+                token = _TOKEN_CACHE.get(text[1:]) or _make_token(text[1:])
+            tokens.append(token)
+            previous_kind = token.kind
 
         return tokens
 
+    def tokenize_expression(self, expression_string):
+        """
+             Splits the infix expression string into a list of individual tokens,
+             correctly handling unary minus signs as part of the operand.
+             """
+        return list(self._get_conversion(expression_string).tokens)
+
+    def _get_conversion(self, expression_string) -> ConversionEntry:
+        """Returns the cached conversions of an infix expression, tokenizing and parsing it on a miss."""
+        # 공백만 다른 수식은 같은 키를 사용합니다.
+        key = " ".join(expression_string.split())
+        entry = self._conversion_cache.get(key)
+        if entry is not None:
+            return entry
+
+        tokens = self.scan_tokens(key)
+        texts = [token.text for token in tokens]
+        operands = {token.text for token in tokens if token.kind in _OPERAND_KINDS}
+        try:
+            entry = ConversionEntry(texts, tree=from_infix_tokens(texts, self._PRECEDENCE, operands.__contains__))
+        except ValueError as e:
+            entry = ConversionEntry(texts, error=str(e))
+        self._conversion_cache.put(key, entry)
+        return entry
+
+    def conversion_cache_info(self) -> dict:
+        """Returns the conversion cache statistics: hits, misses, maxsize, currsize."""
+        return self._conversion_cache.info()
+
+    def clear_conversion_cache(self):
+        self._conversion_cache.clear()
+
     def is_numeric(self, token:str)->bool:
+        # str.isalnum()은 유니코드 윗첨자 숫자(⁰¹²³...)도 포함합니다.
         if token.isalnum():
             return True
-        elif all(re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char) for char in token):
+        try:
+            float(token)
             return True
-        else:
-            try:
-                float(token)
-                return True
-            except ValueError:
-                return False
-
-    def infix_to_postfix(self, infix_expression_string)->str:
-
-        output = []  # To store the postfix expression
-        operator_stack = []  # To store operators and parentheses
-
-        # Use the new tokenizer function to get tokens
-        tokens = self.tokenize_expression(infix_expression_string)
-        max_nested_depth = 0
-        curr_nested_depth = 0
-
-        for token in tokens:
-            # Check if the token is a number (e.g., '11', '123') or an alphanumeric operand (e.g., 'A', 'xyz')
-            #if token.isalnum() or all(re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char) for char in token):
-            if self.is_numeric(token):
-                output.append(token)
-            elif token == '(':
-                operator_stack.append(token)
-                curr_nested_depth += 1
-                if curr_nested_depth > max_nested_depth:
-                    max_nested_depth = curr_nested_depth
-                # print(f"curr_nexted_depth : {curr_nested_depth}, max: {max_nested_depth}")
-            elif token == ')':
-                # Pop operators from stack to output until '(' is found
-                curr_nested_depth -= 1
-                # print(f"curr_nexted_depth decresed by 1: {curr_nested_depth}")
-                while operator_stack and operator_stack[-1] != '(':
-                    output.append(operator_stack.pop())
-                if operator_stack and operator_stack[-1] == '(':
-                    operator_stack.pop()  # Pop the '(' from the stack
-                else:
-                    return "Error: Mismatched parentheses."
-            elif token in self._PRECEDENCE:  # If it's an operator
-                # Pop operators from stack to output if their precedence is
-                # greater than or equal to the current token's precedence
-                # and it's not a left parenthesis
-                while (operator_stack and operator_stack[-1] != '(' and
-                       ((self._PRECEDENCE[operator_stack[-1]] > self._PRECEDENCE[token]) or
-                        (self._PRECEDENCE[operator_stack[-1]] == self._PRECEDENCE[token] and token != '^'))):
-                    output.append(operator_stack.pop())
-                operator_stack.append(token)
-            else:
-                return f"Error: Invalid token '{token}' in expression."
-
-        # Pop any remaining operators from the stack to the output
-        while operator_stack:
-            if operator_stack[-1] == '(':
-                return "Error: Mismatched parentheses."  # Unmatched left parenthesis
-            output.append(operator_stack.pop())
-
-        return " ".join(output)
-
-    def infix_to_prefix(self, infix_expression_string) -> str:
-
-        # 1. 토큰화 및 문자열 반전
-        tokens = self.tokenize_expression(infix_expression_string)
-
-        # 괄호를 반전시키고 토큰 리스트를 반전시킵니다.
-        reversed_tokens = []
-        for token in reversed(tokens):
-            if token == '(':
-                reversed_tokens.append(')')
-            elif token == ')':
-                reversed_tokens.append('(')
-            else:
-                reversed_tokens.append(token)
-
-        output = []  # Prefix 표현식의 반전 결과를 저장
-        operator_stack = []
-
-        # **3. Infix to Postfix와 유사한 처리 (단, 반전된 식에 대해)**
-        for token in reversed_tokens:
-            #if token.isalnum() or all(re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char) for char in token):  # 피연산자
-            if self.is_numeric(token):
-                output.append(token)
-            elif token == '(':
-                operator_stack.append(token)
-            elif token == ')':
-                while operator_stack and operator_stack[-1] != '(':
-                    output.append(operator_stack.pop())
-                if operator_stack and operator_stack[-1] == '(':
-                    operator_stack.pop()  # '(' 제거
-                else:
-                    return "Error: Mismatched parentheses in prefix conversion."
-            elif token in self._PRECEDENCE:  # 연산자
-                # Infix to Postfix에서 사용하는 precedence >= 조건을 그대로 사용
-                while (operator_stack and operator_stack[-1] != '(' and
-                       ((self._PRECEDENCE[operator_stack[-1]] > self._PRECEDENCE[token]) or
-                        (self._PRECEDENCE[operator_stack[-1]] == self._PRECEDENCE[token] and token == '^'))):
-                    output.append(operator_stack.pop())
-                operator_stack.append(token)
-            else:
-                return f"Error: Invalid token '{token}' in prefix conversion."
-
-        # 스택에 남은 연산자 처리
-        while operator_stack:
-            if operator_stack[-1] == '(':
-                return "Error: Mismatched parentheses in prefix conversion."
-            output.append(operator_stack.pop())
-
-        # 4. 최종 결과 반전 및 반환
-        return " ".join(reversed(output))
-
-    def prefix_to_infix(self, prefix_expression_string) -> str:
-
-        tokens = prefix_expression_string.split()
-        stack = []  # Infix 부분식을 저장할 스택
+        except ValueError:
+            return False
 
-        # Prefix는 오른쪽에서 왼쪽으로 읽어들입니다.
-        for token in reversed(tokens):
-            if token.isalnum() or all(re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char) for char in token):
-                # 피연산자는 그대로 스택에 푸시합니다.
-                stack.append(token)
-            elif token in self._PRECEDENCE:
-                if len(stack) < 2:
-                    return "Error: Invalid prefix expression, not enough operands."
-
-                left = stack.pop()  # 우측 피연산자 (Op2)
-                right = stack.pop()  # 좌측 피연산자 (Op1)
-
-                # new_infix = f"({operand2} {token} {operand1})" # 원래의 올바른 순서
-                new_infix = f"({left} {token} {right})"  # Prefix는 연산자-Operand1-Operand2 순서 (읽는 순서 기준)
+    def parse_expression(self, infix_expression_string):
+        """
+        Parses an infix expression string into an expression tree.
+        Trees are cached and shared, so callers must not modify them.
 
-                stack.append(new_infix)
-            else:
-                return f"Error: Invalid token '{token}' in prefix expression."
+        Raises:
+            ValueError: If the expression is malformed.
+        """
+        entry = self._get_conversion(infix_expression_string)
+        if entry.error is not None:
+            raise ValueError(entry.error)
+        return entry.tree
+
+    def infix_to_postfix(self, infix_expression_string) -> str:
+        entry = self._get_conversion(infix_expression_string)
+        if entry.error is not None:
+            return f"Error: {entry.error}"
+        if entry.postfix is None:
+            entry.postfix = " ".join(to_postfix_tokens(entry.tree))
+        return entry.postfix
 
-        if len(stack) != 1:
-            return "Error: Invalid prefix expression, too many operands remaining."
+    def infix_to_prefix(self, infix_expression_string) -> str:
+        entry = self._get_conversion(infix_expression_string)
+        if entry.error is not None:
+            return f"Error: {entry.error}"
+        if entry.prefix is None:
+            entry.prefix = " ".join(to_prefix_tokens(entry.tree))
+        return entry.prefix
 
-        # 최외곽 괄호를 제거하고 반환합니다.
-        result = stack.pop()
-        # if result.startswith('(') and result.endswith(')'):
-        #     return result[1:-1]
-        return result
+    def prefix_to_infix(self, prefix_expression_string) -> str:
+        """
+        Prefix 표현식 문자열을 모든 연산이 괄호로 묶인 Infix 표현식 문자열로 변환합니다.
+        """
+        try:
+            tree = from_prefix_tokens(prefix_expression_string.split(), self._PRECEDENCE, self.is_numeric)
+        except ValueError as e:
+            return f"Error: {e}"
+        return to_infix(tree, self._PRECEDENCE, full_parentheses=True)
 
     def postfix_to_infix(self, postfix_expression_string) -> str:
         """
@@ -338,62 +377,25 @@ class Expression:
         Returns:
             str: Infix 표현식 문자열 (적절한 괄호로 묶인 형태).
         """
-        tokens = postfix_expression_string.split()
-        stack = []  # (Infix 부분식, 해당 식의 외부 연산자 우선순위)를 저장할 스택
-
-        for token in tokens:
-            if token.isalnum() or all(re.fullmatch(r'[⁰¹²³⁴⁵⁶⁷⁸⁹]', char) for char in token):
-                # 피연산자는 우선순위 4 (가장 높음, 임의 지정)로 스택에 푸시
-                stack.append((token, 4))
-            elif token in self._PRECEDENCE:
-                if len(stack) < 2:
-                    return "Error: Invalid postfix expression, not enough operands."
-
-                # Postfix: Operand1 Operand2 Operator
-                operand2_expr, operand2_prec = stack.pop()
-                operand1_expr, operand1_prec = stack.pop()
-
-                current_prec = self._PRECEDENCE[token]
-
-                # 괄호 추가 로직:
-                # 1. 현재 연산자보다 피연산자의 외부 연산자 우선순위가 더 낮으면 괄호 추가 (ex: 1 + (2*3))
-                # 2. 현재 연산자와 피연산자의 외부 연산자 우선순위가 같고, 현재 연산자가
-                #    좌측 결합(+, *, /)인데 Op2이거나, 우측 결합(^)인데 Op1이면 괄호 추가
-
-                # Op1 (좌측 항) 괄호 처리
-                if operand1_prec < current_prec or \
-                        (operand1_prec == current_prec and token == '^'):  # 우측 결합 연산자(^): Op1이 같은 우선순위면 괄호 추가
-                    op1_formatted = f"({operand1_expr})"
-                else:
-                    op1_formatted = operand1_expr
-
-                # Op2 (우측 항) 괄호 처리
-                # 좌측 결합 연산자(+, -, *, /, ÷)는 Op2가 같은 우선순위면 괄호 추가
-                if operand2_prec < current_prec or \
-                        (operand2_prec == current_prec and token != '^'):
-                    op2_formatted = f"({operand2_expr})"
-                else:
-                    op2_formatted = operand2_expr
-
-                new_infix = f"{op1_formatted} {token} {op2_formatted}"
-                stack.append((new_infix, current_prec))
-
-            else:
-                return f"Error: Invalid token '{token}' in postfix expression."
-
-        if len(stack) != 1:
-            return "Error: Invalid postfix expression, too many operands remaining."
-
-        # 최종 결과의 인픽스 식만 반환합니다.
-        return stack[0][0]
+        try:
+            tree = from_postfix_tokens(postfix_expression_string.split(), self._PRECEDENCE, self.is_numeric)
+        except ValueError as e:
+            return f"Error: {e}"
+        return to_infix(tree, self._PRECEDENCE)
 
     def evaluate_infix(self, infix):
-        postfix = self.infix_to_postfix(infix)
-        return self.evaluate_postfix(postfix)
+        try:
+            tree = self.parse_expression(infix)
+        except ValueError as e:
+            return f"Error: {e}"
+        return self.evaluate_tree(tree)
 
     def evaluate_prefix(self, prefix):
-        infix = self.prefix_to_infix(prefix)
-        return self.evaluate_infix(infix)
+        try:
+            tree = from_prefix_tokens(prefix.split(), self._PRECEDENCE, self.is_numeric)
+        except ValueError as e:
+            return f"Error: {e}"
+        return self.evaluate_tree(tree)
 
     def evaluate_postfix(self, postfix_expression_string):
         """
@@ -406,110 +408,94 @@ class Expression:
             int: The result of the evaluation.
             str: An error message if the expression is invalid or if the result is a float.
         """
+        try:
+            tree = from_postfix_tokens(postfix_expression_string.split(), self._PRECEDENCE, self.is_numeric)
+        except ValueError as e:
+            return f"Error: {e}"
+        return self.evaluate_tree(tree)
+
+    def evaluate_tree(self, tree):
+        """
+        Evaluates an expression tree bottom-up, applying the negation and boundary rules
+        to every intermediate result.
+
+        Returns:
+            int: The result of the evaluation.
+            Fraction: The result when evaluation_mode is 'Exact' and rule_rational is 'Yes'.
+            str: An error message if an operand is invalid or a rule is violated.
+        """
+        exact = self._evaluation_mode == "Exact"
+        operations = _EXACT_OPERATIONS if exact else _FLOAT_OPERATIONS
+        parse_operand = _parse_exact_operand if exact else float
+        allow_rational = exact and self._rule_rational == "Yes"
         operand_stack = []
-        tokens = postfix_expression_string.split()
 
-        for token in tokens:
-            try:
-                # If the token is a number, push it to the stack
-                operand_stack.append(float(token))
-            except ValueError:
-                # If the token is an operator, pop two operands, perform the operation, and push the result
-                if len(operand_stack) < 2:
-                    return "Error: Invalid postfix expression, not enough operands."
-
-                operand2 = operand_stack.pop()
-                operand1 = operand_stack.pop()
-
-                if token == '+':
-                    result = operand1 + operand2
-                elif token == '-':
-                    result = operand1 - operand2
-                elif token == UNICODE_MULTIPLIER or token == '*':
-                    result = operand1 * operand2
-                elif token == '/' or token == '÷':
-                    if operand2 == 0:
-                        return "Error: Division by zero."
-                    result = operand1 / operand2
-                elif token == '^':
-                    if operand2 > 5:
-                        return f"Error: Exponent value is too large. {operand2} > 5."
-                    result = operand1 ** operand2
-                else:
-                    return f"Error: Invalid operator '{token}'."
+        for node in iter_postorder(tree):
+            if isinstance(node, Operand):
+                try:
+                    operand_stack.append(parse_operand(node.token))
+                except ValueError:
+                    return f"Error: Invalid operand '{node.token}'."
+                continue
 
-                # 여기서 float 타입인지 확인하고 에러를 발생시킵니다.
-                if isinstance(result, float) and result % 1 != 0:
-                    return f"Error: The result '{result}' is a float."
+            token = node.operator
+            operand2 = operand_stack.pop()
+            operand1 = operand_stack.pop()
 
-                if self.rule_negation == "No" and result < 0:
-                    return f"Error: The result '{result}' is a negative."
-                # 결과가 정수이면 int로 변환하여 스택에 넣습니다.
-                if result < self._rule_lower_limit or result > self._rule_upper_limit:
-                    return f"Error: calculation hit the boundary value : {operand1} {token} {operand2} = {result}"
-                operand_stack.append(int(result))
+            operation = operations.get(token)
+            if operation is None:
+                return f"Error: Invalid operator '{token}'."
+            if token == '^':
+                if operand2 > 5:
+                    return f"Error: Exponent value is too large. {operand2} > 5."
+                if exact and type(operand2) is not int:
+                    return f"Error: Exponent value must be an integer. {operand2}"
 
-        if len(operand_stack) != 1:
-            return "Error: Invalid postfix expression, too many operands."
+            try:
+                result = operation(operand1, operand2)
+            except ZeroDivisionError:
+                return "Error: Division by zero."
+
+            if type(result) is not int:
+                if exact:
+                    if result.denominator == 1:
+                        result = int(result)
+                    elif not allow_rational:
+                        return f"Error: The result '{result}' is a fraction."
+                elif result % 1 != 0:
+                    # 여기서 float 타입인지 확인하고 에러를 발생시킵니다.
+                    return f"Error: The result '{result}' is a float."
+                else:
+                    result = int(result)
+
+            if self.rule_negation == "No" and result < 0:
+                return f"Error: The result '{result}' is a negative."
+            if result < self._rule_lower_limit or result > self._rule_upper_limit:
+                return f"Error: calculation hit the boundary value : {operand1} {token} {operand2} = {result}"
+            operand_stack.append(result)
 
         # Return the final result
         final_result = operand_stack.pop()
         return final_result
 
-    def _infix_to_unicode_format(self, expression: str) -> str:
+    def render_expression(self, tree) -> tuple[str, str]:
+        """Renders an expression tree as (unicode, LaTeX) strings in a single pass."""
+        return render_unicode_and_latex(tree)
 
-        infix_notation = expression
-        prefix_expression = self.infix_to_prefix(expression)
-        postfix_expression = self.infix_to_postfix(expression)
-        if "Error:" in prefix_expression:
-            return prefix_expression  # 오류 메시지를 그대로 반환
+    def _rendered_conversion(self, expression: str) -> ConversionEntry:
+        entry = self._get_conversion(expression)
+        if entry.error is None and entry.unicode is None:
+            entry.unicode, entry.latex = render_unicode_and_latex(entry.tree)
+        return entry
 
-        tokens = prefix_expression.split()
-
-        current_index = 0
-        while len(tokens) > 1:
-            if current_index + 2 >= len(tokens):
-                current_index = 0
-                if len(tokens) > 1 and current_index + 2 < len(tokens):
-                    continue
-                else:
-                    break
-            token1 = tokens[current_index]
-            token2 = tokens[current_index + 1]
-            token3 = tokens[current_index + 2]
-            # find pattern
-            if identify_token_type(token1) == "Operator" and identify_token_type(token2) != "Operator" and identify_token_type(token3) != "Operator":
-                operator = token1
-                left_term = token2
-                right_term = token3
-                if operator == "^":
-                    print(f"infix: {expression}, prefix: {prefix_expression}, l: {left_term}, r: {right_term}")
-                    if identify_token_type(left_term) == "Unknown":
-                        new_term = f"({left_term}){SUPERSCRIPT_NUMBERS[right_term]}"
-                    else:
-                        if identify_token_type(right_term) == "Number" and any(c in SUPERSCRIPT_NUMBERS.values() for c in right_term):
-                            new_term = f"({left_term}{SUPERSCRIPT_NUMBERS[right_term[0]]}){right_term[1:]}"
-                        else:
-                            new_term = f"{left_term}{SUPERSCRIPT_NUMBERS[right_term]}"
-                elif operator == "*":
-                    new_term = f"({left_term} {UNICODE_MULTIPLIER} {right_term})"
-                elif operator == "/":
-                    new_term = f"({left_term} {UNICODE_DIVISION} {right_term})"
-                else:
-                    new_term = f"({left_term} {operator} {right_term})"
-
-                tokens[current_index] = new_term
-                del tokens[current_index + 2]
-                del tokens[current_index + 1]
-                current_index = 0
-            else:
-                current_index = current_index + 1
-        if not tokens:
-            return "Error: no expression found."
-
-        final_result = tokens[0]
-
-        if final_result.startswith('(') and final_result.endswith(')'):
-            return final_result[1:-1]
-
-        return final_result
+    def _infix_to_unicode_format(self, expression: str) -> str:
+        entry = self._rendered_conversion(expression)
+        if entry.error is not None:
+            return f"Error: {entry.error}"
+        return entry.unicode
+
+    def _infix_to_latex_format(self, expression: str) -> str:
+        entry = self._rendered_conversion(expression)
+        if entry.error is not None:
+            return f"Error: {entry.error}"
+        return entry.latex
@@ -0,0 +1,257 @@
+import bisect
+import random
+
+# 도형(shape) 표현:
+#   'n'                  : 숫자 피연산자
+#   'p'                  : 거듭제곱 피연산자 (base ^ power)
+#   'e'                  : 지수 자리 (2 또는 3)
+#   (op, left, right)    : 이항 연산 노드
+
+_OPERATOR_WEIGHTS = {'+': 1.0, '-': 1.5, '*': 2.0, '/': 3.0, '^': 2.5}
+_POWER_LEAF_WEIGHT = 2.0
+
+
+def shape_difficulty(shape) -> float:
+    """
+    Scores an expression skeleton: every operator adds its weight, power leaves add
+    _POWER_LEAF_WEIGHT, and every operator whose operand uses an operator of a different
+    kind adds 0.5 for the extra order-of-operations step.
+    """
+    score = 0.0
+    stack = [shape]
+    while stack:
+        current = stack.pop()
+        if current == 'p':
+            score += _POWER_LEAF_WEIGHT
+            continue
+        if not isinstance(current, tuple):
+            continue
+        operator, left, right = current
+        score += _OPERATOR_WEIGHTS.get(operator, 1.0)
+        for child in (left, right):
+            if isinstance(child, tuple) and child[0] != operator:
+                score += 0.5
+            stack.append(child)
+    return score
+
+
+class ShapeValues:
+    """
+    Values every expression skeleton can take under one rule set.
+
+    Every (sub)expression value must be an integer in [low, high]; the values of a skeleton
+    are kept as a bitset in which bit i stands for low + i, and are computed once per skeleton
+    (and sub-skeleton). fill then picks the value of the whole skeleton first and splits it into
+    operand values top-down, so a solvable skeleton is filled in one pass without trial and error.
+
+    Args:
+        low (int): Smallest allowed value.
+        high (int): Largest allowed value.
+        leaf_values (dict): Values of the 'n' and 'p' leaves, e.g. {'n': range(1, 11), 'p': [4, 8, 9]}.
+        exponents (list): Values of the 'e' leaves (exponents are not limited to [low, high]).
+    """
+
+    def __init__(self, low: int, high: int, leaf_values: dict, exponents):
+        if low > high:
+            raise ValueError("Lower limit must not be greater than the upper limit.")
+        self._low = low
+        self._high = high
+        self._mask = (1 << (high - low + 1)) - 1
+        self._exponents = list(exponents)
+        self._values = {leaf: self._to_bits(values) for leaf, values in leaf_values.items()}
+        self._sorted_values = {}
+
+    def _to_bits(self, values) -> int:
+        bits = 0
+        for value in values:
+            if self._low <= value <= self._high:
+                bits |= 1 << (value - self._low)
+        return bits
+
+    def _members(self, bits: int) -> list[int]:
+        """Sorted values of a bitset."""
+        digits = bin(bits)[:1:-1]  # 가장 낮은 비트부터
+        members = []
+        index = digits.find('1')
+        while index >= 0:
+            members.append(index + self._low)
+            index = digits.find('1', index + 1)
+        return members
+
+    def _contains(self, bits: int, value: int) -> bool:
+        return self._low <= value <= self._high and bits >> (value - self._low) & 1 == 1
+
+    def _quotient_range(self, divisor: int) -> range:
+        """Values q in [low, high] with low <= q * divisor <= high (divisor must not be 0)."""
+        if divisor > 0:
+            first, last = -(-self._low // divisor), self._high // divisor
+        else:
+            first, last = -(-self._high // divisor), self._low // divisor
+        return range(max(first, self._low), min(last, self._high) + 1)
+
+    def _operands(self, shape) -> list[int]:
+        """Sorted values the skeleton can take; 'e' takes the exponents."""
+        if shape == 'e':
+            return self._exponents
+        operands = self._sorted_values.get(shape)
+        if operands is None:
+            operands = self._members(self.values(shape))
+            self._sorted_values[shape] = operands
+        return operands
+
+    def values(self, shape) -> int:
+        """Bitset of the values the skeleton can take (0 if it cannot be filled)."""
+        bits = self._values.get(shape)
+        if bits is None:
+            operator, left, right = shape
+            bits = self._combine(operator, self.values(left), self._operands(left), self._operands(right))
+            self._values[shape] = bits
+        return bits
+
+    def is_solvable(self, shape) -> bool:
+        return self.values(shape) != 0
+
+    def _combine(self, operator: str, left_bits: int, left_values: list[int], right_values: list[int]) -> int:
+        low, high = self._low, self._high
+        bits = 0
+        for right in right_values:
+            if operator == '+' or operator == '-':
+                # a ± b 는 a의 비트를 b만큼 이동한 것과 같습니다.
+                shift = right if operator == '+' else -right
+                bits |= (left_bits << shift if shift >= 0 else left_bits >> -shift) & self._mask
+            elif operator == '*' and right != 0:
+                # low <= a * b <= high 인 a만 살펴봅니다.
+                quotients = self._quotient_range(right)
+                first = bisect.bisect_left(left_values, quotients.start)
+                last = bisect.bisect_left(left_values, quotients.stop)
+                for left in left_values[first:last]:
+                    bits |= 1 << (left * right - low)
+            elif operator == '*':
+                if left_bits and low <= 0 <= high:
+                    bits |= 1 << -low
+            elif operator == '/' and right != 0:
+                # a / b = v 는 a = v * b 이므로 a와 v 중 개수가 적은 쪽을 살펴봅니다.
+                quotients = self._quotient_range(right)
+                if len(left_values) < len(quotients):
+                    for left in left_values:
+                        if left % right == 0 and low <= left // right <= high:
+                            bits |= 1 << (left // right - low)
+                else:
+                    for value in quotients:
+                        if left_bits >> (value * right - low) & 1:
+                            bits |= 1 << (value - low)
+            elif operator == '^':
+                for left in left_values:
+                    value = left ** right
+                    if low <= value <= high:
+                        bits |= 1 << (value - low)
+        return bits
+
+    def _left_operands(self, operator: str, value: int, right: int, left) -> list[int]:
+        """Values of the left skeleton left that give value with the right operand right."""
+        left_bits = self.values(left)
+        if operator == '+':
+            candidates = [value - right]
+        elif operator == '-':
+            candidates = [value + right]
+        elif operator == '*':
+            if right == 0:
+                return self._operands(left) if value == 0 else []
+            candidates = [value // right] if value % right == 0 else []
+        elif operator == '/':
+            candidates = [value * right] if right != 0 else []
+        else:
+            return [left_value for left_value in self._operands(left) if left_value ** right == value]
+        return [left_value for left_value in candidates if self._contains(left_bits, left_value)]
+
+    def fill(self, shape, rng=random):
+        """
+        Fills the skeleton with values: the value of the whole skeleton is drawn from its values,
+        then every operation splits its value into an operand pair the two sub-skeletons can take.
+
+        Returns:
+            The skeleton with every leaf replaced by (leaf, value) and every operation by
+            (operator, left, right, value), or None if the skeleton cannot be filled.
+        """
+        values = self._operands(shape)
+        if not values:
+            return None
+        return self._fill(shape, rng.choice(values), rng)
+
+    def _fill(self, shape, value: int, rng):
+        if not isinstance(shape, tuple):
+            return shape, value
+
+        operator, left, right = shape
+        pairs = [(left_value, right_value) for right_value in self._operands(right)
+                 for left_value in self._left_operands(operator, value, right_value, left)]
+        left_value, right_value = rng.choice(pairs)
+        return operator, self._fill(left, left_value, rng), self._fill(right, right_value, rng), value
+
+
+class ShapeIndex:
+    """
+    Index of expression skeletons grouped into difficulty buckets.
+
+    Shapes are sorted by shape_difficulty and split into equally sized buckets, so
+    a difficulty level of 0.0 draws from the easiest bucket and 1.0 from the hardest.
+    Each rule set (see annotate) keeps its own list of shapes that can be filled with
+    numbers under those rules.
+    """
+
+    def __init__(self, shapes, number_of_buckets: int = 5):
+        if not isinstance(number_of_buckets, int) or number_of_buckets < 1:
+            raise ValueError("Number of buckets must be an integer greater than 0.")
+
+        unique_shapes = list(dict.fromkeys(shapes))
+        if not unique_shapes:
+            raise ValueError("Shape index needs at least one shape.")
+
+        scores = {shape: shape_difficulty(shape) for shape in unique_shapes}
+        self._shapes = sorted(unique_shapes, key=scores.__getitem__)
+        self._scores = [scores[shape] for shape in self._shapes]
+
+        number_of_buckets = min(number_of_buckets, len(self._shapes))
+        bucket_size = len(self._shapes) / number_of_buckets
+        self._buckets = [list(range(int(i * bucket_size), int((i + 1) * bucket_size)))
+                         for i in range(number_of_buckets)]
+
+        self._solvable_buckets = {}  # rule_key -> 버킷별 풀 수 있는 도형 인덱스
+
+    def __len__(self):
+        return len(self._shapes)
+
+    @property
+    def number_of_buckets(self) -> int:
+        return len(self._buckets)
+
+    def annotate(self, rule_key, is_solvable):
+        """
+        Records, for one rule set, which shapes can be filled with numbers.
+
+        Args:
+            rule_key: Hashable description of the rule set (e.g. negation and limits).
+            is_solvable: Callable taking a shape and returning whether it can be filled.
+        """
+        solvable = [is_solvable(shape) for shape in self._shapes]
+        self._solvable_buckets[rule_key] = [[i for i in bucket if solvable[i]] for bucket in self._buckets]
+
+    def is_annotated(self, rule_key) -> bool:
+        return rule_key in self._solvable_buckets
+
+    def bucket_index(self, difficulty_level: float) -> int:
+        return min(int(difficulty_level * len(self._buckets)), len(self._buckets) - 1)
+
+    def sample(self, difficulty_level: float, rule_key, rng=random):
+        """
+        Draws a shape from the bucket of the given difficulty that is solvable under the rule set.
+        Falls back to the nearest non-empty bucket. Returns None if no shape is solvable.
+        """
+        buckets = self._solvable_buckets[rule_key]
+        target = self.bucket_index(difficulty_level)
+
+        for distance in range(len(buckets)):
+            for index in (target - distance, target + distance):
+                if 0 <= index < len(buckets) and buckets[index]:
+                    return self._shapes[rng.choice(buckets[index])]
+        return None
@@ -0,0 +1,303 @@
+import re
+
+from utils.unicodes import SUPERSCRIPT_NUMBERS, UNICODE_DIVISION, UNICODE_MULTIPLIER
+
+_UNICODE_OPERATORS = {'*': UNICODE_MULTIPLIER, '/': UNICODE_DIVISION}
+_LATEX_OPERATORS = {'*': r'\times', UNICODE_MULTIPLIER: r'\times', '/': r'\div', UNICODE_DIVISION: r'\div'}
+_SUPERSCRIPT_DIGITS = {superscript: digit for digit, superscript in SUPERSCRIPT_NUMBERS.items()}
+_SUPERSCRIPT_PATTERN = re.compile(f"[{''.join(_SUPERSCRIPT_DIGITS)}]+")
+
+
+class Operand:
+    """Leaf node holding a single operand token (number, variable or superscript number)."""
+    __slots__ = ('token',)
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def __repr__(self):
+        return f"Operand({self.token!r})"
+
+
+class BinaryOperation:
+    """Inner node holding a binary operator and its two sub-trees."""
+    __slots__ = ('operator', 'left', 'right')
+
+    def __init__(self, operator: str, left, right):
+        self.operator = operator
+        self.left = left
+        self.right = right
+
+    def __repr__(self):
+        return f"BinaryOperation({self.operator!r}, {self.left!r}, {self.right!r})"
+
+
+def iter_postorder(node):
+    """Yields the nodes of the tree in postfix order without recursion."""
+    stack = [(node, False)]
+    while stack:
+        current, children_done = stack.pop()
+        if children_done or isinstance(current, Operand):
+            yield current
+        else:
+            stack.append((current, True))
+            stack.append((current.right, False))
+            stack.append((current.left, False))
+
+
+def iter_preorder(node):
+    """Yields the nodes of the tree in prefix order without recursion."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        yield current
+        if isinstance(current, BinaryOperation):
+            stack.append(current.right)
+            stack.append(current.left)
+
+
+def to_postfix_tokens(node) -> list[str]:
+    return [n.token if isinstance(n, Operand) else n.operator for n in iter_postorder(node)]
+
+
+def to_prefix_tokens(node) -> list[str]:
+    return [n.token if isinstance(n, Operand) else n.operator for n in iter_preorder(node)]
+
+
+def to_infix(node, precedence: dict, full_parentheses: bool = False) -> str:
+    """
+    Renders the tree as an infix string.
+
+    Args:
+        node: Root of the tree.
+        precedence (dict): Operator precedence table (higher binds tighter).
+        full_parentheses (bool): If True every operation is wrapped in parentheses,
+            otherwise only the parentheses required by precedence/associativity are kept.
+
+    Returns:
+        str: Infix expression string.
+    """
+    # (infix 부분식, 해당 식의 외부 연산자 우선순위); 피연산자는 가장 높은 우선순위 4
+    stack = []
+    for current in iter_postorder(node):
+        if isinstance(current, Operand):
+            stack.append((current.token, 4))
+            continue
+
+        right_expr, right_prec = stack.pop()
+        left_expr, left_prec = stack.pop()
+        operator = current.operator
+        current_prec = precedence[operator]
+
+        if full_parentheses:
+            stack.append((f"({left_expr} {operator} {right_expr})", current_prec))
+            continue
+
+        # 좌측 항: 우선순위가 낮거나, 우측 결합 연산자(^)와 같은 우선순위면 괄호 추가
+        if left_prec < current_prec or (left_prec == current_prec and operator == '^'):
+            left_expr = f"({left_expr})"
+        # 우측 항: 우선순위가 낮거나, 좌측 결합 연산자와 같은 우선순위면 괄호 추가
+        if right_prec < current_prec or (right_prec == current_prec and operator != '^'):
+            right_expr = f"({right_expr})"
+
+        stack.append((f"{left_expr} {operator} {right_expr}", current_prec))
+
+    return stack[0][0]
+
+
+def _to_superscript(token: str):
+    """Returns the unicode superscript form of a digit token, or None if it has no such form."""
+    if not token.isdigit() or not all(c in SUPERSCRIPT_NUMBERS for c in token):
+        return None
+    return "".join(SUPERSCRIPT_NUMBERS[c] for c in token)
+
+
+def render_unicode_and_latex(node) -> tuple[str, str]:
+    """
+    Renders the tree in one postfix pass as (unicode, LaTeX) strings.
+
+    Every operation except exponentiation is wrapped in parentheses when it appears as an
+    operand, so the grouping of the worksheet expression is always explicit. Exponents are
+    written as unicode superscripts (2³) and as ^{...} in LaTeX. The LaTeX form has no
+    surrounding $ delimiters.
+
+    Returns:
+        tuple[str, str]: (unicode_expression, latex_expression)
+    """
+    # 스택 항목: (unicode 본문, unicode 피연산자 형태, latex 본문, latex 피연산자 형태, 음수 피연산자 여부)
+    stack = []
+    for current in iter_postorder(node):
+        if isinstance(current, Operand):
+            token = current.token
+            stack.append((token, token, token, token, token.startswith('-')))
+            continue
+
+        right_uni, right_uni_operand, right_tex, right_tex_operand, right_negative = stack.pop()
+        left_uni, left_uni_operand, left_tex, left_tex_operand, left_negative = stack.pop()
+        operator = current.operator
+
+        if operator == '^':
+            left_is_leaf = isinstance(current.left, Operand)
+            base_uni = left_uni if left_is_leaf and not left_negative else f"({left_uni})"
+            base_tex = left_tex if left_is_leaf and not left_negative else f"\\left({left_tex}\\right)"
+
+            superscript = _to_superscript(right_uni) if isinstance(current.right, Operand) else None
+            if superscript is not None:
+                uni = f"{base_uni}{superscript}"
+            else:
+                uni = f"{base_uni}^({right_uni})"
+            tex = f"{base_tex}^{{{right_tex}}}"
+            # 거듭제곱은 피연산자로 쓰일 때도 괄호를 추가하지 않습니다.
+            stack.append((uni, uni, tex, tex, False))
+            continue
+
+        uni_operator = _UNICODE_OPERATORS.get(operator, operator)
+        tex_operator = _LATEX_OPERATORS.get(operator, operator)
+        if right_negative:
+            right_uni_operand = f"({right_uni_operand})"
+            right_tex_operand = f"({right_tex_operand})"
+
+        uni = f"{left_uni_operand} {uni_operator} {right_uni_operand}"
+        tex = f"{left_tex_operand} {tex_operator} {right_tex_operand}"
+        stack.append((uni, f"({uni})", tex, f"\\left({tex}\\right)", False))
+
+    unicode_expression, _, latex_expression, _, _ = stack[0]
+    return unicode_expression, latex_expression
+
+
+def unicode_to_infix(unicode_expression: str) -> str:
+    """
+    Converts an expression rendered by render_unicode_and_latex back to a plain infix string:
+    × and ÷ become * and /, and superscripts become ^ powers (2³ -> 2 ^ 3, (1 + 2)² -> (1 + 2) ^ 2).
+    """
+    infix = unicode_expression.replace(UNICODE_MULTIPLIER, '*').replace(UNICODE_DIVISION, '/')
+    return _SUPERSCRIPT_PATTERN.sub(
+        lambda match: " ^ " + "".join(_SUPERSCRIPT_DIGITS[c] for c in match.group()), infix)
+
+
+def canonical_form(node, commutative_operators=('+', '*')) -> str:
+    """
+    Renders the tree as a fully parenthesized string in which the operands of chained commutative
+    operators are flattened and sorted, so a + b and b + a, or (a * b) * c and c * (b * a), give
+    the same string. Non-commutative operators keep their operand order.
+    """
+    # 스택 항목: (부분식 문자열, 부분식의 연산자, 교환 가능한 연산자일 때 평탄화된 피연산자 목록)
+    stack = []
+    for current in iter_postorder(node):
+        if isinstance(current, Operand):
+            stack.append((current.token, None, None))
+            continue
+
+        right = stack.pop()
+        left = stack.pop()
+        operator = current.operator
+        if operator in commutative_operators:
+            parts = []
+            for text, child_operator, child_parts in (left, right):
+                parts.extend(child_parts if child_operator == operator else [text])
+            parts.sort()
+            stack.append((f"({f' {operator} '.join(parts)})", operator, parts))
+        else:
+            stack.append((f"({left[0]} {operator} {right[0]})", operator, None))
+
+    return stack[0][0]
+
+
+def from_infix_tokens(tokens: list[str], precedence: dict, is_operand) -> object:
+    """
+    Builds a tree from infix tokens with the shunting-yard algorithm.
+    '^' is treated as right associative, every other operator as left associative.
+
+    Raises:
+        ValueError: If the tokens do not form a valid infix expression.
+    """
+    operands = []
+    operator_stack = []
+
+    def reduce_top():
+        operator = operator_stack.pop()
+        if len(operands) < 2:
+            raise ValueError(f"Not enough operands for operator '{operator}'.")
+        right = operands.pop()
+        left = operands.pop()
+        operands.append(BinaryOperation(operator, left, right))
+
+    for token in tokens:
+        if token == '(':
+            operator_stack.append(token)
+        elif token == ')':
+            while operator_stack and operator_stack[-1] != '(':
+                reduce_top()
+            if not operator_stack:
+                raise ValueError("Mismatched parentheses.")
+            operator_stack.pop()
+        elif token in precedence:
+            token_prec = precedence[token]
+            while (operator_stack and operator_stack[-1] != '(' and
+                   (precedence[operator_stack[-1]] > token_prec or
+                    (precedence[operator_stack[-1]] == token_prec and token != '^'))):
+                reduce_top()
+            operator_stack.append(token)
+        elif is_operand(token):
+            operands.append(Operand(token))
+        else:
+            raise ValueError(f"Invalid token '{token}' in expression.")
+
+    while operator_stack:
+        if operator_stack[-1] == '(':
+            raise ValueError("Mismatched parentheses.")
+        reduce_top()
+
+    if len(operands) != 1:
+        raise ValueError("Invalid expression, operands and operators do not match.")
+    return operands[0]
+
+
+def from_postfix_tokens(tokens: list[str], precedence: dict, is_operand) -> object:
+    """
+    Builds a tree from postfix tokens.
+
+    Raises:
+        ValueError: If the tokens do not form a valid postfix expression.
+    """
+    stack = []
+    for token in tokens:
+        if token in precedence:
+            if len(stack) < 2:
+                raise ValueError("Invalid postfix expression, not enough operands.")
+            right = stack.pop()
+            left = stack.pop()
+            stack.append(BinaryOperation(token, left, right))
+        elif is_operand(token):
+            stack.append(Operand(token))
+        else:
+            raise ValueError(f"Invalid token '{token}' in postfix expression.")
+
+    if len(stack) != 1:
+        raise ValueError("Invalid postfix expression, too many operands remaining.")
+    return stack[0]
+
+
+def from_prefix_tokens(tokens: list[str], precedence: dict, is_operand) -> object:
+    """
+    Builds a tree from prefix tokens (read from right to left).
+
+    Raises:
+        ValueError: If the tokens do not form a valid prefix expression.
+    """
+    stack = []
+    for token in reversed(tokens):
+        if token in precedence:
+            if len(stack) < 2:
+                raise ValueError("Invalid prefix expression, not enough operands.")
+            left = stack.pop()
+            right = stack.pop()
+            stack.append(BinaryOperation(token, left, right))
+        elif is_operand(token):
+            stack.append(Operand(token))
+        else:
+            raise ValueError(f"Invalid token '{token}' in prefix expression.")
+
+    if len(stack) != 1:
+        raise ValueError("Invalid prefix expression, too many operands remaining.")
+    return stack[0]
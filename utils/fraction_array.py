@@ -0,0 +1,177 @@
+import random
+from fractions import Fraction
+
+import numpy as np
+
+
+def numpy_generator(rng=random) -> np.random.Generator:
+    """Returns a NumPy generator seeded from the given random.Random (기본값: random 모듈)."""
+    return np.random.default_rng(rng.getrandbits(64))
+
+
+class FractionArray:
+    """
+    Array of fractions stored as two int64 arrays (numerators, denominators).
+
+    Every operation works on the whole array at once. Denominators are always kept
+    positive, and arithmetic results are reduced. Operands are combined with plain
+    cross-multiplication, so numerators and denominators should stay well below
+    3·10⁹ to avoid int64 overflow.
+    """
+    __slots__ = ('numerators', 'denominators')
+    __hash__ = None  # 비교 연산자가 배열을 반환하므로 해시할 수 없습니다.
+
+    def __init__(self, numerators, denominators=1, reduce: bool = True):
+        numerators, denominators = np.broadcast_arrays(np.asarray(numerators, dtype=np.int64),
+                                                       np.asarray(denominators, dtype=np.int64))
+        if numerators.ndim != 1:
+            numerators, denominators = numerators.reshape(-1), denominators.reshape(-1)
+        if np.any(denominators == 0):
+            raise ValueError("Denominator must not be zero.")
+
+        self.numerators = numerators.copy()
+        self.denominators = denominators.copy()
+        if reduce:
+            self._reduce()
+        self._normalize_sign()
+
+    @classmethod
+    def random(cls, size: int, numerator_range: tuple[int, int], denominator_range: tuple[int, int],
+               generator: np.random.Generator = None) -> "FractionArray":
+        """
+        Draws size fractions with numerators and denominators uniform in the inclusive ranges.
+        The fractions are not reduced, so the drawn numbers can be shown as problems.
+        """
+        generator = generator if generator is not None else numpy_generator()
+        numerators = generator.integers(numerator_range[0], numerator_range[1], size=size, endpoint=True)
+        denominators = generator.integers(denominator_range[0], denominator_range[1], size=size, endpoint=True)
+        return cls(numerators, denominators, reduce=False)
+
+    def _reduce(self):
+        """최대공약수로 약분합니다."""
+        common_divisor = np.gcd(self.numerators, self.denominators)
+        self.numerators //= common_divisor
+        self.denominators //= common_divisor
+
+    def _normalize_sign(self):
+        """분모가 음수인 분수는 분자와 분모의 부호를 모두 바꿔 분모를 양수로 만듭니다."""
+        negative = self.denominators < 0
+        self.numerators[negative] *= -1
+        self.denominators[negative] *= -1
+
+    def reduced(self) -> "FractionArray":
+        return FractionArray(self.numerators, self.denominators)
+
+    def __len__(self):
+        return len(self.numerators)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Fraction(int(self.numerators[index]), int(self.denominators[index]))
+        return FractionArray(self.numerators[index], self.denominators[index], reduce=False)
+
+    def __iter__(self):
+        for numerator, denominator in zip(self.numerators.tolist(), self.denominators.tolist()):
+            yield Fraction(numerator, denominator)
+
+    def __repr__(self):
+        pairs = ", ".join(f"{n}/{d}" for n, d in zip(self.numerators.tolist(), self.denominators.tolist()))
+        return f"FractionArray([{pairs}])"
+
+    def tolist(self) -> list[tuple[int, int]]:
+        """Returns the fractions as a list of (numerator, denominator) int pairs."""
+        return list(zip(self.numerators.tolist(), self.denominators.tolist()))
+
+    @staticmethod
+    def _coerce(other) -> "FractionArray":
+        if isinstance(other, FractionArray):
+            return other
+        if isinstance(other, Fraction):
+            return FractionArray(other.numerator, other.denominator, reduce=False)
+        return FractionArray(other)
+
+    def __neg__(self):
+        return FractionArray(-self.numerators, self.denominators, reduce=False)
+
+    def __abs__(self):
+        return FractionArray(np.abs(self.numerators), self.denominators, reduce=False)
+
+    def __add__(self, other):
+        other = self._coerce(other)
+        return FractionArray(self.numerators * other.denominators + other.numerators * self.denominators,
+                             self.denominators * other.denominators)
+
+    def __sub__(self, other):
+        other = self._coerce(other)
+        return FractionArray(self.numerators * other.denominators - other.numerators * self.denominators,
+                             self.denominators * other.denominators)
+
+    def __mul__(self, other):
+        other = self._coerce(other)
+        return FractionArray(self.numerators * other.numerators, self.denominators * other.denominators)
+
+    def __truediv__(self, other):
+        other = self._coerce(other)
+        if np.any(other.numerators == 0):
+            raise ValueError("Division by zero.")
+        return FractionArray(self.numerators * other.denominators, self.denominators * other.numerators)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __rsub__(self, other):
+        return self._coerce(other) - self
+
+    def __rtruediv__(self, other):
+        return self._coerce(other) / self
+
+    def _cross(self, other):
+        """두 배열을 통분한 분자 쌍을 반환합니다. 분모가 항상 양수이므로 대소 비교에 그대로 쓸 수 있습니다."""
+        other = self._coerce(other)
+        return self.numerators * other.denominators, other.numerators * self.denominators
+
+    def __eq__(self, other):
+        left, right = self._cross(other)
+        return left == right
+
+    def __ne__(self, other):
+        left, right = self._cross(other)
+        return left != right
+
+    def __lt__(self, other):
+        left, right = self._cross(other)
+        return left < right
+
+    def __le__(self, other):
+        left, right = self._cross(other)
+        return left <= right
+
+    def __gt__(self, other):
+        left, right = self._cross(other)
+        return left > right
+
+    def __ge__(self, other):
+        left, right = self._cross(other)
+        return left >= right
+
+    def is_terminating(self) -> np.ndarray:
+        """
+        True where the fraction has a terminating decimal expansion, i.e. where the reduced
+        denominator has no prime factors other than 2 and 5.
+        """
+        remaining = self.denominators // np.gcd(self.numerators, self.denominators)
+        for prime in (2, 5):
+            divisible = remaining % prime == 0
+            while np.any(divisible):
+                remaining[divisible] //= prime
+                divisible = remaining % prime == 0
+        return remaining == 1
+
+    def sign(self) -> np.ndarray:
+        return np.sign(self.numerators)
+
+    def where(self, condition, other) -> "FractionArray":
+        """condition이 True인 자리는 self, 나머지는 other의 값을 갖는 배열을 반환합니다."""
+        other = self._coerce(other)
+        return FractionArray(np.where(condition, self.numerators, other.numerators),
+                             np.where(condition, self.denominators, other.denominators), reduce=False)
@@ -1,6 +1,13 @@
 import random
+import re
+from functools import lru_cache
 from math import gcd
 
+_FRACTION_TYPES = ('terminating', 'repeating', 'all')
+_MAX_SAMPLING_ATTEMPTS = 1000
+_EXPANSION_CACHE_LIMIT = 1000
+_LATEX_FRACTION_PATTERN = re.compile(r'\\frac\{(-?\d+)\}\{(-?\d+)\}')
+
 
 def is_terminating_decimal(simplified_denominator: int) -> bool:
     """분모의 소인수가 2와 5만으로 이루어져 있으면 True를 반환합니다."""
@@ -42,43 +49,154 @@ def simplify_fraction(numerator: int, denominator: int) -> tuple[int, int]:
 
     return new_numerator, new_denominator
 
-def generate_random_fraction(geometry:dict) -> tuple:
-    #geometry: type: terminating, repeating, all
-    #           decimal_limit:3
-    #           digit_limit: 100
+@lru_cache(maxsize=8)
+def coprime_pair_table(max_value: int) -> tuple[tuple[tuple[int, int], ...], tuple[int, ...]]:
+    """
+    기약분수 (p, q) 표를 max(p, q) 오름차순으로 반환합니다. (q = 1인 정수와 1/1은 제외)
+
+    Returns:
+        tuple: (pairs, prefix_counts). prefix_counts[m]은 max(p, q) <= m인 쌍의 개수이므로
+        pairs[:prefix_counts[m]]이 곧 p, q <= m인 모든 쌍입니다.
+    """
+    pairs = []
+    prefix_counts = [0, 0]
+    for largest in range(2, max_value + 1):
+        # 분모가 가장 큰 쌍 (p, largest), 분자가 가장 큰 쌍 (largest, q)
+        pairs.extend((p, largest) for p in range(1, largest) if gcd(p, largest) == 1)
+        pairs.extend((largest, q) for q in range(2, largest) if gcd(largest, q) == 1)
+        prefix_counts.append(len(pairs))
+    return tuple(pairs), tuple(prefix_counts[:max_value + 1])
+
+
+@lru_cache(maxsize=4096)
+def _prime_factors(n: int) -> tuple[int, ...]:
+    """n의 서로 다른 소인수를 오름차순으로 반환합니다."""
+    factors = []
+    divisor = 2
+    while divisor * divisor <= n:
+        if n % divisor == 0:
+            factors.append(divisor)
+            while n % divisor == 0:
+                n //= divisor
+        divisor += 1 if divisor == 2 else 2
+    if n > 1:
+        factors.append(n)
+    return tuple(factors)
+
+
+def multiplicative_order(base: int, modulus: int) -> int:
+    """
+    base^k ≡ 1 (mod modulus)를 만족하는 가장 작은 k를 반환합니다. gcd(base, modulus) == 1이어야 합니다.
+
+    φ(modulus)에서 시작하여 각 소인수 p에 대해 base^(k/p) ≡ 1인 동안 k를 p로 나눕니다.
+    """
+    if modulus == 1:
+        return 1
+
+    phi = modulus
+    for prime in _prime_factors(modulus):
+        phi = phi // prime * (prime - 1)
+
+    order = phi
+    for prime in _prime_factors(phi):
+        while order % prime == 0 and pow(base, order // prime, modulus) == 1:
+            order //= prime
+    return order
+
+
+@lru_cache(maxsize=4096)
+def decimal_digit_lengths(denominator: int) -> tuple[int, int]:
+    """
+    기약분수 분모의 소수 전개 길이를 자리수를 계산하지 않고 반환합니다.
+
+    분모 = 2^a·5^b·m (gcd(m, 10) = 1)일 때 순환하지 않는 자리수는 max(a, b)이고,
+    순환 마디 길이는 10의 mod m 위수입니다.
+
+    Returns:
+        tuple[int, int]: (순환하지 않는 자리수, 순환 마디 길이). 유한 소수는 순환 마디 길이가 0입니다.
+    """
+    twos = fives = 0
+    rest = denominator
+    while rest % 2 == 0:
+        rest //= 2
+        twos += 1
+    while rest % 5 == 0:
+        rest //= 5
+        fives += 1
+
+    pre_period = max(twos, fives)
+    if rest == 1:
+        return pre_period, 0
+    return pre_period, multiplicative_order(10, rest)
+
+
+@lru_cache(maxsize=8)
+def _denominator_table(fraction_limit: int) -> tuple:
+    """분모 2..fraction_limit 각각의 (순환하지 않는 자리수, 순환 마디 길이) 표. 인덱스 = 분모."""
+    return (None, None) + tuple(decimal_digit_lengths(den) for den in range(2, fraction_limit + 1))
+
+
+@lru_cache(maxsize=64)
+def valid_denominators(fraction_limit: int, fraction_type: str, decimal_limit: int) -> tuple[int, ...]:
+    """
+    기약분수로 썼을 때 요청한 종류의 소수가 되고 decimal_limit 자리 안에 표기되는 분모 목록.
+
+    terminating: 소인수가 2와 5뿐인 분모 (2^a·5^b), 소수 자리수 ≤ decimal_limit
+    repeating: 그 외 분모, 순환하지 않는 자리수 + 순환 마디 길이 ≤ decimal_limit
+    """
+    table = _denominator_table(fraction_limit)
+    denominators = []
+    for den in range(2, fraction_limit + 1):
+        pre_period, period = table[den]
+        if fraction_type == 'terminating' and period == 0 and pre_period <= decimal_limit:
+            denominators.append(den)
+        elif fraction_type == 'repeating' and period > 0 and pre_period + period <= decimal_limit:
+            denominators.append(den)
+    return tuple(denominators)
+
+
+def generate_random_fraction(geometry:dict, rng=random) -> tuple:
+    """
+    geometry 조건에 맞는 (분자, 분모)를 반환합니다.
 
+    geometry:
+        type: 'terminating', 'repeating', 'all' (기본값 'all')
+        decimal_limit: 소수 표기의 최대 자리수 (기본값 3)
+        fraction_limit: 분자와 분모의 최댓값 (기본값 100)
+    rng: 사용할 난수 생성기 (random.Random, 기본값 random 모듈)
+
+    'terminating'/'repeating'은 미리 분류된 분모 표에서 분모를 고르고 서로소인 분자를 고르므로
+    결과는 항상 기약분수입니다.
+
+    Raises:
+        ValueError: 알 수 없는 type이거나 조건을 만족하는 분수가 없을 때.
+    """
     fraction_limit = geometry.get('fraction_limit', 100)  # 기본값 100
     decimal_limit = geometry.get('decimal_limit', 3)  # 기본값 3
     fraction_type = geometry.get('type', 'all').lower()
 
+    if fraction_type not in _FRACTION_TYPES:
+        raise ValueError(f"Fraction type must be one of {_FRACTION_TYPES}.")
+
+    if fraction_type == 'all':
+        numerator = rng.randint(1, fraction_limit)
+        denominator = rng.randint(2, fraction_limit)
+        return numerator, denominator
 
-    if fraction_type == 'terminating':
-        while True:
-            numerator = random.randint(1, fraction_limit)
-            denominator = random.randint(2, fraction_limit)
-            answer = numerator / denominator
-            answer_str = to_latex_decimal(numerator, denominator, decimal_limit)
-            if is_terminating_decimal(answer):
-                break
-            elif answer_str.startswith("Error"):
-                continue
-    elif fraction_type == 'repeating':
-        while True:
-            numerator = random.randint(1, fraction_limit)
-            denominator = random.randint(2, fraction_limit)
-            answer = numerator / denominator
-            answer_str = to_latex_decimal(numerator, denominator, decimal_limit)
-            if is_terminating_decimal(answer):
-                continue
-            elif answer_str.startswith("Error"):
-                continue
-            else:
-                break
-    elif fraction_type == 'all':
-        numerator = random.randint(1, fraction_limit)
-        denominator = random.randint(2, fraction_limit)
-
-    return numerator, denominator
+    denominators = valid_denominators(fraction_limit, fraction_type, decimal_limit)
+    if not denominators:
+        raise ValueError(f"No {fraction_type} fraction with denominator <= {fraction_limit} "
+                         f"fits within {decimal_limit} decimal digits.")
+
+    denominator = rng.choice(denominators)
+    # 서로소인 분자를 뽑습니다. 분모가 fraction_limit 이하이므로 기대 시도 횟수는 분모/φ(분모)입니다.
+    for _ in range(_MAX_SAMPLING_ATTEMPTS):
+        numerator = rng.randint(1, fraction_limit)
+        if gcd(numerator, denominator) == 1:
+            return numerator, denominator
+
+    raise ValueError(f"Could not find a numerator coprime to {denominator} "
+                     f"after {_MAX_SAMPLING_ATTEMPTS} attempts.")
 
 def  to_latex_friction(numerator: int, denominator: int) -> str:
     if denominator == 0:
@@ -86,56 +204,114 @@ def  to_latex_friction(numerator: int, denominator: int) -> str:
     return f"$\\frac{{{numerator}}}{{{denominator}}}$"
 
 
-def to_latex_decimal(num: int, den: int, max_number_repeating) -> str:
+def parse_latex_fractions(text: str) -> list[tuple[int, int]]:
+    """Returns the (numerator, denominator) pairs of every \\frac{n}{d} with integer terms in text, in order."""
+    return [(int(numerator), int(denominator)) for numerator, denominator in _LATEX_FRACTION_PATTERN.findall(text)]
+
+
+class DecimalExpansion:
     """
-    분수를 소수 문자열로 변환합니다. 순환 소수의 경우 LaTeX \overline{}로 표기합니다.
+    분수의 소수 전개: 부호, 정수 부분, 순환하지 않는 자리, 순환 마디.
 
-    분자(num)와 분모(den)는 기약분수 상태여야 합니다.
+    예) -7/6 -> negative=True, integer_part=1, non_repeating='1', repeating='6'
     """
+    __slots__ = ('negative', 'integer_part', 'non_repeating', 'repeating')
+
+    def __init__(self, negative: bool, integer_part: int, non_repeating: str, repeating: str):
+        self.negative = negative
+        self.integer_part = integer_part
+        self.non_repeating = non_repeating
+        self.repeating = repeating
+
+    def __repr__(self):
+        return (f"DecimalExpansion({self.negative!r}, {self.integer_part!r}, "
+                f"{self.non_repeating!r}, {self.repeating!r})")
 
-    # 정수 부분
-    integer_part = num // den
-    remainder = num % den
+    @property
+    def is_terminating(self) -> bool:
+        return not self.repeating
 
-    if remainder == 0:
-        return str(integer_part)
+    @property
+    def digit_count(self) -> int:
+        """소수점 아래에 표기되는 자리수 (순환하지 않는 자리 + 순환 마디 한 번)."""
+        return len(self.non_repeating) + len(self.repeating)
+
+    def fits(self, max_number_repeating: int) -> bool:
+        return self.digit_count <= max_number_repeating
+
+    def to_latex(self) -> str:
+        """소수 문자열을 반환합니다. 순환 마디는 LaTeX \\overline{}로 표기합니다."""
+        sign = "-" if self.negative else ""
+        if not self.digit_count:
+            return f"{sign}{self.integer_part}"
+        if self.is_terminating:
+            return f"{sign}{self.integer_part}.{self.non_repeating}"
+        # LaTeX 순환 마디 표기: \overline{...} 사용
+        return f"{sign}{self.integer_part}.{self.non_repeating}$\\overline{{{self.repeating}}}$"
 
-    # 소수 부분 계산
-    visited_remainders = {}  # (나머지: 자리수)
-    decimal_digits = []
-    position = 0
 
-    while remainder != 0 and remainder not in visited_remainders:
-        visited_remainders[remainder] = position
+_expansion_cache = {}  # (분자, 분모) -> DecimalExpansion
 
-        # 다음 자리수 계산
+
+def _expansion_digits(remainder: int, denominator: int, number_of_digits: int) -> str:
+    """나머지(remainder)에서 시작하여 소수점 아래 number_of_digits 자리를 계산합니다."""
+    digits = []
+    for _ in range(number_of_digits):
         remainder *= 10
-        digit = remainder // den
-        remainder %= den
+        digits.append(str(remainder // denominator))
+        remainder %= denominator
+    return "".join(digits)
 
-        decimal_digits.append(str(digit))
-        position += 1
 
-    decimal_str = "".join(decimal_digits)
+def decimal_expansion(numerator: int, denominator: int) -> DecimalExpansion:
+    """
+    분수(분모 > 0)의 소수 전개를 반환합니다. 음수는 절댓값을 전개하고 부호만 따로 기록합니다.
 
-    if remainder == 0:
-        # 유한 소수
-        if len(decimal_str) > max_number_repeating:
-            return f"Error: decimal points is too large. {decimal_str}"
-        else:
-            return f"{integer_part}.{decimal_str}"
-    else:
-        # 순환 소수
-        start_pos = visited_remainders[remainder]
+    분수는 먼저 약분하므로 2/4와 1/2는 같은 캐시 항목을 씁니다. 약분한 분자의 절댓값과 분모가
+    모두 _EXPANSION_CACHE_LIMIT 이하이면 결과를 캐시에 저장하여 같은 분수에 대해 나눗셈을
+    반복하지 않습니다. 자리수는 decimal_digit_lengths로 미리 구한 길이만큼만 계산합니다.
+    """
+    divisor = gcd(numerator, denominator)
+    numerator, denominator = numerator // divisor, denominator // divisor
+    key = (numerator, denominator)
+    expansion = _expansion_cache.get(key)
+    if expansion is not None:
+        return expansion
 
-        non_repeating_part = decimal_str[:start_pos]
-        repeating_part = decimal_str[start_pos:]
+    integer_part, remainder = divmod(abs(numerator), denominator)
+    pre_period, period = decimal_digit_lengths(denominator)
 
-        if  len(repeating_part)+len(non_repeating_part) > max_number_repeating:
-            return f"Error: repeating part is too large. {repeating_part}"
+    remainder_digits = _expansion_digits(remainder, denominator, pre_period + period)
+    expansion = DecimalExpansion(numerator < 0, integer_part,
+                                 remainder_digits[:pre_period], remainder_digits[pre_period:])
 
-        # LaTeX 순환 마디 표기: \overline{...} 사용
-        if non_repeating_part:
-            return f"{integer_part}.{non_repeating_part}$\\overline{{{repeating_part}}}$"
-        else:
-            return f"{integer_part}.$\\overline{{{repeating_part}}}$"
\ No newline at end of file
+    if abs(numerator) <= _EXPANSION_CACHE_LIMIT and denominator <= _EXPANSION_CACHE_LIMIT:
+        _expansion_cache[key] = expansion
+    return expansion
+
+
+def set_expansion_cache_limit(limit: int):
+    """캐시할 분수의 분자/분모 최댓값을 바꾸고 기존 캐시를 비웁니다."""
+    global _EXPANSION_CACHE_LIMIT
+    if not isinstance(limit, int) or limit < 0:
+        raise ValueError("Expansion cache limit must be a non-negative integer.")
+    _EXPANSION_CACHE_LIMIT = limit
+    _expansion_cache.clear()
+
+
+def to_latex_decimal(num: int, den: int, max_number_repeating) -> str:
+    """
+    분수를 소수 문자열로 변환합니다. 순환 소수의 경우 LaTeX \overline{}로 표기합니다.
+
+    분자(num)와 분모(den)는 기약분수 상태여야 합니다. 음수 분수는 절댓값의 전개 앞에 '-'를 붙입니다.
+    소수 자리수가 max_number_repeating을 넘으면 "Error"로 시작하는 문자열을 반환합니다.
+    """
+    # 자리수를 계산하기 전에 길이만으로 너무 긴 전개를 걸러냅니다.
+    pre_period, period = decimal_digit_lengths(den // gcd(num, den))
+    if pre_period + period > max_number_repeating:
+        if period == 0:
+            return f"Error: decimal points is too large. ({pre_period} digits)"
+        return f"Error: repeating part is too large. ({pre_period} + {period} digits)"
+
+    expansion = decimal_expansion(num, den)
+    return expansion.to_latex()
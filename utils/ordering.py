@@ -0,0 +1,107 @@
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+
+
+class RationalItem:
+    """
+    A number shown on a worksheet together with its exact sort key.
+
+    text is the LaTeX body without $ delimiters. key is the exact value of what the
+    student sees: a decimal is keyed on its displayed digits, not on the fraction it
+    was rounded from.
+    """
+    __slots__ = ('text', 'key')
+
+    def __init__(self, text: str, key: Fraction):
+        self.text = text
+        self.key = key
+
+    def __repr__(self):
+        return f"RationalItem({self.text!r}, {self.key!r})"
+
+
+def fraction_item(numerator: int, denominator: int) -> RationalItem:
+    return RationalItem(f"\\frac{{{numerator}}}{{{denominator}}}", Fraction(numerator, denominator))
+
+
+def decimal_item(text: str) -> RationalItem:
+    """Item for a displayed decimal string such as '0.33'."""
+    return RationalItem(text, Fraction(text))
+
+
+def compare_items(left: RationalItem, right: RationalItem) -> str:
+    """Returns '<', '>' or '=' comparing the exact values."""
+    if left.key < right.key:
+        return "<"
+    if left.key > right.key:
+        return ">"
+    return "="
+
+
+def sort_items(items, ascending: bool = True) -> list[RationalItem]:
+    """Sorts by the precomputed exact keys. Equal values keep their input order."""
+    return sorted(items, key=lambda item: item.key, reverse=not ascending)
+
+
+def format_chain(sorted_items, ascending: bool = True) -> str:
+    """
+    Joins already sorted items with '<' (or '>') and with '=' between equal values.
+    예) $\\frac{1}{2}$ = $0.50$ < $0.75$
+    """
+    strict = "<" if ascending else ">"
+    parts = [f"${sorted_items[0].text}$"]
+    for previous, current in zip(sorted_items, sorted_items[1:]):
+        relation = "=" if previous.key == current.key else strict
+        parts.append(f" {relation} ${current.text}$")
+    return "".join(parts)
+
+
+def find_ties(sorted_items) -> list[tuple[int, int]]:
+    """Index pairs of neighbouring items with equal values."""
+    return [(i, i + 1) for i in range(len(sorted_items) - 1)
+            if sorted_items[i].key == sorted_items[i + 1].key]
+
+
+def find_near_ties(sorted_items, gap: Fraction) -> list[tuple[int, int]]:
+    """Index pairs of neighbouring items whose values differ, but by less than gap."""
+    return [(i, i + 1) for i in range(len(sorted_items) - 1)
+            if 0 < abs(sorted_items[i].key - sorted_items[i + 1].key) < gap]
+
+
+class OrderedItems:
+    """
+    Items kept sorted by key while they are added, so each new item is checked against
+    its two neighbours only (O(log n) search per item).
+
+    Args:
+        near_tie_gap: Items whose values differ by less than this (but are not equal)
+            are refused. 0 accepts every item.
+    """
+
+    def __init__(self, near_tie_gap: Fraction = Fraction(0)):
+        self._near_tie_gap = Fraction(near_tie_gap)
+        self._keys = []
+        self._items = []
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item: RationalItem) -> bool:
+        """Inserts item and returns True, or returns False if it would form a near-tie."""
+        if self._near_tie_gap > 0:
+            position = bisect_left(self._keys, item.key)
+            for neighbour in self._keys[max(position - 1, 0):position + 1]:
+                if 0 < abs(neighbour - item.key) < self._near_tie_gap:
+                    return False
+
+        # 같은 값은 먼저 추가된 항목 뒤에 놓습니다.
+        position = bisect_right(self._keys, item.key)
+        self._keys.insert(position, item.key)
+        self._items.insert(position, item)
+        return True
+
+    def ascending(self) -> list[RationalItem]:
+        return list(self._items)
+
+    def descending(self) -> list[RationalItem]:
+        return self._items[::-1]
@@ -0,0 +1,199 @@
+import bisect
+import json
+import mmap
+import random
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+MAGIC = b'PPAB'
+VERSION = 1
+# magic, version, number of records, length of the chapter table (JSON)
+_HEADER = struct.Struct('<4sIQQ')
+_OFFSET = struct.Struct('<Q')
+
+
+def _padding(length: int) -> int:
+    return -length % 8
+
+
+def write_packed_bank(path: str, chapter_items) -> int:
+    """
+    Writes a packed bank from an iterable of (chapter_name, iterable of (problem, answer)).
+
+    Layout: header, chapter table (JSON list of [chapter_name, start, stop] record ranges), offsets table
+    of 2 * count + 1 little-endian uint64 (string i is heap[offsets[i]:offsets[i + 1]], problem of record k
+    is string 2k and its answer 2k + 1) and the UTF-8 string heap. The tables are 8-byte aligned.
+
+    The problems are streamed to a temporary heap file, so only the offsets (16 bytes per record)
+    are held in memory while writing.
+
+    Returns:
+        int: Number of records written.
+    """
+    chapter_ranges = []
+    offsets = array('Q', [0])
+    with tempfile.TemporaryFile() as heap:
+        position = 0
+        for chapter_name, pairs in chapter_items:
+            start = (len(offsets) - 1) // 2
+            for problem, answer in pairs:
+                for text in (problem, answer):
+                    data = text.encode('utf-8')
+                    heap.write(data)
+                    position += len(data)
+                    offsets.append(position)
+            stop = (len(offsets) - 1) // 2
+            if stop > start:
+                chapter_ranges.append([chapter_name, start, stop])
+
+        chapter_table = json.dumps(chapter_ranges).encode('utf-8')
+        count = (len(offsets) - 1) // 2
+        if offsets.itemsize != 8:
+            raise ValueError("Packed banks need 64-bit offsets.")
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+
+        heap.seek(0)
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, count, len(chapter_table)))
+            f.write(chapter_table + b'\0' * _padding(len(chapter_table)))
+            offsets.tofile(f)
+            shutil.copyfileobj(heap, f)
+    return count
+
+
+def is_packed_bank(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class PackedBank:
+    """
+    Read-only, memory-mapped view of a packed bank file (see write_packed_bank).
+
+    Opening a bank reads only the header and chapter table. A record lookup reads two fixed-width
+    offsets and the record's slice of the string heap, so random sampling and slicing touch only
+    the pages they need, and processes that open the same file share its pages through the OS page
+    cache. Pickling a PackedBank (e.g. for a process pool) sends only its path; the worker maps the
+    file again.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Packed bank '{path}' is empty.")
+
+        if self._map.size() < _HEADER.size:
+            self.close()
+            raise ValueError(f"'{path}' is not a packed bank.")
+        magic, version, self._count, table_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"'{path}' is not a version {VERSION} packed bank.")
+
+        table_start = _HEADER.size
+        chapter_ranges = json.loads(self._map[table_start:table_start + table_length].decode('utf-8'))
+        self._chapter_names = [chapter_name for chapter_name, _, _ in chapter_ranges]
+        self._chapter_ranges = {chapter_name: (start, stop) for chapter_name, start, stop in chapter_ranges}
+        self._chapter_starts = [start for _, start, _ in chapter_ranges]
+
+        self._offsets_start = table_start + table_length + _padding(table_length)
+        self._heap_start = self._offsets_start + (2 * self._count + 1) * _OFFSET.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __getstate__(self):
+        return {'path': self._path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def __len__(self):
+        return self._count
+
+    def chapters(self) -> list[str]:
+        return list(self._chapter_names)
+
+    def count(self, chapter_name: str = None) -> int:
+        if chapter_name is None:
+            return self._count
+        start, stop = self._chapter_ranges.get(chapter_name, (0, 0))
+        return stop - start
+
+    def _string(self, index: int) -> str:
+        start, stop = struct.unpack_from('<QQ', self._map, self._offsets_start + index * _OFFSET.size)
+        return self._map[self._heap_start + start:self._heap_start + stop].decode('utf-8')
+
+    def chapter_of(self, record: int) -> str:
+        return self._chapter_names[bisect.bisect_right(self._chapter_starts, record) - 1]
+
+    def __getitem__(self, record):
+        """(problem, answer) of a record, or a list of them for a slice."""
+        if isinstance(record, slice):
+            return [self[i] for i in range(*record.indices(self._count))]
+        if record < 0:
+            record += self._count
+        if not 0 <= record < self._count:
+            raise IndexError("Packed bank record out of range.")
+        return self._string(2 * record), self._string(2 * record + 1)
+
+    def sample(self, number_of_problems: int, chapter_names=None, exclude_records=(),
+               rng=random) -> list[tuple[int, str, str]]:
+        """
+        Draws number_of_problems distinct records at random from the given chapters (default: all).
+
+        Records are picked by position without building a list of candidates, so a draw costs
+        O(number_of_problems + len(exclude_records)) however large the bank is. Records in
+        exclude_records are never returned. Fewer problems are returned if the chapters do not
+        hold enough records.
+
+        Returns:
+            list[tuple[int, str, str]]: (record, problem, answer) in random order.
+        """
+        if chapter_names is None:
+            chapter_names = self._chapter_names
+        ranges = [self._chapter_ranges[name] for name in chapter_names if name in self._chapter_ranges]
+        # 선택된 장들의 레코드 범위를 하나의 연속된 번호 공간으로 이어 붙입니다.
+        range_starts = []
+        total = 0
+        for start, stop in ranges:
+            range_starts.append(total)
+            total += stop - start
+
+        excluded = set(exclude_records)
+        available = total - sum(1 for record in excluded
+                                if any(start <= record < stop for start, stop in ranges))
+        number_of_problems = min(number_of_problems, available)
+        if number_of_problems <= 0:
+            return []
+
+        # 제외된 레코드는 많아야 len(excluded)개이므로, 그만큼 더 뽑으면 항상 충분합니다.
+        records = []
+        for position in rng.sample(range(total), min(total, number_of_problems + len(excluded))):
+            range_index = bisect.bisect_right(range_starts, position) - 1
+            record = ranges[range_index][0] + position - range_starts[range_index]
+            if record not in excluded:
+                records.append(record)
+                if len(records) == number_of_problems:
+                    break
+        return [(record, *self[record]) for record in records]
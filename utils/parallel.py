@@ -0,0 +1,105 @@
+import copy
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+# 작업 프로세스마다 한 번만 받는 단원 인스턴스 (chapter_name -> 인스턴스)
+_worker_chapters = {}
+
+
+def derive_seeds(number_of_seeds: int, seed=None) -> list[int]:
+    """
+    Derives independent 64-bit task seeds from one master seed.
+    With seed=None the master seed is drawn from the random module.
+    """
+    master = random.Random(seed if seed is not None else random.getrandbits(64))
+    return [master.getrandbits(64) for _ in range(number_of_seeds)]
+
+
+def _worker_instance(chapter_instance):
+    """
+    Returns the chapter to send to the workers. A chapter that draws from the (unpicklable) random
+    module is sent as a shallow copy with its own generator instead.
+    """
+    if getattr(chapter_instance, 'rng', None) is not random:
+        return chapter_instance
+    worker_instance = copy.copy(chapter_instance)
+    worker_instance.rng = random.Random()
+    return worker_instance
+
+
+def _init_chapter_worker(chapters: dict):
+    """Worker initializer: receives every chapter once, so tasks only carry a name and a seed."""
+    global _worker_chapters
+    _worker_chapters = chapters
+
+
+def _run_chapter_chunk(task: tuple) -> list[tuple]:
+    """
+    Worker entry point: gives the worker's chapter a generator seeded for this chunk only and
+    generates number_of_problems problems.
+    Returns ('ok', problem, answer) or ('error', message, None) per problem, so one failing
+    problem does not cancel the rest of the worksheet.
+    """
+    chapter_name, seed, number_of_problems = task
+    chapter_instance = _worker_chapters[chapter_name]
+    chapter_instance.rng = random.Random(seed)
+    results = []
+    for _ in range(number_of_problems):
+        try:
+            problem, answer = chapter_instance.generate_problem()
+            results.append(('ok', problem, answer))
+        except Exception as e:
+            results.append(('error', f"Error generating problem for chapter '{chapter_name}': {e}", None))
+    return results
+
+
+def generate_problems_in_parallel(chapter_tasks: list[tuple], workers: int, seed=None,
+                                  chunksize: int = 8) -> tuple[list[str], list[str]]:
+    """
+    Generates one problem per (chapter_name, chapter_instance) task on a process pool.
+
+    Every worker receives each chapter once, through the pool initializer. The problems of one
+    chapter are split into chunks of up to chunksize problems, and every chunk is one task with
+    its own seed derived from seed. Results are put back in task order, so the same tasks, seed
+    and chunksize always give the same worksheet regardless of the number of workers or the
+    order in which they finish.
+
+    Returns:
+        tuple[list[str], list[str]]: (problem_list, answer_list)
+    """
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError("Number of workers must be a positive integer.")
+    if not isinstance(chunksize, int) or chunksize < 1:
+        raise ValueError("Chunk size must be a positive integer.")
+
+    chapters = {}
+    positions = {}  # chapter_name -> 해당 단원 문제의 작업 순서상 위치
+    for position, (chapter_name, chapter_instance) in enumerate(chapter_tasks):
+        if chapter_name not in chapters:
+            chapters[chapter_name] = _worker_instance(chapter_instance)
+        positions.setdefault(chapter_name, []).append(position)
+
+    chunks = [(chapter_name, chapter_positions[start:start + chunksize])
+              for chapter_name, chapter_positions in positions.items()
+              for start in range(0, len(chapter_positions), chunksize)]
+    seeds = derive_seeds(len(chunks), seed)
+    tasks = [(chapter_name, chunk_seed, len(chunk_positions))
+             for (chapter_name, chunk_positions), chunk_seed in zip(chunks, seeds)]
+
+    results = [None] * len(chapter_tasks)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_chapter_worker,
+                             initargs=(chapters,)) as executor:
+        for (_, chunk_positions), chunk_results in zip(chunks, executor.map(_run_chapter_chunk, tasks)):
+            for position, result in zip(chunk_positions, chunk_results):
+                results[position] = result
+
+    problem_list = []
+    answer_list = []
+    for status, problem, answer in results:
+        if status == 'ok':
+            problem_list.append(problem)
+            answer_list.append(answer)
+        else:
+            print(problem)
+
+    return problem_list, answer_list
@@ -0,0 +1,181 @@
+import json
+import random
+import sqlite3
+from fractions import Fraction
+
+from utils.dedup import problem_key
+from utils.packed_bank import write_packed_bank
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS problems (
+    id INTEGER PRIMARY KEY,
+    chapter TEXT NOT NULL,
+    difficulty REAL,
+    canonical_key TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    UNIQUE (chapter, canonical_key)
+);
+CREATE INDEX IF NOT EXISTS problems_by_chapter_difficulty ON problems (chapter, difficulty);
+"""
+# 생성 설정으로 기록하지 않는 속성
+_IGNORED_PROPERTIES = frozenset(('title', 'rng'))
+
+
+def _json_value(value):
+    return str(value) if isinstance(value, Fraction) else value
+
+
+def chapter_parameters(chapter_instance) -> dict:
+    """
+    The generation settings of a chapter: every readable property except title and rng whose value
+    is a number, string, bool, None, Fraction or a list/tuple of those. Fractions are stored as strings.
+    """
+    parameters = {}
+    for name in dir(type(chapter_instance)):
+        if name.startswith('_') or name in _IGNORED_PROPERTIES:
+            continue
+        if not isinstance(getattr(type(chapter_instance), name), property):
+            continue
+        value = getattr(chapter_instance, name)
+        is_sequence = isinstance(value, (list, tuple))
+        values = value if is_sequence else [value]
+        if all(v is None or isinstance(v, (int, float, str, Fraction)) for v in values):
+            parameters[name] = [_json_value(v) for v in values] if is_sequence else _json_value(value)
+    return parameters
+
+
+class ProblemBank:
+    """
+    Precomputed problems in a local SQLite database.
+
+    Every record holds the chapter name, difficulty (NULL for chapters without a difficulty_level
+    setting), canonical key (see utils.dedup), problem and answer strings and the chapter settings
+    used, as JSON. A chapter never stores two problems with the same canonical key.
+
+    Build the bank once with build(), then assemble worksheets with query(), which only reads
+    the (chapter, difficulty) index and the selected rows.
+    """
+
+    def __init__(self, path: str):
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def count(self, chapter_name: str = None) -> int:
+        if chapter_name is None:
+            return self._connection.execute("SELECT COUNT(*) FROM problems").fetchone()[0]
+        return self._connection.execute("SELECT COUNT(*) FROM problems WHERE chapter = ?",
+                                        (chapter_name,)).fetchone()[0]
+
+    def chapters(self) -> list[str]:
+        return [row[0] for row in self._connection.execute("SELECT DISTINCT chapter FROM problems ORDER BY chapter")]
+
+    def build(self, chapter_name: str, chapter_instance, number_of_problems: int, batch_size: int = 1000,
+              max_stale_batches: int = 3) -> int:
+        """
+        Generates problems with the chapter's generate_batch until the bank holds number_of_problems
+        problems of this chapter at the chapter's current difficulty, or until max_stale_batches batches
+        in a row add nothing new (the chapter has run out of distinct problems).
+
+        Returns:
+            int: Number of problems added.
+        """
+        difficulty = getattr(chapter_instance, 'difficulty_level', None)
+        parameters = json.dumps(chapter_parameters(chapter_instance), sort_keys=True)
+        stored = self._count_at(chapter_name, difficulty)
+        added = 0
+        stale_batches = 0
+
+        while stored + added < number_of_problems and stale_batches < max_stale_batches:
+            size = min(batch_size, number_of_problems - stored - added)
+            problem_list, answer_list = chapter_instance.generate_batch(size)
+            rows = [(chapter_name, difficulty, repr(problem_key(chapter_instance, problem, answer)),
+                     problem, answer, parameters)
+                    for problem, answer in zip(problem_list, answer_list)]
+            with self._connection:
+                before = self._connection.total_changes
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO problems (chapter, difficulty, canonical_key, problem, answer, parameters) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows)
+                inserted = self._connection.total_changes - before
+            added += inserted
+            stale_batches = 0 if inserted else stale_batches + 1
+
+        return added
+
+    def _count_at(self, chapter_name: str, difficulty) -> int:
+        if difficulty is None:
+            query = "SELECT COUNT(*) FROM problems WHERE chapter = ? AND difficulty IS NULL"
+            return self._connection.execute(query, (chapter_name,)).fetchone()[0]
+        query = "SELECT COUNT(*) FROM problems WHERE chapter = ? AND difficulty = ?"
+        return self._connection.execute(query, (chapter_name, difficulty)).fetchone()[0]
+
+    def _difficulty_conditions(self, min_difficulty, max_difficulty) -> tuple[list[str], list]:
+        conditions = []
+        arguments = []
+        if min_difficulty is not None:
+            conditions.append("(difficulty IS NULL OR difficulty >= ?)")
+            arguments.append(min_difficulty)
+        if max_difficulty is not None:
+            conditions.append("(difficulty IS NULL OR difficulty <= ?)")
+            arguments.append(max_difficulty)
+        return conditions, arguments
+
+    def export_packed(self, path: str, chapter_names=None, min_difficulty: float = None,
+                      max_difficulty: float = None) -> int:
+        """
+        Writes the problems of the given chapters (default: all) within the difficulty bounds to a
+        memory-mapped packed bank (see utils.packed_bank). Rows are streamed from the database.
+
+        Returns:
+            int: Number of problems written.
+        """
+        conditions, arguments = self._difficulty_conditions(min_difficulty, max_difficulty)
+        where = ''.join(f" AND {condition}" for condition in conditions)
+
+        def chapter_items():
+            for chapter_name in (chapter_names if chapter_names is not None else self.chapters()):
+                yield chapter_name, self._connection.execute(
+                    f"SELECT problem, answer FROM problems WHERE chapter = ?{where} ORDER BY id",
+                    [chapter_name, *arguments])
+
+        return write_packed_bank(path, chapter_items())
+
+    def query(self, chapter_names, number_of_problems: int, min_difficulty: float = None,
+              max_difficulty: float = None, exclude_ids=(), rng=random) -> list[tuple[int, str, str]]:
+        """
+        Draws number_of_problems distinct problems at random from the given chapters.
+
+        Problems without a difficulty always pass the difficulty filter. Ids in exclude_ids
+        (e.g. problems already handed out) are never returned. Fewer problems are returned if
+        the bank does not hold enough matching ones.
+
+        Returns:
+            list[tuple[int, str, str]]: (id, problem, answer) in random order.
+        """
+        difficulty_conditions, difficulty_arguments = self._difficulty_conditions(min_difficulty, max_difficulty)
+        conditions = [f"chapter IN ({', '.join('?' * len(chapter_names))})", *difficulty_conditions]
+        arguments = [*chapter_names, *difficulty_arguments]
+
+        # 인덱스만 읽어 후보 id를 모은 뒤, 뽑힌 행만 가져옵니다.
+        excluded = set(exclude_ids)
+        candidate_ids = [row[0] for row in self._connection.execute(
+            f"SELECT id FROM problems WHERE {' AND '.join(conditions)}", arguments) if row[0] not in excluded]
+        selected_ids = rng.sample(candidate_ids, min(number_of_problems, len(candidate_ids)))
+        if not selected_ids:
+            return []
+
+        rows = {row[0]: row for row in self._connection.execute(
+            f"SELECT id, problem, answer FROM problems WHERE id IN ({', '.join('?' * len(selected_ids))})",
+            selected_ids)}
+        return [rows[problem_id] for problem_id in selected_ids]
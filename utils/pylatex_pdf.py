@@ -1,9 +1,18 @@
 import re
+import subprocess
 
 from pylatex import Document, Section, Command, NoEscape, Math
-from pylatex.base_classes import Environment
+from pylatex.base_classes import Container, Environment
+from pylatex.utils import escape_latex
 import os
 
+# $...$, $$...$$, \[...\], \begin...\end... 정규식
+_MATH_PATTERN = re.compile(
+    r"(\$\$.*?\$\$|\$.*?\$|\\\[.*?\\\]|\\begin\{.*?\}.*?\\end\{.*?\})",
+    re.DOTALL
+)
+_SAFE_COMMANDS = [r'\quad', r'\qquad', r'\\', r'\centerline', r'\mbox']
+
 
 # Multicols 환경을 정의하는 클래스 (다중 컬럼 레이아웃을 위해 필요)
 class Multicols(Environment):
@@ -70,103 +79,397 @@ def generate_pdf_files(
         _add_content_to_pylatex(doc, content_list, is_problem_sheet, row_spacing)
 
     # === PDF 생성 ===
-    try:
-        filename = project.replace(" ", "_")
+    filename = project.replace(" ", "_")
+    doc.generate_tex(filename)
+    _compile_and_report(filename)
 
-        # 컴파일러 호출
-        doc.generate_pdf(filename, clean_tex=True, compiler='pdflatex', silent=False)
-        print(f"***'{filename}.pdf' 파일이 PyLaTeX로 성공적으로 생성되었습니다.")
 
+def _compile_tex(filename: str, directory: str = None, clean_tex: bool = True, silent: bool = False):
+    """
+    Runs pdflatex once on <directory>/<filename>.tex, like PyLaTeX's Document.generate_pdf, and removes
+    the auxiliary files (and the .tex file with clean_tex). Raises on failure; the .log file is kept then.
+    """
+    try:
+        output = subprocess.check_output(['pdflatex', '--interaction=nonstopmode', f'{filename}.tex'],
+                                         stderr=subprocess.STDOUT, cwd=directory or None)
+    except subprocess.CalledProcessError as e:
+        print(e.output.decode(errors='replace'))
+        raise
+    if not silent:
+        print(output.decode(errors='replace'))
+
+    extensions = ['.aux', '.log', '.out', '.fls', '.fdb_latexmk'] + (['.tex'] if clean_tex else [])
+    for extension in extensions:
+        path = os.path.join(directory or '', filename + extension)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _report_compile_error(filename: str, error: Exception):
+    print(f"\n❌ PyLaTeX 컴파일 중 오류 발생: {error}")
+    print(f"   -> 다음을 확인하세요:")
+    print(f"      1. 시스템에 'pdflatex'가 설치되어 있고 PATH에 등록되었는지 확인하세요.")
+    print(f"      2. {filename}.log 파일을 열어 컴파일 오류 내용을 확인하세요.\n")
+
+
+def _compile_and_report(filename: str, directory: str = None) -> bool:
+    """Compiles <filename>.tex with _compile_tex and prints the outcome. Returns True on success."""
+    try:
+        _compile_tex(filename, directory)
     except Exception as e:
-        print(f"\n❌ PyLaTeX 컴파일 중 오류 발생: {e}")
-        print(f"   -> 다음을 확인하세요:")
-        print(f"      1. 시스템에 'pdflatex'가 설치되어 있고 PATH에 등록되었는지 확인하세요.")
-        print(f"      2. {filename}.log 파일을 열어 컴파일 오류 내용을 확인하세요.\n")
+        _report_compile_error(filename, e)
+        return False
+    print(f"***'{filename}.pdf' 파일이 PyLaTeX로 성공적으로 생성되었습니다.")
+    return True
 
 
 def _add_content_to_pylatex(doc, content_list, is_problem_sheet, row_spacing=1):
     """목록 항목을 PyLaTeX 문서에 추가합니다."""
 
-    spacing_length = f'{row_spacing / 10:.1f}mm'
-
-    # $...$, $$...$$, \[...\], \begin...\end... 정규식
-    pattern = re.compile(
-        r"(\$\$.*?\$\$|\$.*?\$|\\\[.*?\\\]|\\begin\{.*?\}.*?\\end\{.*?\})",
-        re.DOTALL
-    )
+    for i, content in enumerate(content_list):
+        _add_item_to_pylatex(doc, i + 1, content, is_problem_sheet, row_spacing)
 
-    safe_commands = [r'\quad', r'\qquad', r'\\', r'\centerline', r'\mbox']
+    # === 페이지 하단 공간 확보 ===
+    doc.append(NoEscape(r'\vfill\null'))
 
-    for i, content in enumerate(content_list):
-        doc.append(NoEscape(r'\Large'))
-        # 1. 문제/정답 번호 추가 (ex: 1.)
-        doc.append(f'{i + 1}. ')
-
-        # 2. LaTeX 수식 부분 처리
-        #text_parts = content.split('$')
-        parts = pattern.split(content)
-
-        for part in parts:
-            if not part.strip():
-                continue
-
-            # --- 수식 또는 환경 구분 ---
-            if part.startswith('$$') and part.endswith('$$'):
-                expr = part[2:-2].strip()
-                with doc.create(Math(inline=False)) as math:
-                    math.append(NoEscape(expr))
-
-            elif part.startswith('$') and part.endswith('$'):
-                expr = part[1:-1].strip()
-                with doc.create(Math(inline=True)) as math:
-                    math.append(NoEscape(expr))
-
-            elif part.startswith(r'\[') and part.endswith(r'\]'):
-                expr = part[2:-2].strip()
-                with doc.create(Math(inline=False)) as math:
-                    math.append(NoEscape(expr))
-
-            elif part.strip().startswith(r'\begin') and r'\end' in part:
-                if re.search(r'\\(frac|sqrt|sum|int|pi|theta|alpha|beta|sin|cos|tan|log|ln)', part):
-                    safe_part = re.sub(
-                        r'(\\begin\{[a-zA-Z*]+\})(.*?)(\\end\{[a-zA-Z*]+\})',
-                        lambda m: m.group(1)
-                                  + f'$$ {m.group(2).strip()} $$'
-                                  + m.group(3),
-                        part,
-                        flags=re.DOTALL
-                    )
-                    doc.append(NoEscape(safe_part))
-                else:
-                    doc.append(NoEscape(part))
-
-            # --- 수식 명령 자동 감지 ---
-            elif re.search(r'\\(frac|sqrt|sum|int|pi|theta|alpha|beta|sin|cos|tan|log|ln)', part):
-                with doc.create(Math(inline=True)) as math:
-                    math.append(NoEscape(part.strip()))
 
-            else:
-                #doc.append(part.strip())
-                is_latex_command = any(part.strip().startswith(cmd) for cmd in safe_commands)
+def _add_item_to_pylatex(doc, number, content, is_problem_sheet, row_spacing=1):
+    """번호가 붙은 항목 하나를 PyLaTeX 문서(또는 컨테이너)에 추가합니다."""
 
-                if r'\\' in part or is_latex_command:
-                    doc.append(NoEscape(part.strip()))  # \quad, \qquad 포함
-                else:
-                    doc.append(part.strip())
+    spacing_length = f'{row_spacing / 10:.1f}mm'
 
+    doc.append(NoEscape(r'\Large'))
+    # 1. 문제/정답 번호 추가 (ex: 1.)
+    doc.append(f'{number}. ')
+
+    # 2. LaTeX 수식 부분 처리
+    parts = _MATH_PATTERN.split(content)
+
+    for part in parts:
+        if not part.strip():
+            continue
+
+        # --- 수식 또는 환경 구분 ---
+        if part.startswith('$$') and part.endswith('$$'):
+            expr = part[2:-2].strip()
+            with doc.create(Math(inline=False)) as math:
+                math.append(NoEscape(expr))
+
+        elif part.startswith('$') and part.endswith('$'):
+            expr = part[1:-1].strip()
+            with doc.create(Math(inline=True)) as math:
+                math.append(NoEscape(expr))
+
+        elif part.startswith(r'\[') and part.endswith(r'\]'):
+            expr = part[2:-2].strip()
+            with doc.create(Math(inline=False)) as math:
+                math.append(NoEscape(expr))
+
+        elif part.strip().startswith(r'\begin') and r'\end' in part:
+            if re.search(r'\\(frac|sqrt|sum|int|pi|theta|alpha|beta|sin|cos|tan|log|ln)', part):
+                safe_part = re.sub(
+                    r'(\\begin\{[a-zA-Z*]+\})(.*?)(\\end\{[a-zA-Z*]+\})',
+                    lambda m: m.group(1)
+                              + f'$$ {m.group(2).strip()} $$'
+                              + m.group(3),
+                    part,
+                    flags=re.DOTALL
+                )
+                doc.append(NoEscape(safe_part))
+            else:
+                doc.append(NoEscape(part))
 
-        # 'Problems'의 경우 공백이 필요하고, 'Answers'의 경우 공백이 적어도 됨
-        if is_problem_sheet:
-             # 문제지에는 풀이 공간을 위해 넉넉한 세로 공백을 추가
-             doc.append(NoEscape(r'\par\vspace{' + spacing_length + r'}\par\nobreak'))
+        # --- 수식 명령 자동 감지 ---
+        elif re.search(r'\\(frac|sqrt|sum|int|pi|theta|alpha|beta|sin|cos|tan|log|ln)', part):
+            with doc.create(Math(inline=True)) as math:
+                math.append(NoEscape(part.strip()))
 
         else:
-             # 정답지는 간결하게 작은 공백만 추가
-            doc.append(NoEscape(r'\par\medskip'))
+            is_latex_command = any(part.strip().startswith(cmd) for cmd in _SAFE_COMMANDS)
 
+            if r'\\' in part or is_latex_command:
+                doc.append(NoEscape(part.strip()))  # \quad, \qquad 포함
+            else:
+                doc.append(part.strip())
 
-    # === 페이지 하단 공간 확보 ===
-    doc.append(NoEscape(r'\vfill\null'))
+    # 'Problems'의 경우 공백이 필요하고, 'Answers'의 경우 공백이 적어도 됨
+    if is_problem_sheet:
+         # 문제지에는 풀이 공간을 위해 넉넉한 세로 공백을 추가
+         doc.append(NoEscape(r'\par\vspace{' + spacing_length + r'}\par\nobreak'))
+
+    else:
+         # 정답지는 간결하게 작은 공백만 추가
+        doc.append(NoEscape(r'\par\medskip'))
+
+
+class _Fragment(Container):
+    """문항 하나를 LaTeX 문자열로 변환하기 위한 컨테이너."""
+
+    def dumps(self):
+        return self.dumps_content()
+
+
+class StreamingTexWriter:
+    """
+    Writes numbered items straight into a .tex file as they arrive, with the same layout as
+    generate_pdf_files, so a worksheet never has to be held in memory as a whole.
+
+    Usage:
+        with StreamingTexWriter("Simplify Problems", num_column=1, row_spacing=400) as writer:
+            for problem in problems:
+                writer.write(problem)
+        writer.compile_pdf()
+    """
+    _CONTENT_MARKER = '%%STREAMING-CONTENT%%'
+
+    def __init__(self, project: str, num_column: int = 1, row_spacing: int = 20, directory: str = None):
+        self.project = project
+        self.filename = project.replace(" ", "_")
+        self.directory = directory
+        self.num_column = num_column
+        self.row_spacing = row_spacing
+        self.number_of_items = 0
+        self._is_problem_sheet = "Problem" in project
+        self._file = None
+        self._tail = None
+
+    def _document_parts(self) -> tuple[str, str]:
+        """generate_pdf_files와 같은 문서를 만들고 본문 자리에서 나누어 (앞부분, 뒷부분)을 반환합니다."""
+        doc = _create_pylatex_doc(self.project)
+        doc.append(NoEscape(r'\maketitle'))
+        doc.append(NoEscape(r'\vspace*{-0.5cm}'))
+
+        if self.num_column > 1:
+            doc.append(NoEscape(r'\raggedcolumns'))
+            with doc.create(Multicols(cols=self.num_column)):
+                doc.append(NoEscape(self._CONTENT_MARKER))
+                doc.append(NoEscape(r'\vfill\null'))
+        else:
+            doc.append(NoEscape(self._CONTENT_MARKER))
+            doc.append(NoEscape(r'\vfill\null'))
+
+        head, tail = doc.dumps().split(self._CONTENT_MARKER)
+        return head, tail
+
+    @property
+    def tex_path(self) -> str:
+        """.tex 파일 경로 (directory가 없으면 현재 디렉터리)."""
+        return os.path.join(self.directory or '', f"{self.filename}.tex")
+
+    def __enter__(self):
+        head, self._tail = self._document_parts()
+        self._file = open(self.tex_path, "w", encoding="utf-8")
+        self._file.write(head)
+        return self
+
+    def write(self, content: str):
+        """항목 하나를 번호를 붙여 바로 파일에 기록합니다."""
+        self.number_of_items += 1
+        fragment = _Fragment()
+        _add_item_to_pylatex(fragment, self.number_of_items, content, self._is_problem_sheet, self.row_spacing)
+        self._file.write(fragment.dumps() + '%\n')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._file.write(self._tail)
+        self._file.close()
+        return False
+
+    def compile_pdf(self, clean_tex: bool = True):
+        """pdflatex로 기록된 .tex 파일을 컴파일합니다 (generate_pdf_files와 같은 _compile_tex). 실패하면 예외가 발생합니다."""
+        _compile_tex(self.filename, self.directory, clean_tex)
+
+
+def _variant_file_names(names: list[str]) -> list[str]:
+    """
+    File name parts for the split variant PDFs. Unicode letters and digits are kept, every other
+    run of characters becomes '_', and a repeated name gets a _2, _3, ... suffix so no file
+    overwrites another.
+    """
+    file_names = []
+    used = set()
+    for name in names:
+        base = re.sub(r'[^\w-]+', '_', name).strip('_') or 'variant'
+        file_name, suffix = base, 2
+        while file_name.casefold() in used:
+            file_name = f"{base}_{suffix}"
+            suffix += 1
+        used.add(file_name.casefold())
+        file_names.append(file_name)
+    return file_names
+
+
+def _variant_page_ranges(pages_path: str, number_of_variants: int, number_of_pages: int) -> list[tuple[int, int]]:
+    """
+    Reads the page map written by VariantTexWriter (the 1-based first page of every variant, one per
+    line) and returns the 0-based (start, stop) page range of every variant in a PDF of number_of_pages.
+
+    Raises:
+        ValueError: If the map does not list number_of_variants increasing pages within the PDF.
+    """
+    with open(pages_path, encoding='utf-8') as f:
+        first_pages = [int(line) - 1 for line in f if line.strip()]
+    if len(first_pages) != number_of_variants:
+        raise ValueError(f"{pages_path} lists {len(first_pages)} variants, expected {number_of_variants}.")
+
+    boundaries = first_pages + [number_of_pages]
+    if any(start < 0 or start >= stop for start, stop in zip(boundaries, boundaries[1:])):
+        raise ValueError(f"{pages_path} does not match a PDF of {number_of_pages} pages.")
+    return list(zip(boundaries, boundaries[1:]))
+
+
+class VariantTexWriter(StreamingTexWriter):
+    """
+    StreamingTexWriter for many variants of one worksheet in a single .tex file: every variant
+    (e.g. one per student) starts on a new page with its own heading, item numbers and page numbers.
+
+    While compiling, pdflatex records the first page of every variant in <filename>.pages, so
+    split_pdf can cut the compiled PDF into one file per variant afterwards.
+
+    Usage:
+        with VariantTexWriter("Simplify Problems", num_column=1, row_spacing=400) as writer:
+            for student in students:
+                writer.start_variant(student)
+                for problem in problems_of(student):
+                    writer.write(problem)
+        writer.compile_pdf()
+        writer.split_pdf()
+    """
+
+    def __init__(self, project: str, num_column: int = 1, row_spacing: int = 20, directory: str = None):
+        super().__init__(project, num_column, row_spacing, directory)
+        self.headings = []
+
+    @property
+    def pages_path(self) -> str:
+        return os.path.join(self.directory or '', f"{self.filename}.pages")
+
+    def _document_parts(self) -> tuple[str, str]:
+        doc = _create_pylatex_doc(self.project)
+        # 각 변형의 첫 페이지 번호(1부터, 출력 중인 페이지 포함)를 출력 시점에 .pages 파일에 기록합니다.
+        # \ReadonlyShipoutCounter는 LaTeX 2020-10 이후에만 있으므로, atbegshi로 출력된 페이지를 직접 셉니다.
+        doc.preamble.append(NoEscape(r'\usepackage{atbegshi}'))
+        doc.preamble.append(NoEscape(r'\newcount\variantshipouts'))
+        doc.preamble.append(NoEscape(r'\AtBeginShipout{\global\advance\variantshipouts by 1}'))
+        doc.preamble.append(NoEscape(r'\newwrite\variantpages\immediate\openout\variantpages=\jobname.pages'))
+        doc.append(NoEscape(self._CONTENT_MARKER))
+        head, tail = doc.dumps().split(self._CONTENT_MARKER)
+        return head, tail
+
+    def _end_variant(self):
+        if not self.headings:
+            return
+        fragment = _Fragment()
+        fragment.append(NoEscape(r'\vfill\null'))
+        if self.num_column > 1:
+            fragment.append(NoEscape(r'\end{multicols}'))
+        self._file.write(fragment.dumps() + '%\n')
+
+    def start_variant(self, heading: str):
+        """Starts a new variant on a new page; item numbering starts again at 1."""
+        self._end_variant()
+        self.headings.append(heading)
+        self.number_of_items = 0
+
+        title = escape_latex(self.project)
+        fragment = _Fragment()
+        fragment.append(NoEscape(r'\clearpage\setcounter{page}{1}'))
+        fragment.append(NoEscape(r'\write\variantpages{\the\variantshipouts}'))
+        fragment.append(NoEscape(r'\begin{center}{\LARGE\textbf{' + title + r'}}\\[1ex]'
+                                 r'{\large ' + escape_latex(heading) + r'}\\[1ex]'
+                                 r'Underline and Circle where necessary!!\end{center}'))
+        if self.num_column > 1:
+            fragment.append(NoEscape(r'\raggedcolumns'))
+            fragment.append(NoEscape(r'\begin{multicols}{' + str(self.num_column) + '}'))
+        self._file.write(fragment.dumps() + '%\n')
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._end_variant()
+        return super().__exit__(exc_type, exc_value, traceback)
+
+    def split_pdf(self, names: list[str] = None) -> list[str]:
+        """
+        Splits the compiled PDF into <filename>_<name>.pdf per variant (names default to the
+        headings; see _variant_file_names). Needs the optional pypdf package.
+
+        Returns:
+            list[str]: Paths of the written files.
+        """
+        try:
+            from pypdf import PdfReader, PdfWriter
+        except ImportError as e:
+            raise ImportError("Splitting variant PDFs needs the optional 'pypdf' package (pip install pypdf).") from e
+
+        names = names if names is not None else self.headings
+        reader = PdfReader(os.path.join(self.directory or '', f"{self.filename}.pdf"))
+        paths = []
+        page_ranges = _variant_page_ranges(self.pages_path, len(names), len(reader.pages))
+        for file_name, (start, stop) in zip(_variant_file_names(names), page_ranges):
+            writer = PdfWriter()
+            for page in reader.pages[start:stop]:
+                writer.add_page(page)
+            path = os.path.join(self.directory or '', f"{self.filename}_{file_name}.pdf")
+            with open(path, 'wb') as f:
+                writer.write(f)
+            paths.append(path)
+        return paths
+
+
+def generate_pdf_files_streaming(
+        problem_project: str,
+        answer_project: str,
+        problem_answer_pairs,
+        problem_columns: int = 1,
+        answer_columns: int = 2,
+        row_spacing: int = 20
+):
+    """
+    Consumes (problem, answer) pairs one at a time and writes the problem and answer sheets
+    side by side, then compiles both. Works with any iterator, e.g. chapter.iter_problems(n),
+    so the first items are already on disk before the last one is generated.
+    """
+    with StreamingTexWriter(problem_project, problem_columns, row_spacing) as problem_writer, \
+            StreamingTexWriter(answer_project, answer_columns) as answer_writer:
+        for problem, answer in problem_answer_pairs:
+            problem_writer.write(problem)
+            answer_writer.write(answer)
+
+    for writer in (problem_writer, answer_writer):
+        _compile_and_report(writer.filename, writer.directory)
+
+
+def generate_variant_pdf_files(
+        problem_project: str,
+        answer_project: str,
+        variants,
+        problem_columns: int = 1,
+        answer_columns: int = 2,
+        row_spacing: int = 20,
+        split: bool = False
+):
+    """
+    Writes every (heading, problem_answer_pairs) variant into one problem sheet and one answer sheet,
+    a new page per variant, so N variants take two pdflatex runs instead of 2N. With split, both
+    PDFs are also cut into one file per variant (see VariantTexWriter.split_pdf).
+    """
+    with VariantTexWriter(problem_project, problem_columns, row_spacing) as problem_writer, \
+            VariantTexWriter(answer_project, answer_columns) as answer_writer:
+        for heading, problem_answer_pairs in variants:
+            problem_writer.start_variant(heading)
+            answer_writer.start_variant(heading)
+            for problem, answer in problem_answer_pairs:
+                problem_writer.write(problem)
+                answer_writer.write(answer)
+
+    for writer in (problem_writer, answer_writer):
+        if not _compile_and_report(writer.filename, writer.directory) or not split:
+            continue
+        try:
+            paths = writer.split_pdf()
+            print(f"***'{writer.filename}.pdf' 파일을 {len(paths)}개의 파일로 나누었습니다.")
+        except ImportError:
+            print("Error: PDF를 나누려면 'pypdf' 패키지가 필요합니다.")
+        except Exception as e:
+            print(f"Error: '{writer.filename}.pdf' 파일을 나누지 못했습니다: {e}")
 
 
 def main():
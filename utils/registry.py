@@ -0,0 +1,101 @@
+import importlib
+import random
+
+
+class ChapterRegistry:
+    """
+    Maps chapter names to 'module.path:ClassName' import paths and creates each chapter on first use.
+
+    A chapter's module is imported only when the chapter is looked up, so a unit that is asked for
+    one chapter does not pay for importing (and instantiating) all of them. Names keep the order
+    in which they were registered.
+    """
+
+    def __init__(self, import_paths: dict[str, str]):
+        self._import_paths = dict(import_paths)
+        self._instances = {}
+        self._seeds = {}
+        self._shared_rng = True
+
+    def __contains__(self, chapter_name) -> bool:
+        return chapter_name in self._import_paths
+
+    def __iter__(self):
+        return iter(self._import_paths)
+
+    def __len__(self):
+        return len(self._import_paths)
+
+    def keys(self):
+        return self._import_paths.keys()
+
+    def __getitem__(self, chapter_name: str):
+        chapter_instance = self._instances.get(chapter_name)
+        if chapter_instance is None:
+            chapter_instance = self._load(chapter_name)
+        return chapter_instance
+
+    def get(self, chapter_name: str, default=None):
+        """Returns the chapter, importing and creating it if needed, or default for an unknown name."""
+        if chapter_name not in self._import_paths:
+            return default
+        return self[chapter_name]
+
+    def values(self) -> list:
+        """Creates every chapter that has not been used yet and returns all of them in registry order."""
+        return [self[chapter_name] for chapter_name in self._import_paths]
+
+    def items(self) -> list[tuple]:
+        return list(zip(self._import_paths, self.values()))
+
+    def loaded(self) -> list[str]:
+        """Names of the chapters that have been created so far."""
+        return [chapter_name for chapter_name in self._import_paths if chapter_name in self._instances]
+
+    def _load(self, chapter_name: str):
+        module_path, _, class_name = self._import_paths[chapter_name].partition(':')
+        chapter_class = getattr(importlib.import_module(module_path), class_name)
+        chapter_instance = chapter_class()
+        self._instances[chapter_name] = chapter_instance
+        self._apply_seed(chapter_name, chapter_instance)
+        return chapter_instance
+
+    def _apply_seed(self, chapter_name: str, chapter_instance):
+        if hasattr(chapter_instance, 'rng'):
+            chapter_instance.rng = None if self._shared_rng else random.Random(self._seeds[chapter_name])
+
+    def assign_substreams(self, rng):
+        """
+        Gives every chapter its own substream of rng, in registry order, like utils.rng.assign_substreams.
+
+        The 64-bit seeds are drawn for all chapters right away, so rng advances the same way and every
+        chapter gets the same stream whether it is created now or later. With the random module as rng
+        the chapters share it instead.
+        """
+        self._shared_rng = rng is random
+        self._seeds = {} if self._shared_rng else {chapter_name: rng.getrandbits(64)
+                                                   for chapter_name in self._import_paths}
+        for chapter_name, chapter_instance in self._instances.items():
+            self._apply_seed(chapter_name, chapter_instance)
+
+    def save_substreams(self) -> tuple:
+        """Returns the current substream seeds and chapter generators, for restore_substreams."""
+        chapter_rngs = {chapter_name: chapter_instance.rng for chapter_name, chapter_instance in self._instances.items()
+                        if hasattr(chapter_instance, 'rng')}
+        return self._shared_rng, dict(self._seeds), chapter_rngs
+
+    def restore_substreams(self, state: tuple):
+        """
+        Puts back the state returned by save_substreams. Chapters created since then start on the
+        substream they would have had under the restored seeds.
+
+        Chapters get their generators back through their rng setter, like in assign_substreams, so a
+        chapter that caches anything drawn from its generator has to reset that cache in the setter.
+        """
+        self._shared_rng, seeds, chapter_rngs = state
+        self._seeds = dict(seeds)
+        for chapter_name, chapter_instance in self._instances.items():
+            if chapter_name in chapter_rngs:
+                chapter_instance.rng = chapter_rngs[chapter_name]
+            else:
+                self._apply_seed(chapter_name, chapter_instance)
@@ -0,0 +1,37 @@
+import random
+
+
+def as_random(rng=None):
+    """
+    Normalizes the rng argument accepted by the chapter and unit classes.
+
+    None           -> the random module itself (shared global stream, 기존 동작)
+    int            -> random.Random(seed)
+    random.Random  -> used as is
+    numpy Generator -> random.Random seeded from one draw of the generator
+
+    Raises:
+        ValueError: For any other value.
+    """
+    if rng is None or rng is random or isinstance(rng, random.Random):
+        return rng if rng is not None else random
+    if isinstance(rng, int):
+        return random.Random(rng)
+    if hasattr(rng, 'integers') and hasattr(rng, 'bit_generator'):
+        return random.Random(int(rng.integers(0, 2 ** 63)))
+    raise ValueError("rng must be None, an int seed, a random.Random or a numpy Generator.")
+
+
+def substream(rng) -> random.Random:
+    """Derives an independent random.Random from one 64-bit draw of rng."""
+    return random.Random(rng.getrandbits(64))
+
+
+def assign_substreams(chapter_instances, rng):
+    """
+    Gives every chapter its own substream of rng, in registry order, so one master seed
+    reproduces the whole unit. With the random module as rng the chapters share it instead.
+    """
+    for chapter_instance in chapter_instances:
+        if hasattr(chapter_instance, 'rng'):
+            chapter_instance.rng = None if rng is random else substream(rng)
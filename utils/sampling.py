@@ -0,0 +1,52 @@
+import random
+
+
+class AliasTable:
+    """
+    Walker/Vose alias table for drawing indexes 0..n-1 with the given weights in O(1) per draw.
+
+    Building the table is O(n). Each draw uses one uniform index and one uniform float:
+    index i is kept with probability probabilities[i], otherwise its alias is returned.
+
+    Raises:
+        ValueError: If there are no weights, a weight is negative or all weights are zero.
+    """
+    __slots__ = ('_probabilities', '_aliases')
+
+    def __init__(self, weights):
+        weights = [float(weight) for weight in weights]
+        if not weights:
+            raise ValueError("Alias table needs at least one weight.")
+        if any(weight < 0 for weight in weights):
+            raise ValueError("Weights must not be negative.")
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("At least one weight must be positive.")
+
+        count = len(weights)
+        scaled = [weight * count / total for weight in weights]
+        self._probabilities = [1.0] * count
+        self._aliases = list(range(count))
+
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._probabilities[less] = scaled[less]
+            self._aliases[less] = more
+            # more가 less의 남은 칸을 채우고 남은 만큼만 유지합니다.
+            scaled[more] = (scaled[more] + scaled[less]) - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # 부동소수점 오차로 남은 항목은 확률 1로 둡니다.
+        for i in small + large:
+            self._probabilities[i] = 1.0
+
+    def __len__(self):
+        return len(self._probabilities)
+
+    def sample(self, rng=random) -> int:
+        index = rng.randrange(len(self._probabilities))
+        return index if rng.random() < self._probabilities[index] else self._aliases[index]
+
+    def sample_many(self, number_of_draws: int, rng=random) -> list[int]:
+        return [self.sample(rng) for _ in range(number_of_draws)]
@@ -0,0 +1,462 @@
+from collections import Counter
+from typing import TYPE_CHECKING
+
+from utils.registry import ChapterRegistry
+from utils.rng import as_random
+from utils.sampling import AliasTable
+
+if TYPE_CHECKING:
+    from utils.dedup import DedupIndex
+
+
+class Unit:
+    """
+    Base class of the units (BasicAlgebra, RationalNumbers, PainlessPreAlgebra): a registry of
+    chapters and the worksheet assembly shared by all units (chapter sets, weighted mixing,
+    deduplication, parallel generation, problem banks and per-student variants).
+
+    Subclasses pass their chapter import paths (see utils.registry.ChapterRegistry), set their
+    title and may override the PDF layout (_PROBLEM_COLUMNS, _ANSWER_COLUMNS, _ROW_SPACING).
+    """
+
+    _MAX_DUPLICATE_ATTEMPTS = 20
+    # 연습 문제 PDF 레이아웃
+    _PROBLEM_COLUMNS = 2
+    _ANSWER_COLUMNS = 2
+    _ROW_SPACING = 400
+
+    def __init__(self, chapter_import_paths: dict[str, str], rng=None):
+        self._title = "Unit"
+        self.chapter_classes = ChapterRegistry(chapter_import_paths)
+        self.chapter = list(self.chapter_classes.keys())
+        self._chapter_weights = {chapter_name: 1.0 for chapter_name in self.chapter}
+        self._alias_tables = {}  # (start_chapter, end_chapter) -> (선택된 챕터 이름, AliasTable)
+        self.rng = rng
+
+    @property
+    def title(self):
+        """Returns the title of the problem type."""
+        return self._title
+
+    @title.setter
+    def title(self, value):
+        """Sets the title of the problem type."""
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError("Title must be a non-empty string.")
+        self._title = value
+
+    @property
+    def rng(self):
+        """Master random number generator of this unit."""
+        return self._rng
+
+    @rng.setter
+    def rng(self, value):
+        """
+        Accepts None (random module), an int seed, a random.Random or a numpy Generator and gives
+        every chapter its own substream of it, so one seed reproduces the whole worksheet.
+        """
+        self._rng = as_random(value)
+        self.chapter_classes.assign_substreams(self._rng)
+
+    @property
+    def chapter_weights(self) -> dict[str, float]:
+        """Relative weight of every chapter when problems are mixed with iter_weighted_problems."""
+        return dict(self._chapter_weights)
+
+    @chapter_weights.setter
+    def chapter_weights(self, weights: dict[str, float]):
+        """
+        Updates the weights of the given chapters; chapters that are not given keep their weight.
+        A weight of 0 leaves the chapter out of weighted mixing.
+        """
+        unknown_chapters = [chapter_name for chapter_name in weights if chapter_name not in self._chapter_weights]
+        if unknown_chapters:
+            raise ValueError(f"Unknown chapter(s): {', '.join(unknown_chapters)}")
+        if any(not isinstance(weight, (int, float)) or weight < 0 for weight in weights.values()):
+            raise ValueError("Chapter weights must be non-negative numbers.")
+
+        self._chapter_weights.update({chapter_name: float(weight) for chapter_name, weight in weights.items()})
+        self._alias_tables = {}
+
+    def _select_chapters(self, start_chapter: str = None, end_chapter: str = None) -> list[str]:
+        """Returns a copy of the chapter names from start_chapter to end_chapter, or [] on error."""
+        if start_chapter and end_chapter:
+            try:
+                start_index = self.chapter.index(start_chapter)
+                end_index = self.chapter.index(end_chapter)
+                selected_chapters = self.chapter[start_index:end_index+1]
+            except ValueError:
+                print(f"Error: Invalid chapter name provided. '{start_chapter}', '{end_chapter}'")
+                return []
+        else:
+            selected_chapters = list(self.chapter)
+
+        if not selected_chapters:
+            print("Error: The specific chapter range is empty.")
+        return selected_chapters
+
+    def _weighted_chapters(self, start_chapter: str = None, end_chapter: str = None, chapter_weights: dict = None):
+        """
+        Returns (chapter names, AliasTable) for the selected range, built once per range and weights.
+        With chapter_weights (chapters not listed get weight 0) the table is built for this call only.
+        Returns ([], None) if the range is invalid or all its weights are zero.
+        """
+        key = (start_chapter, end_chapter)
+        if chapter_weights is not None or key not in self._alias_tables:
+            selected_chapters = self._select_chapters(start_chapter, end_chapter)
+            if not selected_chapters:
+                return [], None
+            if chapter_weights is None:
+                weights = [self._chapter_weights[chapter_name] for chapter_name in selected_chapters]
+            else:
+                weights = [chapter_weights.get(chapter_name, 0.0) for chapter_name in selected_chapters]
+            try:
+                alias_table = AliasTable(weights)
+            except ValueError as e:
+                print(f"Error: {e} '{start_chapter}', '{end_chapter}'")
+                return [], None
+            if chapter_weights is not None:
+                return selected_chapters, alias_table
+            self._alias_tables[key] = (selected_chapters, alias_table)
+        return self._alias_tables[key]
+
+    def iter_weighted_problems(self, number_of_problems: int, start_chapter: str = None, end_chapter: str = None,
+                               unique: bool = False):
+        """
+        Lazily yields number_of_problems (problem, answer) pairs, drawing the chapter of each problem
+        with probability proportional to its weight (O(1) per draw with an alias table).
+        Failed problems are reported and skipped. With unique, repeated canonical keys are regenerated.
+        """
+        selected_chapters, alias_table = self._weighted_chapters(start_chapter, end_chapter)
+        if alias_table is None:
+            return
+
+        from utils.dedup import DedupIndex
+        dedup_index = DedupIndex() if unique else None
+        for _ in range(number_of_problems):
+            chapter_name = selected_chapters[alias_table.sample(self._rng)]
+            yield from self._iter_chapter_set([chapter_name], dedup_index)
+
+    def get_weighted_batch(self, number_of_problems: int, start_chapter: str = None, end_chapter: str = None,
+                           chapter_weights: dict = None, rng=None) -> tuple[list[str], list[str]]:
+        """
+        Generates number_of_problems weighted-mixed problems with one generate_batch call per drawn
+        chapter, and returns them in the drawn order without logging each problem.
+
+        chapter_weights and rng apply to this call only and leave the unit's settings untouched:
+        chapter_weights replaces the unit weights (chapters not listed get weight 0), and with rng
+        (any value accepted by the rng property) the chapters run on substreams of it, so the same
+        rng value gives the same batch, as if it had been set as the unit rng.
+        Returns: (problem_list, answer_list)
+        """
+        selected_chapters, alias_table = self._weighted_chapters(start_chapter, end_chapter, chapter_weights)
+        if alias_table is None:
+            return [], []
+        if rng is None:
+            return self._weighted_batch(number_of_problems, selected_chapters, alias_table, self._rng)
+
+        rng = as_random(rng)
+        previous_substreams = self.chapter_classes.save_substreams()
+        self.chapter_classes.assign_substreams(rng)
+        try:
+            return self._weighted_batch(number_of_problems, selected_chapters, alias_table, rng)
+        finally:
+            self.chapter_classes.restore_substreams(previous_substreams)
+
+    def _weighted_batch(self, number_of_problems: int, selected_chapters: list[str], alias_table: AliasTable,
+                        rng) -> tuple[list[str], list[str]]:
+        draws = alias_table.sample_many(number_of_problems, rng)
+        batches = {}
+        for index, count in Counter(draws).items():
+            chapter_name = selected_chapters[index]
+            try:
+                problems, answers = self.chapter_classes[chapter_name].generate_batch(count)
+            except Exception as e:
+                print(f"Error generating problem for chapter '{chapter_name}': {e}")
+                continue
+            batches[index] = iter(zip(problems, answers))
+
+        problem_list = []
+        answer_list = []
+        for index in draws:
+            if index in batches:
+                problem, answer = next(batches[index])
+                problem_list.append(problem)
+                answer_list.append(answer)
+        return problem_list, answer_list
+
+    def build_problem_bank(self, bank_path: str, problems_per_chapter: int = 1000, start_chapter: str = None,
+                           end_chapter: str = None, difficulty_levels=None) -> dict[str, int]:
+        """
+        Offline bank build: stores up to problems_per_chapter distinct problems of every selected chapter
+        in the SQLite bank at bank_path (see utils.problem_bank). Chapters with a difficulty_level setting
+        get problems_per_chapter problems at each of difficulty_levels (default: their current level).
+
+        Returns:
+            dict[str, int]: Number of problems added per chapter.
+        """
+        from utils.problem_bank import ProblemBank
+        added = {}
+        with ProblemBank(bank_path) as bank:
+            for chapter_name in self._select_chapters(start_chapter, end_chapter):
+                chapter_instance = self.chapter_classes[chapter_name]
+                if difficulty_levels and hasattr(chapter_instance, 'difficulty_level'):
+                    original_level = chapter_instance.difficulty_level
+                    added[chapter_name] = 0
+                    for difficulty_level in difficulty_levels:
+                        chapter_instance.difficulty_level = difficulty_level
+                        added[chapter_name] += bank.build(chapter_name, chapter_instance, problems_per_chapter)
+                    chapter_instance.difficulty_level = original_level
+                else:
+                    added[chapter_name] = bank.build(chapter_name, chapter_instance, problems_per_chapter)
+                print(f"{chapter_name}: {added[chapter_name]} problems added ({bank.count(chapter_name)} in bank)")
+        return added
+
+    @staticmethod
+    def export_packed_bank(bank_path: str, packed_path: str, min_difficulty: float = None,
+                           max_difficulty: float = None) -> int:
+        """
+        Converts the SQLite bank at bank_path into a memory-mapped packed bank at packed_path
+        (see utils.packed_bank) for multi-million-problem banks shared by many processes.
+        Returns the number of problems written.
+        """
+        from utils.problem_bank import ProblemBank
+        with ProblemBank(bank_path) as bank:
+            return bank.export_packed(packed_path, min_difficulty=min_difficulty, max_difficulty=max_difficulty)
+
+    def get_problem_answer_from_bank(self, bank_path: str, number_of_problems: int, start_chapter: str = None,
+                                     end_chapter: str = None, min_difficulty: float = None,
+                                     max_difficulty: float = None, exclude_ids=()) -> tuple[list[str], list[str]]:
+        """
+        Assembles a worksheet from the bank at bank_path instead of running the generators: draws
+        number_of_problems distinct problems of the selected chapters with the unit rng.
+        bank_path may also be a packed bank (see export_packed_bank); its difficulty range is fixed at
+        export and exclude_ids are its record numbers.
+        Returns: (problem_list, answer_list)
+        """
+        selected_chapters = self._select_chapters(start_chapter, end_chapter)
+        if not selected_chapters:
+            return [], []
+
+        from utils.packed_bank import PackedBank, is_packed_bank
+        from utils.problem_bank import ProblemBank
+        if is_packed_bank(bank_path):
+            if min_difficulty is not None or max_difficulty is not None:
+                raise ValueError("Packed banks are filtered by difficulty when they are exported.")
+            with PackedBank(bank_path) as bank:
+                rows = bank.sample(number_of_problems, selected_chapters, exclude_ids, self._rng)
+        else:
+            with ProblemBank(bank_path) as bank:
+                rows = bank.query(selected_chapters, number_of_problems, min_difficulty, max_difficulty,
+                                  exclude_ids, self._rng)
+        if len(rows) < number_of_problems:
+            print(f"Warning: The bank holds only {len(rows)} matching problems.")
+        return [problem for _, problem, _ in rows], [answer for _, _, answer in rows]
+
+    def get_problem_answer(self, start_chapter: str = None, end_chapter: str = None) -> tuple[list[str], list[str]]:
+
+        selected_chapters = self._select_chapters(start_chapter, end_chapter)
+        if not selected_chapters:
+            return [], []
+
+        self._rng.shuffle(selected_chapters)
+        problem_set = []
+        answer_set = []
+
+        for problem, answers in self._iter_chapter_set(selected_chapters):
+            problem_set.append(problem)
+            answer_set.append(answers)
+
+        print(f"Problem set: {len(problem_set)}")
+        print(f"Answers set: {len(answer_set)}")
+        return problem_set, answer_set
+
+    def _iter_chapter_set(self, selected_chapters: list[str], dedup_index: 'DedupIndex' = None):
+        """
+        Yields one (problem, answer) pair per chapter in the given order, skipping failed chapters.
+        With dedup_index, a chapter whose problem repeats an earlier canonical key is asked again,
+        up to _MAX_DUPLICATE_ATTEMPTS times.
+        """
+        for chapter_name in selected_chapters:
+            chapter_instance = self.chapter_classes.get(chapter_name)
+
+            if chapter_instance:
+                try:
+                    problem, answers = self._new_problem(chapter_name, chapter_instance, dedup_index)
+                except Exception as e:
+                    print(f"Error generating problem for chapter '{chapter_name}': {e}")
+                    continue
+                yield problem, answers
+            else:
+                print(f"Error: Chapter '{chapter_name}' not found in registry.")
+
+    def _new_problem(self, chapter_name: str, chapter_instance, dedup_index: 'DedupIndex' = None) -> tuple[str, str]:
+        if dedup_index is None:
+            return chapter_instance.get_problem_answer()
+
+        for _ in range(self._MAX_DUPLICATE_ATTEMPTS):
+            problem, answers = chapter_instance.get_problem_answer()
+            if dedup_index.add_problem(chapter_instance, problem, answers, chapter_name):
+                return problem, answers
+        raise ValueError(f"No new problem after {self._MAX_DUPLICATE_ATTEMPTS} attempts.")
+
+    def iter_problems(self, number_of_problems: int = None, start_chapter: str = None, end_chapter: str = None,
+                      problem_set: int = None, unique: bool = False):
+        """
+        Lazily yields (problem, answer) pairs, one shuffled set of the selected chapters after another.
+        Stops after number_of_problems pairs or problem_set sets, whichever comes first; with neither
+        given the stream is endless. With unique, problems with the same canonical key as an earlier
+        one (see utils.dedup) are regenerated.
+        """
+        from utils.dedup import DedupIndex
+        dedup_index = DedupIndex() if unique else None
+        num_of_problems = 0
+        num_of_sets = 0
+
+        while ((problem_set is None or num_of_sets < problem_set) and
+               (number_of_problems is None or num_of_problems < number_of_problems)):
+            selected_chapters = self._select_chapters(start_chapter, end_chapter)
+            if not selected_chapters:
+                return
+
+            self._rng.shuffle(selected_chapters)
+            generated = 0
+            for pair in self._iter_chapter_set(selected_chapters, dedup_index):
+                yield pair
+                generated += 1
+                num_of_problems += 1
+                if number_of_problems is not None and num_of_problems >= number_of_problems:
+                    return
+
+            # Check if the current set produced anything
+            if not generated:
+                print("No problems were generated in the current set. Stopping.")
+                return
+            num_of_sets += 1
+
+    def get_problem_answer_parallel(self, start_chapter: str = None, end_chapter: str = None, problem_set: int = 1,
+                                    workers: int = 2, seed=None) -> tuple[list[str], list[str]]:
+        """
+        Generates problem_set shuffled chapter sets on a process pool (see utils.parallel). Every worker
+        gets each chapter once and generates chunks of one chapter's problems. The chapter order and the
+        chunk seeds are drawn from seed (default: the unit rng), so the same seed gives the same worksheet
+        with any number of workers.
+        """
+        rng = as_random(seed) if seed is not None else self._rng
+        chapter_tasks = []
+        for _ in range(problem_set):
+            selected_chapters = self._select_chapters(start_chapter, end_chapter)
+            if not selected_chapters:
+                break
+
+            rng.shuffle(selected_chapters)
+            for chapter_name in selected_chapters:
+                chapter_instance = self.chapter_classes.get(chapter_name)
+                if chapter_instance:
+                    chapter_tasks.append((chapter_name, chapter_instance))
+                else:
+                    print(f"Error: Chapter '{chapter_name}' not found in registry.")
+
+        from utils.parallel import generate_problems_in_parallel
+        problem_list, answer_list = generate_problems_in_parallel(chapter_tasks, workers, rng.getrandbits(64))
+        print(f"Problem set: {len(problem_list)}")
+        print(f"Answers set: {len(answer_list)}")
+        return problem_list, answer_list
+
+    def generate_practice(self, start_chapter: str = None, end_chapter: str = None, problem_set: int = 1,
+                          workers: int = None, seed=None, unique: bool = False, number_of_problems: int = None,
+                          bank_path: str = None):
+        """
+        With number_of_problems the worksheet mixes that many problems by chapter weight
+        (see iter_weighted_problems); otherwise it holds problem_set shuffled chapter sets.
+        unique regenerates repeated problems (see utils.dedup); it does not apply to the workers path.
+        With bank_path (and number_of_problems) the problems are drawn from a prebuilt problem bank
+        (see build_problem_bank) instead of being generated.
+        """
+        if bank_path and number_of_problems:
+            problem_list, answer_list = self.get_problem_answer_from_bank(bank_path, number_of_problems,
+                                                                          start_chapter, end_chapter)
+            problem_answer_pairs = zip(problem_list, answer_list)
+        elif number_of_problems:
+            problem_answer_pairs = self.iter_weighted_problems(number_of_problems, start_chapter, end_chapter,
+                                                               unique)
+        elif workers:
+            problem_list, answer_list = self.get_problem_answer_parallel(start_chapter, end_chapter, problem_set,
+                                                                         workers, seed)
+            problem_answer_pairs = zip(problem_list, answer_list)
+        else:
+            problem_answer_pairs = self.iter_problems(start_chapter=start_chapter, end_chapter=end_chapter,
+                                                      problem_set=problem_set, unique=unique)
+
+        try:
+            from utils import pylatex_pdf as pdf
+
+            # 문제와 정답을 생성되는 즉시 .tex 파일에 기록합니다.
+            pdf.generate_pdf_files_streaming(f"{self.title} Problems", f"{self.title} Answers", problem_answer_pairs,
+                                             problem_columns=self._PROBLEM_COLUMNS,
+                                             answer_columns=self._ANSWER_COLUMNS, row_spacing=self._ROW_SPACING)
+            print("PDF 파일이 성공적으로 생성되었습니다.")
+        except ImportError:
+            print("Error: 'pdf_handling' 모듈을 찾을 수 없습니다.")
+        except AttributeError:
+            print("Error: 'pdf_handling' 모듈에 'generate_pdf_files' 함수가 없습니다.")
+
+    def _iter_variant_pairs(self, variant_seed: int, start_chapter: str, end_chapter: str, problem_set: int,
+                            unique: bool, number_of_problems: int = None):
+        # 문제가 실제로 필요해질 때 단원을 이 변형의 시드로 다시 설정하고, 끝나면 이전 생성기로 되돌립니다.
+        previous_rng, previous_substreams = self._rng, self.chapter_classes.save_substreams()
+        self.rng = variant_seed
+        try:
+            if number_of_problems:
+                yield from self.iter_weighted_problems(number_of_problems, start_chapter, end_chapter, unique)
+            else:
+                yield from self.iter_problems(start_chapter=start_chapter, end_chapter=end_chapter,
+                                              problem_set=problem_set, unique=unique)
+        finally:
+            self._rng = previous_rng
+            self.chapter_classes.restore_substreams(previous_substreams)
+
+    def iter_variants(self, number_of_variants: int, start_chapter: str = None, end_chapter: str = None,
+                      problem_set: int = 1, seed=None, unique: bool = False, student_names: list[str] = None,
+                      number_of_problems: int = None):
+        """
+        Lazily yields (heading, problem_answer_pairs) for number_of_variants seeded variants of one
+        worksheet spec, e.g. one per student. Variant seeds are drawn from seed (default: the unit rng),
+        and the unit runs on each variant's seed while its problems are consumed; its own generators
+        are restored afterwards.
+        With number_of_problems every variant mixes that many problems by chapter weight instead.
+        """
+        if student_names is not None and len(student_names) != number_of_variants:
+            raise ValueError("Number of student names must match the number of variants.")
+
+        rng = as_random(seed) if seed is not None else self._rng
+        variant_seeds = [rng.getrandbits(64) for _ in range(number_of_variants)]
+        for i, variant_seed in enumerate(variant_seeds):
+            heading = student_names[i] if student_names is not None else f"Variant {i + 1}"
+            yield heading, self._iter_variant_pairs(variant_seed, start_chapter, end_chapter, problem_set,
+                                                    unique, number_of_problems)
+
+    def generate_variants(self, number_of_variants: int, start_chapter: str = None, end_chapter: str = None,
+                          problem_set: int = 1, seed=None, unique: bool = False, student_names: list[str] = None,
+                          split: bool = False, number_of_problems: int = None):
+        """
+        Writes number_of_variants variants (see iter_variants) into one problem PDF and one answer PDF
+        with a new page per variant, so the whole class costs two pdflatex runs. With split, both PDFs
+        are also cut into one file per student.
+        """
+        variants = self.iter_variants(number_of_variants, start_chapter, end_chapter, problem_set, seed, unique,
+                                      student_names, number_of_problems)
+        try:
+            from utils import pylatex_pdf as pdf
+
+            pdf.generate_variant_pdf_files(f"{self.title} Problems", f"{self.title} Answers", variants,
+                                           problem_columns=self._PROBLEM_COLUMNS,
+                                           answer_columns=self._ANSWER_COLUMNS, row_spacing=self._ROW_SPACING,
+                                           split=split)
+            print("PDF 파일이 성공적으로 생성되었습니다.")
+        except ImportError:
+            print("Error: 'pdf_handling' 모듈을 찾을 수 없습니다.")
+        except AttributeError:
+            print("Error: 'pdf_handling' 모듈에 'generate_variant_pdf_files' 함수가 없습니다.")
+
@@ -0,0 +1,315 @@
+"""
+worksheet_server.py
+--------------------
+Local HTTP service that keeps the chapter generators and the PDF backend warm between worksheets.
+
+Run from the repository root:
+    python -m worksheet_server --port 8765
+
+Endpoints:
+    GET  /chapters    {"units": {"rational_numbers": ["Simplify", ...], ...}}
+    POST /worksheet   JSON worksheet spec, e.g.
+                      {"units": ["rational_numbers"], "start_chapter": "Simplify",
+                       "end_chapter": "DividingFractions", "count": 20, "seed": 7,
+                       "columns": [2, 2], "format": "pdf"}
+                      -> "json": {"title", "seed", "problems", "answers"}
+                      -> "pdf":  a zip with the problem and answer PDFs
+
+Generation runs on a fixed pool of worker processes that each create the chapters once, and at
+most compile_workers pdflatex processes run at a time, however many requests arrive together.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from painless_pre_algebra import PainlessPreAlgebra
+
+_MAX_PROBLEMS = 500
+_MAX_BODY_SIZE = 64 * 1024
+_COMPILE_TIMEOUT = 120
+_STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# 작업 프로세스마다 한 번만 만드는 단원 인스턴스
+_worker_unit = None
+
+
+class CompileError(RuntimeError):
+    """pdflatex is missing, failed or timed out."""
+
+
+def _init_generation_worker():
+    """
+    Worker initializer: creates every chapter once, and builds the shape indexes of the chapters
+    that use one, so requests only pay for generation.
+    """
+    global _worker_unit
+    _worker_unit = PainlessPreAlgebra()
+    for chapter_instance in _worker_unit.chapter_classes.values():
+        if hasattr(chapter_instance, 'build_shape_index'):
+            chapter_instance.build_shape_index()
+
+
+def _ping() -> bool:
+    return True
+
+
+def _generate_worksheet(spec: dict) -> tuple[list[str], list[str]]:
+    """
+    Runs in a generation worker: mixes spec['count'] problems evenly over spec['chapters'].
+
+    Every chapter runs on a substream of spec['seed'] for this call only, and the chapters keep no
+    state drawn from earlier requests, so the same seed gives the same worksheet on any worker.
+    """
+    chapter_weights = {chapter_name: 1.0 for chapter_name in spec['chapters']}
+    return _worker_unit.get_weighted_batch(spec['count'], chapter_weights=chapter_weights, rng=spec['seed'])
+
+
+def _is_integer(value) -> bool:
+    # JSON true/false는 파이썬에서 bool(int의 하위 클래스)이 되므로 정수로 받지 않습니다.
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_worksheet_spec(spec, unit: PainlessPreAlgebra) -> dict:
+    """
+    Validates a worksheet spec and fills in the defaults. Without a seed one is drawn, and it is
+    returned with the worksheet so the same worksheet can be requested again.
+
+    Raises:
+        ValueError: If a field is missing, unknown or out of range.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("Worksheet spec must be a JSON object.")
+    unknown_fields = set(spec) - {'units', 'start_chapter', 'end_chapter', 'count', 'seed', 'columns', 'format'}
+    if unknown_fields:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown_fields))}")
+
+    units = spec.get('units')
+    chapters = unit.chapters_of_units(units) if units else list(unit.chapter)
+    start_chapter = spec.get('start_chapter') or unit.chapter[0]
+    end_chapter = spec.get('end_chapter') or unit.chapter[-1]
+    for chapter_name in (start_chapter, end_chapter):
+        if chapter_name not in unit.chapter:
+            raise ValueError(f"Unknown chapter: {chapter_name}")
+    chapter_range = unit.chapter[unit.chapter.index(start_chapter):unit.chapter.index(end_chapter) + 1]
+    chapters = [chapter_name for chapter_name in chapters if chapter_name in chapter_range]
+    if not chapters:
+        raise ValueError("The selected units and chapter range have no chapters in common.")
+
+    count = spec.get('count', 20)
+    if not _is_integer(count) or not 1 <= count <= _MAX_PROBLEMS:
+        raise ValueError(f"Count must be an integer from 1 to {_MAX_PROBLEMS}.")
+    seed = spec.get('seed')
+    if seed is None:
+        seed = random.getrandbits(63)
+    elif not _is_integer(seed):
+        raise ValueError("Seed must be an integer.")
+
+    columns = spec.get('columns', [2, 2])
+    if _is_integer(columns):
+        columns = [columns, columns]
+    if (not isinstance(columns, list) or len(columns) != 2 or
+            not all(_is_integer(column) and 1 <= column <= 4 for column in columns)):
+        raise ValueError("Columns must be an integer or [problem_columns, answer_columns] from 1 to 4.")
+    output_format = spec.get('format', 'json')
+    if output_format not in ('json', 'pdf'):
+        raise ValueError("Format must be 'json' or 'pdf'.")
+
+    return {'chapters': chapters, 'count': count, 'seed': seed, 'columns': columns, 'format': output_format}
+
+
+class WorksheetServer:
+    """
+    asyncio HTTP server for worksheets.
+
+    Problems are generated on a ProcessPoolExecutor of generation_workers warm processes, and the
+    PDFs are compiled by at most compile_workers concurrent pdflatex processes; further requests wait
+    for a free worker instead of starting more processes.
+    """
+
+    def __init__(self, generation_workers: int = 2, compile_workers: int = 2, title: str = "Painless Pre-Algebra"):
+        if not isinstance(generation_workers, int) or generation_workers < 1:
+            raise ValueError("Number of generation workers must be a positive integer.")
+        if not isinstance(compile_workers, int) or compile_workers < 1:
+            raise ValueError("Number of compile workers must be a positive integer.")
+
+        self.title = title
+        self._unit = PainlessPreAlgebra()
+        self._generation_workers = generation_workers
+        self._compile_workers = compile_workers
+        self._executor = None
+        self._compile_slots = None
+        self._pdf = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765):
+        """Starts the worker pool, loads the PDF backend and begins accepting connections."""
+        from utils import pylatex_pdf
+
+        self._pdf = pylatex_pdf
+        self._compile_slots = asyncio.Semaphore(self._compile_workers)
+        # spawn: 요청 처리 중에 fork된 작업 프로세스가 클라이언트 소켓을 물려받아 연결이 닫히지 않는 일을 막습니다.
+        self._executor = ProcessPoolExecutor(max_workers=self._generation_workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_generation_worker)
+        # 첫 요청 전에 작업 프로세스를 모두 띄워 챕터를 미리 만들어 둡니다.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self._generation_workers)))
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    async def serve_forever(self, host: str = '127.0.0.1', port: int = 8765):
+        server = await self.start(host, port)
+        print(f"Worksheet server listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            status, content_type, body = await self._handle_request(reader)
+        except Exception as e:
+            status, content_type, body = self._error(500, f"Error handling request: {e}")
+
+        header = (f"HTTP/1.1 {status} {_STATUS_TEXT[status]}\r\n"
+                  f"Content-Type: {content_type}\r\n"
+                  f"Content-Length: {len(body)}\r\n"
+                  "Connection: close\r\n\r\n")
+        writer.write(header.encode('latin-1') + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _error(status: int, message: str) -> tuple[int, str, bytes]:
+        return status, 'application/json', json.dumps({'error': message}).encode('utf-8')
+
+    async def _handle_request(self, reader) -> tuple[int, str, bytes]:
+        request_line = (await reader.readline()).decode('latin-1').split()
+        if len(request_line) != 3:
+            return self._error(400, "Malformed request line.")
+        method, path, _ = request_line
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1')
+            if line in ('\r\n', '\n', ''):
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        path = path.split('?', 1)[0]
+        if path == '/chapters':
+            if method != 'GET':
+                return self._error(405, "Use GET for /chapters.")
+            units = {unit_name: self._unit.chapters_of_units([unit_name]) for unit_name in self._unit.units}
+            return 200, 'application/json', json.dumps({'units': units}).encode('utf-8')
+        if path != '/worksheet':
+            return self._error(404, f"Unknown path: {path}")
+        if method != 'POST':
+            return self._error(405, "Use POST for /worksheet.")
+
+        try:
+            content_length = int(headers.get('content-length', 0))
+        except ValueError:
+            return self._error(400, "Invalid Content-Length.")
+        if content_length > _MAX_BODY_SIZE:
+            return self._error(413, "Worksheet spec is too large.")
+
+        try:
+            spec = parse_worksheet_spec(json.loads(await reader.readexactly(content_length) or b'{}'),
+                                        self._unit)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            return self._error(400, str(e))
+
+        return await self.handle_worksheet(spec)
+
+    async def handle_worksheet(self, spec: dict) -> tuple[int, str, bytes]:
+        """Generates (and for format 'pdf' compiles) one worksheet from a parsed spec."""
+        loop = asyncio.get_running_loop()
+        problem_list, answer_list = await loop.run_in_executor(self._executor, _generate_worksheet, spec)
+
+        if spec['format'] == 'json':
+            worksheet = {'title': self.title, 'seed': spec['seed'], 'problems': problem_list, 'answers': answer_list}
+            return 200, 'application/json', json.dumps(worksheet).encode('utf-8')
+
+        try:
+            archive = await self._compile_worksheet(problem_list, answer_list, spec['columns'])
+        except CompileError as e:
+            return self._error(503, str(e))
+        return 200, 'application/zip', archive
+
+    async def _compile_worksheet(self, problem_list: list[str], answer_list: list[str], columns: list[int]) -> bytes:
+        """Writes both sheets to a temporary directory, compiles them and returns a zip of the PDFs."""
+        with tempfile.TemporaryDirectory() as directory:
+            loop = asyncio.get_running_loop()
+            filenames = await loop.run_in_executor(None, self._write_tex_files, directory, problem_list,
+                                                   answer_list, columns)
+
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, 'w') as zip_file:
+                for filename in filenames:
+                    await self._run_pdflatex(directory, filename)
+                    zip_file.write(os.path.join(directory, f"{filename}.pdf"), f"{filename}.pdf")
+            return archive.getvalue()
+
+    def _write_tex_files(self, directory: str, problem_list: list[str], answer_list: list[str],
+                         columns: list[int]) -> list[str]:
+        problem_columns, answer_columns = columns
+        with self._pdf.StreamingTexWriter(f"{self.title} Problems", problem_columns, 400, directory) as problems, \
+                self._pdf.StreamingTexWriter(f"{self.title} Answers", answer_columns, directory=directory) as answers:
+            for problem, answer in zip(problem_list, answer_list):
+                problems.write(problem)
+                answers.write(answer)
+        return [problems.filename, answers.filename]
+
+    async def _run_pdflatex(self, directory: str, filename: str):
+        # 동시에 실행되는 pdflatex 프로세스 수를 compile_workers개로 제한합니다.
+        async with self._compile_slots:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    'pdflatex', '-interaction=nonstopmode', '-halt-on-error', f"{filename}.tex",
+                    cwd=directory, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+            except FileNotFoundError:
+                raise CompileError("pdflatex is not installed or not on PATH.")
+            try:
+                return_code = await asyncio.wait_for(process.wait(), _COMPILE_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise CompileError(f"pdflatex timed out after {_COMPILE_TIMEOUT} seconds.")
+        if return_code != 0:
+            raise CompileError(f"pdflatex failed for {filename}.tex (exit code {return_code}).")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local worksheet HTTP service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--generation-workers', type=int, default=2)
+    parser.add_argument('--compile-workers', type=int, default=2)
+    args = parser.parse_args()
+
+    server = WorksheetServer(args.generation_workers, args.compile_workers)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()